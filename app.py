@@ -1,11 +1,14 @@
 from flask import Flask
 from decimal import Decimal
+import gc
 import os
 import logging
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
-from db import init_engine_and_session, init_db, close_db
+from db import init_engine_and_session, init_db, close_db, remember_primary, dispose_engines
+from cli import register_cli
+from metrics import init_metrics
 from blueprints.main import main_bp
 from blueprints.games import games_bp
 from blueprints.members import members_bp
@@ -88,15 +91,24 @@ def create_app():
     _ensure_sqlite_directory(db_url)
     # Einheitlich nur noch DATABASE_URI in der App führen
     app.config["DATABASE_URI"] = db_url
+    # Optionales Lese-Replikat (GET-Requests, siehe db.get_db)
+    replica_url = os.getenv("DATABASE_REPLICA_URI") or None
+    if replica_url:
+        _ensure_sqlite_directory(replica_url)
+    app.config["DATABASE_REPLICA_URI"] = replica_url
 
     # DB initialisieren
-    init_engine_and_session(app.config["DATABASE_URI"])
+    init_engine_and_session(app.config["DATABASE_URI"], app.config["DATABASE_REPLICA_URI"])
     init_db()
     app.teardown_appcontext(close_db)
+    app.after_request(remember_primary)
 
     # Optionales File-Logging (ergänzend zu Gunicorn-Logs)
     _configure_logging(app)
 
+    # Laufzeit-Metriken je Request + /metrics (Prometheus-Textformat)
+    init_metrics(app)
+
     # Healthcheck-Endpoint (für Docker HEALTHCHECK)
     @app.get("/healthz")
     def healthz():
@@ -115,9 +127,29 @@ def create_app():
     app.register_blueprint(games_bp, url_prefix="/games")
     app.register_blueprint(members_bp, url_prefix="/members")
 
+    # CLI-Kommandos (flask kicktipp ...)
+    register_cli(app)
+
     return app
 
 
+def preload(app: Flask) -> None:
+    """
+    Vorbereitung im Gunicorn-Master vor dem Forken (preload_app, siehe
+    gunicorn.conf.py). Schema/Migrationen sind beim Import schon gelaufen –
+    einmal statt je Worker.
+    - alle Templates kompilieren (landen im Jinja-Cache, Worker erben sie)
+    - Verbindungen des Masters schließen (kein geteilter Socket/Dateihandle)
+    - Heap einfrieren: der GC der Worker fasst die geerbten Objekte nicht an,
+      die Seiten bleiben per Copy-on-Write geteilt (weniger RAM je Worker)
+    """
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    dispose_engines()
+    gc.collect()
+    gc.freeze()
+
+
 app = create_app()
 
 if __name__ == "__main__":
@@ -0,0 +1,184 @@
+"""
+Query-Pläne und Laufzeiten der heißen Status-/Mitglieder-Abfragen vor und
+nach den Indizes aus migrations.py.
+
+Legt über seed.py eine Datenbank mit vielen Spielen/Mitgliedern/Wochenständen
+an (Default: temporäre SQLite-Datei), entfernt die Indizes der Migration 0002, misst,
+wendet die Migrationen an und misst erneut.
+
+    python benchmarks/bench_indexes.py [--games 20] [--members 500] [--weeks 34]
+                                       [--database postgresql+psycopg2://...] [--json]
+
+Achtung: mit --database werden die Tabellen der Ziel-DB geleert/neu befüllt.
+"""
+
+import argparse
+import datetime
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine, select, text  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from db import Base  # noqa: E402
+from migrations import MIGRATIONS, run_migrations, schema_migrations  # noqa: E402
+from models import Member, PointsStatus, TippingGame  # noqa: E402
+from queries import latest_status_rows, latest_statuses_for_game, latest_status_subquery  # noqa: E402
+from seed import SEED_START, reset_database, seed  # noqa: E402
+
+NEW_INDEXES = ("ix_points_statuses_member_date", "ix_victory_statuses_member_date", "ix_members_game_nickname")
+
+
+def drop_new_indexes(engine) -> None:
+    with engine.begin() as conn:
+        for name in NEW_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        schema_migrations.create(bind=conn, checkfirst=True)
+        conn.execute(schema_migrations.delete().where(schema_migrations.c.id != MIGRATIONS[0][0]))
+
+
+def analyze(engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def cases(engine, weeks: int):
+    """Name -> (repräsentatives Statement für EXPLAIN, Messfunktion)."""
+    rnd = random.Random(2)
+    with Session(engine) as db:
+        game_ids = list(db.scalars(select(TippingGame.id).order_by(TippingGame.id)))
+        game_id = game_ids[len(game_ids) // 2]
+        nicknames = dict(db.execute(select(Member.id, Member.nickname).where(Member.game_id == game_id)).all())
+    ids = sorted(nicknames)
+    sample = rnd.sample(ids, min(200, len(ids)))
+    as_of = SEED_START + datetime.timedelta(days=7 * (weeks // 2))
+
+    def sync_latest(db):
+        latest_status_rows(db, PointsStatus, PointsStatus.points, ids, as_of)
+
+    def history_loader(db):
+        for member_id in sample:
+            db.execute(select(PointsStatus).where(PointsStatus.member_id == member_id).order_by(PointsStatus.date.desc())).all()
+
+    def nickname_lookup(db):
+        for member_id in sample:
+            db.execute(select(Member.id).where(Member.game_id == game_id, Member.nickname == nicknames[member_id])).all()
+
+    def game_latest(db):
+        latest_statuses_for_game(db, game_id)
+
+    latest = latest_status_subquery(PointsStatus, PointsStatus.points, PointsStatus.member_id.in_(ids[:5]), as_of)
+    return {
+        "sync: letzter Stand (<= Datum) je Mitglied": (select(latest), sync_latest),
+        "Historien-Loader (member_id, ORDER BY date DESC) x200": (
+            select(PointsStatus).where(PointsStatus.member_id == sample[0]).order_by(PointsStatus.date.desc()),
+            history_loader,
+        ),
+        "Mitglied per (game_id, nickname) x200": (
+            select(Member.id).where(Member.game_id == game_id, Member.nickname == "spieler1"),
+            nickname_lookup,
+        ),
+        "letzter Stand aller Mitglieder eines Spiels": (None, game_latest),
+    }
+
+
+def explain(conn, stmt) -> list:
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        return [row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql))]
+    return [row[0] for row in conn.execute(text("EXPLAIN " + sql))]
+
+
+def measure(engine, case_map, repeat: int) -> dict:
+    results = {}
+    for name, (stmt, run) in case_map.items():
+        timings = []
+        with Session(engine) as db:
+            run(db)  # Warm-up
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run(db)
+                timings.append((time.perf_counter() - started) * 1000)
+        plan = []
+        if stmt is not None:
+            with engine.connect() as conn:
+                plan = explain(conn, stmt)
+        results[name] = {"median_ms": statistics.median(timings), "min_ms": min(timings), "plan": plan}
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--members", type=int, default=500, help="Mitglieder je Spiel")
+    parser.add_argument("--weeks", type=int, default=34, help="Stände je Mitglied und Historie")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database", help="SQLAlchemy-URL (Default: temporäre SQLite-Datei)")
+    parser.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+    args = parser.parse_args(argv)
+
+    tmp = None
+    url = args.database
+    if not url:
+        tmp = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{tmp.name}/bench.db"
+    engine = create_engine(url)
+
+    import models  # noqa: F401
+
+    Base.metadata.create_all(bind=engine)
+    drop_new_indexes(engine)
+    started = time.perf_counter()
+    with Session(engine) as db:
+        reset_database(db)
+        seed(db, games=args.games, members=args.members, statuses=args.weeks, ranks=0)
+        db.commit()
+    seed_seconds = time.perf_counter() - started
+    analyze(engine)
+
+    case_map = cases(engine, args.weeks)
+    before = measure(engine, case_map, args.repeat)
+    run_migrations(engine)
+    analyze(engine)
+    after = measure(engine, case_map, args.repeat)
+
+    report = {
+        "database": engine.dialect.name,
+        "games": args.games,
+        "members_per_game": args.members,
+        "status_rows": 2 * args.games * args.members * args.weeks,
+        "seed_seconds": seed_seconds,
+        "cases": {name: {"before": before[name], "after": after[name]} for name in case_map},
+    }
+    engine.dispose()
+    if tmp is not None:
+        tmp.cleanup()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(
+        f"{report['database']}: {args.games} Spiele x {args.members} Mitglieder, "
+        f"{report['status_rows']:,} Status-Zeilen (Seed {seed_seconds:.1f}s)"
+    )
+    for name, r in report["cases"].items():
+        b, a = r["before"], r["after"]
+        speedup = b["median_ms"] / a["median_ms"] if a["median_ms"] else float("inf")
+        print(f"\n{name}\n  vorher {b['median_ms']:>9.2f} ms   nachher {a['median_ms']:>9.2f} ms   x{speedup:.1f}")
+        for label, plan in (("vorher ", b["plan"]), ("nachher", a["plan"])):
+            for line in plan:
+                print(f"    {label} | {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
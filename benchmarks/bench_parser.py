@@ -0,0 +1,108 @@
+"""
+Parität und Durchsatz der Parser-Backends aus kicktipp.py.
+
+Prüft zuerst, dass alle Backends auf allen gespeicherten Seiten
+(benchmarks/fixtures/*.html, zusätzlich hochskaliert) exakt dieselbe
+Spielerliste liefern wie der vollständige BeautifulSoup-Parser, und misst dann
+Zeilen/Sekunde je Backend.
+
+    python benchmarks/bench_parser.py [--scale 20] [--seconds 1.0] [--json]
+
+Exit-Code 1 bei Abweichungen.
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+sys.path.insert(0, str(ROOT))
+
+import kicktipp  # noqa: E402
+
+_TBODY = re.compile(r"(<tbody[^>]*>)(.*?)(</tbody>)", re.IGNORECASE | re.DOTALL)
+
+
+def load_fixtures():
+    return {p.name: p.read_text(encoding="utf-8") for p in sorted(FIXTURES.glob("*.html"))}
+
+
+def scale_page(html: str, factor: int) -> str:
+    """Vervielfacht die Zeilen des ersten <tbody> (große öffentliche Ligen)."""
+    return _TBODY.sub(lambda m: m.group(1) + m.group(2) * factor + m.group(3), html, count=1)
+
+
+def check_parity(pages: dict) -> list:
+    problems = []
+    for name, html in pages.items():
+        expected = kicktipp.PARSER_BACKENDS["soup"](html)
+        for backend, parse in kicktipp.PARSER_BACKENDS.items():
+            got = parse(html)
+            if got != expected:
+                problems.append(f"{name}: {backend} liefert {len(got)} Zeilen, soup {len(expected)}")
+    return problems
+
+
+def bench(html: str, seconds: float) -> dict:
+    results = {}
+    for backend, parse in kicktipp.PARSER_BACKENDS.items():
+        rows = len(parse(html))  # Warm-up
+        runs = 0
+        started = time.perf_counter()
+        while True:
+            parse(html)
+            runs += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= seconds:
+                break
+        results[backend] = {
+            "rows": rows,
+            "runs": runs,
+            "ms_per_page": elapsed / runs * 1000,
+            "rows_per_second": rows * runs / elapsed,
+        }
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=20, help="Faktor für die hochskalierte Seite")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Messdauer je Backend und Seite")
+    parser.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+    args = parser.parse_args(argv)
+
+    fixtures = load_fixtures()
+    pages = dict(fixtures)
+    for name, html in fixtures.items():
+        pages[f"{name} x{args.scale}"] = scale_page(html, args.scale)
+
+    problems = check_parity(pages)
+    report = {
+        "backends": list(kicktipp.PARSER_BACKENDS),
+        "parity_ok": not problems,
+        "problems": problems,
+        "pages": {name: bench(html, args.seconds) for name, html in pages.items()},
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print("Parität:", "OK" if not problems else "FEHLER")
+        for p in problems:
+            print("  -", p)
+        for name, results in report["pages"].items():
+            print(f"\n{name}")
+            for backend, r in results.items():
+                print(
+                    f"  {backend:<9} {r['rows']:>6} Zeilen  {r['ms_per_page']:>9.2f} ms/Seite  "
+                    f"{r['rows_per_second']:>12,.0f} Zeilen/s"
+                )
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Benchmark der wichtigsten Seiten und des Kicktipp-Syncs.
+
+Legt eine Datenbank mit synthetischen Daten an (seed.py; Default: temporäre
+SQLite-Datei), ruft die Routen über den Flask-Test-Client auf und synchronisiert
+gegen gespeicherte Kicktipp-Seiten (benchmarks/fixtures, über einen lokalen
+HTTP-Server – kein Netz). Je Szenario: Latenz-Perzentile, SQL-Statements pro
+Aufruf und Spitzen-Speicher (tracemalloc, separater Lauf).
+
+    python benchmarks/bench_routes.py [--games 3] [--members 200] [--statuses 34] [--ranks 3]
+                                      [--iterations 30] [--database URL]
+                                      [--json] [--output ergebnis.json] [--compare alt.json]
+
+Mit --output/--compare lassen sich zwei Commits vergleichen.
+Achtung: mit --database werden ALLE Daten der Ziel-DB ersetzt.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+sys.path.insert(0, str(ROOT))
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def serve_fixture(html: str):
+    """Lokaler HTTP-Server, der für jeden Pfad die gespeicherte Seite liefert."""
+    body = html.encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/bench-liga"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--members", type=int, default=200, help="Mitglieder je Spiel")
+    parser.add_argument("--statuses", type=int, default=34, help="Stände je Mitglied")
+    parser.add_argument("--ranks", type=int, default=3, help="Platzierungsregeln je Spiel")
+    parser.add_argument("--iterations", type=int, default=30, help="Messläufe je Szenario")
+    parser.add_argument("--fixture", default="tippuebersicht_amigos.html", help="Seite für den Sync")
+    parser.add_argument("--database", help="SQLAlchemy-URL (Default: temporäre SQLite-Datei)")
+    parser.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+    parser.add_argument("--output", help="Ergebnis zusätzlich als JSON-Datei schreiben")
+    parser.add_argument("--compare", help="Früheres JSON-Ergebnis zum Vergleich")
+    args = parser.parse_args(argv)
+
+    tmp = None
+    if args.database:
+        os.environ["DATABASE_URI"] = args.database
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URI"] = f"sqlite:///{tmp.name}/bench.db"
+    # nur In-Process-Caches, kein Fetch-Cache: gemessen wird der echte Pfad
+    os.environ["CACHE_BACKEND_URL"] = ""
+    os.environ["KICKTIPP_CACHE_DIR"] = ""
+
+    from sqlalchemy import event, select
+
+    import db as database
+    from app import app
+    from cache import get_result_cache
+    from kicktipp_sync import sync_kicktipp_players_for_game
+    from models import Member, TippingGame
+    from seed import reset_database, seed
+
+    with database.new_session() as s:
+        reset_database(s)
+        started = time.perf_counter()
+        counts = seed(s, games=args.games, members=args.members, statuses=args.statuses, ranks=args.ranks)
+        s.commit()
+        seed_seconds = time.perf_counter() - started
+        game_id = s.scalars(select(TippingGame.id).order_by(TippingGame.id)).first()
+        member_id = s.scalars(select(Member.id).where(Member.game_id == game_id).order_by(Member.id)).first()
+
+    server, fixture_url = serve_fixture((FIXTURES / args.fixture).read_text(encoding="utf-8"))
+
+    statements = [0]
+    event.listen(database.engine, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1))
+
+    client = app.test_client()
+    etag = client.get(f"/games/{game_id}/evaluation.json").headers["ETag"]
+    sync_day = [datetime.date(2026, 1, 1)]
+
+    def get(url, headers=None, expect=200):
+        def run(_):
+            response = client.get(url, headers=headers)
+            assert response.status_code == expect, (url, response.status_code)
+        return run
+
+    def cold(run):
+        def wrapped(arg):
+            get_result_cache().lru.clear()
+            run(arg)
+        return wrapped
+
+    def new_game():
+        with database.new_session() as s:
+            game = TippingGame(name="Sync-Benchmark", stake_per_person=10, url=fixture_url)
+            s.add(game)
+            s.commit()
+            return game.id
+
+    def sync(gid):
+        with database.new_session() as s:
+            sync_kicktipp_players_for_game(s, s.get(TippingGame, gid), as_of_date=sync_day[0], force=True)
+            s.commit()
+
+    repeat_game = new_game()
+    sync(repeat_game)
+
+    scenarios = {
+        "main.index": (None, get("/")),
+        "games.detail": (None, get(f"/games/{game_id}")),
+        "games.detail (Punkte absteigend)": (None, get(f"/games/{game_id}?sort=points&dir=desc")),
+        "games.evaluation (kalt)": (None, cold(get(f"/games/{game_id}/evaluation"))),
+        "games.evaluation (Cache)": (None, get(f"/games/{game_id}/evaluation")),
+        "games.evaluation_json (304)": (None, get(f"/games/{game_id}/evaluation.json", {"If-None-Match": etag}, 304)),
+        "games.history (kalt)": (None, cold(get(f"/games/{game_id}/history.json"))),
+        "members.edit": (None, get(f"/members/edit/{member_id}")),
+        "sync (neues Spiel)": (new_game, sync),
+        "sync (unverändert)": (lambda: repeat_game, sync),
+    }
+
+    results = {}
+    for name, (setup, run) in scenarios.items():
+        run(setup() if setup else None)  # Warm-up
+        latencies, queries = [], []
+        for _ in range(args.iterations):
+            arg = setup() if setup else None
+            statements[0] = 0
+            started = time.perf_counter()
+            run(arg)
+            latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(statements[0])
+        arg = setup() if setup else None
+        tracemalloc.start()
+        run(arg)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = {
+            "p50_ms": percentile(latencies, 50),
+            "p90_ms": percentile(latencies, 90),
+            "p99_ms": percentile(latencies, 99),
+            "mean_ms": sum(latencies) / len(latencies),
+            "sql_statements": sum(queries) / len(queries),
+            "peak_kib": peak / 1024,
+        }
+
+    server.shutdown()
+    database.engine.dispose()
+    if tmp is not None:
+        tmp.cleanup()
+
+    report = {
+        "database": database.engine.dialect.name,
+        "sizes": {"games": args.games, "members": args.members, "statuses": args.statuses, "ranks": args.ranks},
+        "seeded": counts,
+        "seed_seconds": seed_seconds,
+        "iterations": args.iterations,
+        "scenarios": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    previous = json.loads(Path(args.compare).read_text(encoding="utf-8"))["scenarios"] if args.compare else {}
+    print(
+        f"{report['database']}: {args.games} Spiele x {args.members} Mitglieder x {args.statuses} Stände, "
+        f"{args.iterations} Läufe je Szenario"
+    )
+    print(f"{'Szenario':<34} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'SQL':>6} {'Peak KiB':>10}")
+    for name, r in results.items():
+        line = (
+            f"{name:<34} {r['p50_ms']:>9.2f} {r['p90_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+            f"{r['sql_statements']:>6.1f} {r['peak_kib']:>10.0f}"
+        )
+        old = previous.get(name)
+        if old:
+            line += f"   vorher p50 {old['p50_ms']:.2f} ms (x{old['p50_ms'] / r['p50_ms']:.1f}), SQL {old['sql_statements']:.1f}"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+Prüft den Fetch-Cache (fetch_cache.py) gegen einen lokalen Stub-HTTP-Server:
+200 → 304 → gleicher Body-Hash → TTL abgelaufen → Rollback schreibt keinen
+Cache-Eintrag → Nachtrag mit Stichtag umgeht den Cache.
+
+    python benchmarks/check_fetch_cache.py
+
+Exit-Code 1, wenn eine Prüfung fehlschlägt.
+"""
+
+import datetime
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+ROW = (
+    '<tr class="teilnehmer"><td class="mg_class"><div class="mg_name">{name}</div></td>'
+    '<td class="gesamtpunkte">{points}</td><td class="siege">{victories}</td></tr>'
+)
+
+
+def page(points_offset: int = 0) -> str:
+    rows = "".join(
+        ROW.format(name=f"Spieler {i}", points=100 + i + points_offset, victories=f"{i % 3},5")
+        for i in range(1, 21)
+    )
+    return f'<html><body><table id="ranking"><tbody>{rows}</tbody></table></body></html>'
+
+
+class StubServer:
+    """Liefert `body`; mit `etags=True` inkl. ETag und 304 auf passendes If-None-Match."""
+
+    def __init__(self, body: str):
+        self.body = body
+        self.etags = True
+        self.requests = []  # (If-None-Match, Statuscode)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                content = stub.body.encode("utf-8")
+                etag = '"' + hashlib.sha256(content).hexdigest()[:16] + '"'
+                sent = self.headers.get("If-None-Match")
+                if stub.etags and sent == etag:
+                    stub.requests.append((sent, 304))
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                stub.requests.append((sent, 200))
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(content)))
+                if stub.etags:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/stub-liga"
+
+    def last_status(self) -> int:
+        return self.requests[-1][1]
+
+
+def main() -> int:
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URI"] = f"sqlite:///{tmp.name}/check.db"
+    os.environ["KICKTIPP_CACHE_DIR"] = ""
+
+    import db as database
+    from app import app  # noqa: F401  (initialisiert Engine und Schema)
+    from fetch_cache import FetchCache
+    from kicktipp import tippuebersicht_url
+    from kicktipp_sync import _cache_key, sync_kicktipp_players_for_game
+    from models import TippingGame
+
+    stub = StubServer(page())
+    cache = FetchCache(f"{tmp.name}/cache", max_entries=8, ttl_seconds=3600)
+
+    with database.new_session() as s:
+        game = TippingGame(name="Cache-Prüfung", stake_per_person=10, url=stub.url)
+        s.add(game)
+        s.commit()
+        game_id = game.id
+    key = _cache_key(game_id, tippuebersicht_url(stub.url))
+
+    failures = []
+
+    def check(label: str, condition: bool) -> None:
+        print(f"{'ok  ' if condition else 'FEHLER'} {label}")
+        if not condition:
+            failures.append(label)
+
+    def sync(commit: bool = True, as_of_date=None) -> dict:
+        with database.new_session() as s:
+            summary = sync_kicktipp_players_for_game(s, s.get(TippingGame, game_id), as_of_date=as_of_date, cache=cache)
+            if commit:
+                s.commit()
+            else:
+                s.rollback()
+        return summary
+
+    summary = sync()
+    check("erster Abruf: 200, voller Abgleich", stub.last_status() == 200 and not summary.get("unchanged")
+          and summary["created_members"] == 20)
+    check("… Cache-Eintrag nach dem Commit", cache.get(key) is not None)
+
+    summary = sync()
+    check("zweiter Abruf: 304, kein Abgleich", stub.last_status() == 304 and summary.get("unchanged"))
+
+    stub.etags = False
+    summary = sync()
+    check("Server ohne ETag: 200 mit gleichem Body-Hash, kein Abgleich",
+          stub.last_status() == 200 and summary.get("unchanged"))
+
+    stub.etags = True
+    cache.ttl_seconds = 0
+    check("TTL abgelaufen: Eintrag verfällt", cache.get(key) is None)
+    cache.ttl_seconds = 3600
+    summary = sync()
+    check("… danach wieder voller Abgleich", not summary.get("unchanged")
+          and summary["points"]["skipped"] == 20)
+
+    stored = cache.get(key)
+    stub.body = page(points_offset=5)
+    summary = sync(commit=False)
+    check("geänderte Seite, Rollback: Abgleich lief", not summary.get("unchanged")
+          and summary["points"]["created"] + summary["points"]["updated"] == 20)
+    check("… Cache-Eintrag unverändert", cache.get(key).body_hash == stored.body_hash)
+    summary = sync()
+    check("… nächster Lauf gleicht erneut ab", not summary.get("unchanged")
+          and summary["points"]["created"] + summary["points"]["updated"] == 20)
+
+    before, stored = len(stub.requests), cache.get(key)
+    summary = sync(as_of_date=datetime.date.today() - datetime.timedelta(days=30))
+    check("Nachtrag mit Stichtag: kein Cache, voller Abgleich", not summary.get("unchanged")
+          and summary["points"]["created"] == 20)
+    check("… ohne bedingte Anfrage", stub.requests[before:] == [(None, 200)])
+    check("… Cache-Eintrag unverändert", cache.get(key) == stored)
+
+    stub.server.shutdown()
+    database.engine.dispose()
+    tmp.cleanup()
+    print("Alle Prüfungen bestanden." if not failures else f"{len(failures)} Prüfung(en) fehlgeschlagen.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
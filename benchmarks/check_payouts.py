@@ -0,0 +1,98 @@
+"""
+Prüft payouts.py gegen die bisherige Decimal-Rechnung (quantize auf Cent) mit
+zufälligen Konfigurationen und Ständen und misst beide.
+
+    python benchmarks/check_payouts.py [--configs 200] [--members 2000] [--seed 1]
+
+Exit-Code 1 bei einer Abweichung.
+"""
+
+import argparse
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from payouts import PayoutConfig, _np, compute_payouts, format_cents  # noqa: E402
+
+CENT = Decimal("0.01")
+
+
+def reference(stake, victory_share, placement_share, num_matchdays, rank_percents, victories):
+    """Die Rechnung, wie sie vor payouts.py in evaluation.py stand."""
+    total_stake = Decimal(stake) * Decimal(len(victories))
+    victory_pot = (total_stake * Decimal(victory_share) / Decimal("100")).quantize(CENT)
+    placement_pot = (total_stake * Decimal(placement_share) / Decimal("100")).quantize(CENT)
+    per_matchday = (victory_pot / Decimal(num_matchdays)).quantize(CENT) if num_matchdays > 0 else Decimal("0.00")
+    rows = []
+    for idx, v in enumerate(victories, start=1):
+        vic = Decimal(str(v))
+        payout_victories = (per_matchday * vic).quantize(CENT) if per_matchday else Decimal("0.00")
+        payout_placement = (placement_pot * rank_percents.get(idx, Decimal("0")) / Decimal("100")).quantize(CENT)
+        rows.append((str(payout_victories), str(payout_placement), str((payout_victories + payout_placement).quantize(CENT))))
+    return (str(victory_pot), str(placement_pot), str(per_matchday)), rows
+
+
+def random_config(rnd: random.Random):
+    victory_share = Decimal(rnd.randint(0, 10000)) / 100
+    ranks = {r: Decimal(rnd.randint(0, 6000)) / 100 for r in range(1, rnd.randint(1, 12))}
+    return (
+        Decimal(rnd.randint(1, 5000)) / 100,
+        victory_share,
+        Decimal("100") - victory_share,
+        rnd.choice([0, 1, 3, 7, 17, 34, 38]),
+        ranks,
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--configs", type=int, default=200)
+    parser.add_argument("--members", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rnd = random.Random(args.seed)
+    victories = sorted(
+        # Siege wie in Kicktipp mit höchstens zwei Nachkommastellen (geteilte Spieltagssiege)
+        (round(rnd.choice([0, 0.5, 1, 1.5, 2, 0.33, 0.25, 1.75, 3, 4.5]) * rnd.randint(0, 8), 2) for _ in range(args.members)),
+        reverse=True,
+    )
+    raw = [random_config(rnd) for _ in range(args.configs)]
+
+    started = time.perf_counter()
+    expected = [reference(*cfg, victories) for cfg in raw]
+    reference_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    configs = [PayoutConfig.from_values(*cfg) for cfg in raw]
+    batch = compute_payouts(configs, victories)
+    engine_seconds = time.perf_counter() - started
+
+    mismatches = 0
+    for k, (pots, rows) in enumerate(expected):
+        got_pots = (format_cents(batch.victory_pot[k]), format_cents(batch.placement_pot[k]), format_cents(batch.per_matchday[k]))
+        if got_pots != pots:
+            mismatches += 1
+            print(f"Konfiguration {k}: Töpfe {got_pots} statt {pots}")
+        for i, row in enumerate(rows):
+            got = (format_cents(batch.victories[k][i]), format_cents(batch.placement[k][i]), format_cents(batch.total[k][i]))
+            if got != row:
+                mismatches += 1
+                if mismatches <= 10:
+                    print(f"Konfiguration {k}, Platz {i + 1}: {got} statt {row}")
+
+    cells = args.configs * args.members
+    print(f"{args.configs} Konfigurationen × {args.members} Mitglieder ({'NumPy' if _np is not None else 'reines Python'})")
+    print(f"Decimal-Schleife: {reference_seconds:.3f}s   payouts.py: {engine_seconds:.3f}s   "
+          f"({cells / engine_seconds / 1e6:.1f} Mio. Beträge/s)")
+    print("keine Abweichungen" if not mismatches else f"{mismatches} Abweichung(en)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
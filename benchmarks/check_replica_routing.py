@@ -0,0 +1,118 @@
+"""
+Prüft das Replikat-Routing aus db.py mit zwei lokalen SQLite-Dateien.
+
+Der Primary wird über seed.py befüllt und per Backup-API als „Replikat“
+kopiert; im Replikat werden die Spielnamen markiert, damit sich erkennen
+lässt, woher eine Seite gelesen hat. Das Replikat ist nur lesbar
+(PRAGMA query_only) – ein versehentlicher Schreibzugriff schlägt fehl.
+
+    python benchmarks/check_replica_routing.py
+
+Exit-Code 1, wenn eine Prüfung fehlschlägt.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+MARK = " (Replikat)"
+
+
+def main() -> int:
+    tmp = tempfile.TemporaryDirectory()
+    primary_path = f"{tmp.name}/primary.db"
+    replica_path = f"{tmp.name}/replica.db"
+    os.environ["DATABASE_URI"] = f"sqlite:///{primary_path}"
+    os.environ["DATABASE_REPLICA_URI"] = f"sqlite:///{replica_path}"
+    os.environ["CACHE_BACKEND_URL"] = ""
+    os.environ["KICKTIPP_CACHE_DIR"] = ""
+
+    from sqlalchemy import delete, event, select
+
+    import db as database
+    from app import app
+    from models import GameConfig, TippingGame
+    from seed import seed
+
+    with database.new_session() as s:
+        seed(s, games=2, members=20, statuses=3, ranks=2)
+        game_id, unconfigured_id = s.scalars(select(TippingGame.id).order_by(TippingGame.id)).all()
+        # ein Spiel ohne Konfiguration: GET /games/<id> legt sie an (muss auf dem Primary landen)
+        s.execute(delete(GameConfig).where(GameConfig.game_id == unconfigured_id))
+        s.commit()
+
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path)
+    source.backup(target)
+    target.execute("UPDATE tipping_games SET name = name || ?", (MARK,))
+    target.commit()
+    source.close()
+    target.close()
+
+    statements = {"primary": 0, "replica": 0}
+    for name, eng in (("primary", database.engine), ("replica", database.replica_engine)):
+        event.listen(eng, "before_cursor_execute", lambda *a, name=name: statements.__setitem__(name, statements[name] + 1))
+
+    client = app.test_client()
+    failures = []
+
+    def check(label: str, condition: bool) -> None:
+        print(f"{'ok  ' if condition else 'FEHLER'} {label}")
+        if not condition:
+            failures.append(label)
+
+    def get(path: str):
+        for key in statements:
+            statements[key] = 0
+        response = client.get(path)
+        return response, response.get_data(as_text=True), dict(statements)
+
+    response, body, used = get("/")
+    check("GET / liest vom Replikat", response.status_code == 200 and MARK in body and used["primary"] == 0)
+
+    response, body, used = get(f"/games/{game_id}")
+    check("GET /games/<id> liest vom Replikat", response.status_code == 200 and MARK in body and used["primary"] == 0)
+
+    response, body, used = get(f"/games/{game_id}/evaluation")
+    check("GET /games/<id>/evaluation liest vom Replikat", response.status_code == 200 and used["primary"] == 0)
+
+    response = client.post(f"/games/{game_id}/edit", data={"name": "Umbenannt", "stake_per_person": "10"})
+    check("POST schreibt auf den Primary und setzt das Cookie", response.status_code == 302 and
+          client.get_cookie(database._PRIMARY_COOKIE) is not None)
+
+    response, body, used = get("/")
+    check("GET direkt danach liest vom Primary (read-your-writes)",
+          "Umbenannt" in body and MARK not in body and used["replica"] == 0)
+
+    client.delete_cookie(database._PRIMARY_COOKIE)
+    response, body, used = get("/")
+    check("nach Ablauf des Fensters wieder Replikat", MARK in body and used["primary"] == 0)
+
+    response, body, used = get(f"/games/{unconfigured_id}")
+    with database.new_session() as s:
+        created = s.get(GameConfig, unconfigured_id) is not None
+    check("GET mit Auto-Konfiguration schreibt auf den Primary", response.status_code == 200 and created)
+    check("… und setzt das Cookie", client.get_cookie(database._PRIMARY_COOKIE) is not None)
+
+    try:
+        with database.replica_engine.begin() as conn:
+            conn.execute(delete(GameConfig))
+        replica_writable = True
+    except Exception:
+        replica_writable = False
+    check("Replikat ist nicht beschreibbar", not replica_writable)
+
+    database.engine.dispose()
+    database.replica_engine.dispose()
+    tmp.cleanup()
+    print("Alle Prüfungen bestanden." if not failures else f"{len(failures)} Prüfung(en) fehlgeschlagen.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Schreib-/Lese-Konkurrenz auf einer SQLite-Datei: altes Verhalten gegen das
+Produktionsprofil aus db.py (WAL, Pragmas, BEGIN IMMEDIATE mit Backoff).
+
+Je Modus laufen mehrere Prozesse (wie Gunicorn-Worker) gleichzeitig gegen
+dieselbe frisch befüllte Datei:
+  - sync:   Kicktipp-Abgleich aller Spieler mit zufälligen Ständen + Commit
+  - form:   Formular-POST „Punkte hinzufügen“ über den Flask-Test-Client
+  - read:   GET Spielseite und Auswertung
+
+Gezählt werden Lock-Fehler („database is locked“), 5xx-Antworten und
+verlorene Formular-Schreibvorgänge (Anfragen ohne neue Zeile).
+
+    python benchmarks/stress_sqlite.py [--seconds 10] [--sync 2] [--form 2] [--read 2]
+                                       [--members 200] [--modes baseline,tuned] [--json]
+
+Exit-Code 1, wenn im Modus „tuned“ Fehler auftreten.
+"""
+
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+MODES = {
+    "baseline": {"SQLITE_TUNING": "0"},
+    "tuned": {"SQLITE_TUNING": "1"},
+}
+
+
+def _setup_env(url: str, mode: str) -> None:
+    os.environ["DATABASE_URI"] = url
+    os.environ["CACHE_BACKEND_URL"] = ""
+    os.environ["KICKTIPP_CACHE_DIR"] = ""
+    os.environ.update(MODES[mode])
+
+
+def _is_lock_error(exc: Exception) -> bool:
+    message = str(exc).lower()
+    return "locked" in message or "busy" in message
+
+
+def worker(role: str, index: int, url: str, mode: str, seconds: float, queue) -> None:
+    _setup_env(url, mode)
+    from sqlalchemy import select
+    from sqlalchemy.exc import OperationalError
+
+    import db as database
+    from app import app
+    from kicktipp_sync import _sync_players
+    from models import Member, TippingGame
+
+    rnd = random.Random(index)
+    with database.new_session() as db:
+        game_id = db.scalars(select(TippingGame.id)).first()
+        members = list(db.execute(select(Member.id, Member.nickname).where(Member.game_id == game_id).order_by(Member.id)))
+    client = app.test_client()
+    stats = {"role": role, "ops": 0, "lock_errors": 0, "server_errors": 0, "other_errors": 0, "member_id": None}
+    # je Formular-Prozess ein eigenes Mitglied, damit sich verlorene Zeilen zählen lassen
+    form_member = members[index % len(members)][0]
+    if role == "form":
+        stats["member_id"] = form_member
+
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            if role == "sync":
+                with database.new_session() as db:
+                    day = datetime.date(2026, 1, 1) + datetime.timedelta(days=rnd.randint(0, 6))
+                    players = [
+                        {"nickname": nickname, "points": rnd.randint(0, 300), "victories": rnd.randint(0, 10)}
+                        for _, nickname in members
+                    ]
+                    try:
+                        _sync_players(db, db.get(TippingGame, game_id), players, day)
+                        db.commit()
+                    except Exception:
+                        db.rollback()
+                        raise
+            elif role == "form":
+                response = client.post(
+                    f"/members/edit/{form_member}",
+                    data={"action": "add_points", "new_points": str(rnd.randint(0, 300)), "new_points_date": "2026-02-01"},
+                )
+                if response.status_code >= 500:
+                    stats["server_errors"] += 1
+            else:
+                for path in (f"/games/{game_id}", f"/games/{game_id}/evaluation"):
+                    response = client.get(path)
+                    if response.status_code >= 500:
+                        stats["server_errors"] += 1
+            stats["ops"] += 1
+        except OperationalError as e:
+            stats["lock_errors" if _is_lock_error(e) else "other_errors"] += 1
+        except Exception:
+            stats["other_errors"] += 1
+    database.engine.dispose()
+    queue.put(stats)
+
+
+def run_mode(mode: str, args) -> dict:
+    tmp = tempfile.TemporaryDirectory()
+    url = f"sqlite:///{tmp.name}/stress.db"
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+
+    seeder = ctx.Process(target=seed_database, args=(url, mode, args.members))
+    seeder.start()
+    seeder.join()
+
+    roles = ["sync"] * args.sync + ["form"] * args.form + ["read"] * args.read
+    processes = [
+        ctx.Process(target=worker, args=(role, i, url, mode, args.seconds, queue))
+        for i, role in enumerate(roles)
+    ]
+    for p in processes:
+        p.start()
+    results = [queue.get() for _ in processes]
+    for p in processes:
+        p.join()
+
+    lost = count_lost_form_writes(url, mode, results)
+    tmp.cleanup()
+
+    summary = {"lost_form_writes": lost}
+    for role in ("sync", "form", "read"):
+        rows = [r for r in results if r["role"] == role]
+        summary[role] = {
+            key: sum(r[key] for r in rows) for key in ("ops", "lock_errors", "server_errors", "other_errors")
+        }
+        summary[role]["ops_per_second"] = summary[role]["ops"] / args.seconds
+    summary["errors"] = lost + sum(
+        summary[role][key] for role in ("sync", "form", "read") for key in ("lock_errors", "server_errors", "other_errors")
+    )
+    return summary
+
+
+def seed_database(url: str, mode: str, members: int) -> None:
+    _setup_env(url, mode)
+    import db as database
+    from app import app  # noqa: F401  (legt das Schema an)
+    from seed import seed
+
+    with database.new_session() as db:
+        seed(db, games=1, members=members, statuses=4, ranks=3)
+        db.commit()
+    database.engine.dispose()
+
+
+def count_lost_form_writes(url: str, mode: str, results: list) -> int:
+    import sqlite3
+
+    path = url[len("sqlite:///"):]
+    conn = sqlite3.connect(path)
+    lost = 0
+    for r in results:
+        if r["role"] != "form":
+            continue
+        rows = conn.execute(
+            "SELECT COUNT(*) FROM points_statuses WHERE member_id = ? AND date = '2026-02-01'", (r["member_id"],)
+        ).fetchone()[0]
+        lost += max(0, r["ops"] - rows)
+    conn.close()
+    return lost
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10.0, help="Laufzeit je Modus")
+    parser.add_argument("--sync", type=int, default=2, help="Prozesse mit Kicktipp-Abgleich")
+    parser.add_argument("--form", type=int, default=2, help="Prozesse mit Formular-POSTs")
+    parser.add_argument("--read", type=int, default=2, help="lesende Prozesse")
+    parser.add_argument("--members", type=int, default=200)
+    parser.add_argument("--modes", default="baseline,tuned")
+    parser.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+    args = parser.parse_args(argv)
+
+    report = {mode: run_mode(mode, args) for mode in args.modes.split(",")}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{args.sync} sync / {args.form} form / {args.read} read Prozesse, {args.seconds:.0f}s je Modus")
+        print(f"{'Modus':<10} {'Rolle':<6} {'Ops/s':>8} {'Lock':>6} {'5xx':>6} {'sonst':>6}")
+        for mode, summary in report.items():
+            for role in ("sync", "form", "read"):
+                r = summary[role]
+                print(
+                    f"{mode:<10} {role:<6} {r['ops_per_second']:>8.1f} {r['lock_errors']:>6} "
+                    f"{r['server_errors']:>6} {r['other_errors']:>6}"
+                )
+            print(f"{mode:<10} verlorene Formular-Schreibvorgänge: {summary['lost_form_writes']}")
+    return 1 if report.get("tuned", {}).get("errors") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
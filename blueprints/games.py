@@ -1,15 +1,42 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, stream_with_context
+from datetime import date
 from decimal import Decimal
-from db import get_db
+from sqlalchemy import select
+from sqlalchemy.orm import lazyload
+from db import get_db, get_primary_db, in_read_request, new_session, read_only
 from models import (
     TippingGame,
-    Member,
     GameConfig,
     PlacementPayout,
+    SyncJob,
 )
+from standings import ensure_standings, load_standings
+from queries import game_overview_rows, member_page
+from evaluation import (
+    bump_game_version,
+    evaluation_etag,
+    get_evaluation,
+    get_existing_game_version,
+    get_game_version,
+    get_timeline,
+)
+from history import game_history
+from cache import get_result_cache
+from jobs import enqueue_sync, job_to_dict
+from exporter import EXPORT_FORMATS, EXPORT_KINDS, export_filename, export_game
+from payouts import PayoutConfig, compute_payouts, format_cents
+from projection import ProjectionUnavailable, get_projection
 
 games_bp = Blueprint("games", __name__, template_folder="../templates/games")
 
+# Mitglieder je Seite in games.detail
+MEMBER_PAGE_SIZE = 50
+# Obergrenze für Konfigurationen je What-if-Anfrage
+WHAT_IF_MAX_CONFIGS = 500
+WHAT_IF_MAX_RANK = 1000
+# Wie die Spalte stake_per_person (Numeric(10, 2))
+WHAT_IF_MAX_STAKE = Decimal("99999999.99")
+
 
 @games_bp.route("/create", methods=["GET", "POST"])
 def create():
@@ -41,6 +68,7 @@ def create():
             num_matchdays=1,
         )
         db.add(cfg)
+        bump_game_version(db, game.id)
         db.commit()
 
         flash("Tippspiel wurde angelegt.", "success")
@@ -73,6 +101,7 @@ def edit(game_id):
 
         game.name = name
         game.url = url
+        bump_game_version(db, game.id)
         db.commit()
         flash("Tippspiel wurde aktualisiert.", "success")
         return redirect(url_for("games.detail", game_id=game.id))
@@ -80,24 +109,110 @@ def edit(game_id):
     return render_template("games/form.html", game=game)
 
 
+def _member_page_args():
+    """Sortierung/Blättern aus der Query (?sort=name|points|victories&dir=asc|desc&after=…|before=…&limit=…)."""
+    return {
+        "sort": request.args.get("sort", "name"),
+        "descending": request.args.get("dir", "asc") == "desc",
+        "after": request.args.get("after") or None,
+        "before": request.args.get("before") or None,
+        "limit": int(request.args.get("limit", MEMBER_PAGE_SIZE)),
+    }
+
+
+def _add_default_config(db, game_id: int) -> None:
+    db.add(GameConfig(
+        game_id=game_id,
+        victory_share_percent=Decimal("50.00"),
+        placement_share_percent=Decimal("50.00"),
+        num_matchdays=1,
+    ))
+    bump_game_version(db, game_id)
+    db.commit()
+
+
+def _ensure_config(db, game):
+    """
+    Legt eine fehlende Konfiguration an. Returns: (db, game) zum Weiterlesen.
+    In lesenden Requests nicht in der (verzögert begonnenen) Request-Session,
+    sondern in einer eigenen Schreibtransaktion mit erneuter Prüfung; danach
+    wird vom Primary mit frischem Snapshot weitergelesen (wie
+    standings._heal_standings).
+    """
+    if game.config:
+        return db, game
+    if not in_read_request():
+        _add_default_config(db, game.id)
+        return db, game
+    with new_session() as writer:
+        if writer.scalar(select(GameConfig.id).where(GameConfig.game_id == game.id)) is None:
+            _add_default_config(writer, game.id)
+    db = get_primary_db()
+    db.rollback()  # neuer Lese-Snapshot
+    return db, db.get(TippingGame, game.id, options=[lazyload(TippingGame.members)])
+
+
 @games_bp.route("/<int:game_id>")
 def detail(game_id):
     db = get_db()
-    game = db.get(TippingGame, game_id)
+    game = db.get(TippingGame, game_id, options=[lazyload(TippingGame.members)])
     if not game:
         flash("Tippspiel nicht gefunden.", "warning")
         return redirect(url_for("main.index"))
     # Ensure config exists
-    if not game.config:
-        cfg = GameConfig(
-            game_id=game.id,
-            victory_share_percent=Decimal("50.00"),
-            placement_share_percent=Decimal("50.00"),
-            num_matchdays=1,
-        )
-        db.add(cfg)
-        db.commit()
-    return render_template("games/detail.html", game=game)
+    db, game = _ensure_config(db, game)
+    if ensure_standings(db, game.id):
+        db = get_primary_db()
+    try:
+        args = _member_page_args()
+        page = member_page(db, game.id, **args)
+    except ValueError:
+        flash("Ungültige Sortierung oder Seite.", "warning")
+        return redirect(url_for("games.detail", game_id=game.id))
+    overview = game_overview_rows(db, game.id)[0]
+    return render_template(
+        "games/detail.html",
+        game=game,
+        page=page,
+        sort=args["sort"],
+        descending=args["descending"],
+        member_count=overview.member_count,
+        total_stake=overview.total_stake,
+    )
+
+
+@games_bp.route("/<int:game_id>/members.json")
+def members_json(game_id):
+    db = get_db()
+    if db.get(TippingGame, game_id, options=[lazyload(TippingGame.members)]) is None:
+        return {"error": "Tippspiel nicht gefunden."}, 404
+    if ensure_standings(db, game_id):
+        db = get_primary_db()
+    try:
+        page = member_page(db, game_id, **_member_page_args())
+    except ValueError:
+        return {"error": "Ungültige Parameter (sort, dir, after/before, limit)."}, 400
+    return {
+        "rows": [
+            {
+                "id": r.id,
+                "first_name": r.first_name,
+                "last_name": r.last_name,
+                "nickname": r.nickname,
+                "email": r.email,
+                "payment_method": r.pm_label,
+                "payment_reference": r.pm_reference,
+                "rank": r.rank,
+                "points": r.points,
+                "points_date": r.points_date.isoformat() if r.points_date else None,
+                "victories": r.victories,
+                "victories_date": r.victories_date.isoformat() if r.victories_date else None,
+            }
+            for r in page.rows
+        ],
+        "next": page.next_cursor,
+        "prev": page.prev_cursor,
+    }
 
 
 @games_bp.route("/<int:game_id>/delete", methods=["POST"])
@@ -107,6 +222,8 @@ def delete(game_id):
     if not game:
         flash("Tippspiel nicht gefunden.", "warning")
         return redirect(url_for("main.index"))
+    # Zähler überlebt ggf. das Spiel (SQLite ohne FK-Cascade) – nie zurücksetzen
+    bump_game_version(db, game.id)
     db.delete(game)
     db.commit()
     flash("Tippspiel wurde gelöscht.", "info")
@@ -118,22 +235,15 @@ def delete(game_id):
 # ------------------------------
 @games_bp.route("/<int:game_id>/config", methods=["GET", "POST"])
 def config(game_id):
-    db = get_db()
+    # Bearbeitungsseite (legt ggf. die Konfiguration an): immer vom Primary
+    db = get_primary_db()
     game = db.get(TippingGame, game_id)
     if not game:
         flash("Tippspiel nicht gefunden.", "warning")
         return redirect(url_for("main.index"))
 
     # ensure config
-    if not game.config:
-        game.config = GameConfig(
-            game_id=game.id,
-            victory_share_percent=Decimal("50.00"),
-            placement_share_percent=Decimal("50.00"),
-            num_matchdays=1,
-        )
-        db.add(game.config)
-        db.commit()
+    db, game = _ensure_config(db, game)
 
     if request.method == "POST":
         action = request.form.get("action", "save_config")
@@ -155,6 +265,7 @@ def config(game_id):
                 game.config.victory_share_percent = v
                 game.config.placement_share_percent = p
                 game.config.num_matchdays = md
+                bump_game_version(db, game.id)
                 db.commit()
                 flash("Konfiguration gespeichert.", "success")
                 return redirect(url_for("games.config", game_id=game.id))
@@ -173,6 +284,7 @@ def config(game_id):
                     raise ValueError("Prozent muss ≥ 0 sein.")
 
                 db.add(PlacementPayout(game_id=game.id, rank=rank, percent=percent))
+                bump_game_version(db, game.id)
                 db.commit()
                 flash("Platzierungsregel hinzugefügt.", "success")
             except Exception:
@@ -196,6 +308,7 @@ def delete_rank(game_id, rank_id):
         return redirect(url_for("games.config", game_id=game.id))
 
     db.delete(rp)
+    bump_game_version(db, game.id)
     db.commit()
     flash("Platzierungsregel gelöscht.", "info")
     return redirect(url_for("games.config", game_id=game.id))
@@ -204,10 +317,17 @@ def delete_rank(game_id, rank_id):
 # ------------------------------
 #   Auswertung
 # ------------------------------
+def _as_of_arg():
+    """?as_of=YYYY-MM-DD (leer = aktuell). ValueError bei ungültigem Datum."""
+    value = request.args.get("as_of", "").strip()
+    return date.fromisoformat(value) if value else None
+
+
 @games_bp.route("/<int:game_id>/evaluation")
 def evaluation(game_id):
     db = get_db()
-    game = db.get(TippingGame, game_id)
+    # Mitgliederliste wird hier nicht gebraucht (kommt aus dem Cache)
+    game = db.get(TippingGame, game_id, options=[lazyload(TippingGame.members)])
     if not game:
         flash("Tippspiel nicht gefunden.", "warning")
         return redirect(url_for("main.index"))
@@ -217,60 +337,304 @@ def evaluation(game_id):
         flash("Bitte zuerst die Konfiguration einstellen.", "warning")
         return redirect(url_for("games.config", game_id=game.id))
 
-    # Ranking: primär Punkte (desc), dann Siege (desc), dann Nachname/Vorname
-    def latest_pts(m: Member) -> int:
-        return m.latest_points.points if m.latest_points else 0
+    try:
+        as_of = _as_of_arg()
+    except ValueError:
+        flash("Ungültiges Datum (YYYY-MM-DD).", "warning")
+        return redirect(url_for("games.evaluation", game_id=game.id))
 
-    def latest_vic(m: Member) -> float:
-        return m.latest_victory.victories if m.latest_victory else 0.0
+    result = get_evaluation(db, game, as_of=as_of)
 
-    members_sorted = sorted(
-        game.members,
-        key=lambda m: (latest_pts(m), latest_vic(m), m.last_name.lower(), m.first_name.lower()),
-        reverse=True,
+    return render_template(
+        "games/evaluation.html",
+        game=game,
+        as_of=as_of,
+        rows=result["rows"],
+        victory_pot=result["victory_pot"],
+        placement_pot=result["placement_pot"],
+        per_matchday=result["per_matchday"],
+        placement_percent_sum=result["placement_percent_sum"],
+        total_stake=result["total_stake"],
+        member_count=result["member_count"],
     )
 
-    # Töpfe
-    total_stake = Decimal(game.total_stake or 0)
-    victory_pot = (total_stake * Decimal(game.config.victory_share_percent) / Decimal("100")).quantize(Decimal("0.01"))
-    placement_pot = (total_stake * Decimal(game.config.placement_share_percent) / Decimal("100")).quantize(Decimal("0.01"))
-    per_matchday = (victory_pot / Decimal(game.config.num_matchdays)).quantize(Decimal("0.01")) if game.config.num_matchdays > 0 else Decimal("0.00")
-
-    # Platzierungsregeln in Dict
-    rank_to_percent = {pp.rank: Decimal(pp.percent) for pp in game.placement_payouts}
-
-    # Tabelle für Ausgabe
-    rows = []
-    for idx, m in enumerate(members_sorted, start=1):
-        pts = latest_pts(m)
-        vic = Decimal(str(latest_vic(m)))
-        payout_victories = (per_matchday * vic).quantize(Decimal("0.01")) if per_matchday else Decimal("0.00")
-        placement_percent = rank_to_percent.get(idx, Decimal("0"))
-        payout_placement = (placement_pot * placement_percent / Decimal("100")).quantize(Decimal("0.01"))
-        payout_total = (payout_victories + payout_placement).quantize(Decimal("0.01"))
-
-        rows.append(
-            {
-                "rank": idx,
-                "member": m,
-                "points": pts,
-                "victories": float(vic),
-                "payout_victories": payout_victories,
-                "payout_placement": payout_placement,
-                "payout_total": payout_total,
-            }
-        )
 
-    # Summe der Platzierungs-Prozente zur Info
-    placement_percent_sum = sum((Decimal(pp.percent) for pp in game.placement_payouts), Decimal("0"))
+@games_bp.route("/<int:game_id>/evaluation.json")
+def evaluation_json(game_id):
+    db = get_db()
+    try:
+        as_of = _as_of_arg()
+    except ValueError:
+        return {"error": "Ungültiger Parameter as_of (YYYY-MM-DD)."}, 400
+    # Unveränderte Abfragen (gleiche Version) mit einer Query und ohne
+    # Berechnung beantworten; unbekannte/gelöschte Spiele nie mit 304.
+    version = get_existing_game_version(db, game_id)
+    if version is None:
+        return {"error": "Tippspiel nicht gefunden."}, 404
+    etag = evaluation_etag(game_id, version, as_of)
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+    else:
+        game = db.get(TippingGame, game_id, options=[lazyload(TippingGame.members)])
+        if not game:
+            return {"error": "Tippspiel nicht gefunden."}, 404
+        if not game.config:
+            return {"error": "Tippspiel hat noch keine Konfiguration."}, 409
+        response = jsonify(get_evaluation(db, game, version=version, as_of=as_of))
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+
+def _what_if_config(game, raw, index: int) -> PayoutConfig:
+    """Kandidat aus dem Request; fehlende Werte kommen aus der aktuellen Konfiguration."""
+    where = f"configs[{index}]"
+    if not isinstance(raw, dict):
+        raise ValueError(f"{where} muss ein Objekt sein.")
+
+    def number(value, name, maximum=None):
+        try:
+            result = Decimal(str(value).replace(",", "."))
+        except ArithmeticError:
+            raise ValueError(f"{where}: {name} ist keine Zahl.") from None
+        if not result.is_finite() or result < 0:
+            raise ValueError(f"{where}: {name} muss ≥ 0 sein.")
+        if maximum is not None and result > maximum:
+            raise ValueError(f"{where}: {name} darf höchstens {maximum} sein.")
+        return result
+
+    def percent(value, name):
+        return number(value, name, maximum=Decimal("100"))
+
+    cfg = game.config
+    victory = percent(raw.get("victory_share_percent", cfg.victory_share_percent), "victory_share_percent")
+    placement = percent(raw.get("placement_share_percent", 100 - victory), "placement_share_percent")
+    if victory + placement != Decimal("100"):
+        raise ValueError(f"{where}: Die Summe von Siege-% und Platzierungs-% muss 100 ergeben.")
+    matchdays = number(raw.get("num_matchdays", cfg.num_matchdays), "num_matchdays")
+    if matchdays != matchdays.to_integral_value() or matchdays == 0:
+        raise ValueError(f"{where}: Anzahl der Spieltage muss eine ganze Zahl größer 0 sein.")
+    if "ranks" in raw:
+        if not isinstance(raw["ranks"], dict):
+            raise ValueError(f"{where}: ranks muss ein Objekt {{Platz: Prozent}} sein.")
+        ranks = {}
+        for rank, share in raw["ranks"].items():
+            if not str(rank).isdigit() or not 1 <= int(rank) <= WHAT_IF_MAX_RANK:
+                raise ValueError(f"{where}: Platz '{rank}' muss zwischen 1 und {WHAT_IF_MAX_RANK} liegen.")
+            ranks[int(rank)] = percent(share, f"ranks.{rank}")
+    else:
+        ranks = {pp.rank: pp.percent for pp in game.placement_payouts}
+    stake = number(raw.get("stake_per_person", game.stake_per_person), "stake_per_person", WHAT_IF_MAX_STAKE)
+    label = raw.get("label")
+    return PayoutConfig.from_values(
+        stake, victory, placement, int(matchdays), ranks,
+        label=str(label) if label is not None else f"#{index + 1}",
+    )
 
-    return render_template(
-        "games/evaluation.html",
-        game=game,
-        rows=rows,
-        victory_pot=victory_pot,
-        placement_pot=placement_pot,
-        per_matchday=per_matchday,
-        placement_percent_sum=placement_percent_sum,
-        total_stake=total_stake,
+
+@games_bp.route("/<int:game_id>/what-if", methods=["POST"])
+@read_only
+def what_if(game_id):
+    """
+    Vergleicht Kandidaten-Konfigurationen gegen die aktuellen Stände, z. B.
+    {"configs": [{"label": "60/40", "victory_share_percent": 60, "ranks": {"1": 50, "2": 30, "3": 20}}]}.
+    Je Kandidat Töpfe, Summe/Rest und die Ausschüttung je Mitglied (parallel zu `members`);
+    die aktuelle Konfiguration steht als Erstes in der Antwort.
+    """
+    db = get_db()
+    game = db.get(TippingGame, game_id, options=[lazyload(TippingGame.members)])
+    if not game:
+        return {"error": "Tippspiel nicht gefunden."}, 404
+    if not game.config:
+        return {"error": "Tippspiel hat noch keine Konfiguration."}, 409
+
+    body = request.get_json(silent=True)
+    raw_configs = body.get("configs") if isinstance(body, dict) else None
+    if not isinstance(raw_configs, list) or not raw_configs:
+        return {"error": "Erwartet JSON {\"configs\": [...]}."}, 400
+    if len(raw_configs) > WHAT_IF_MAX_CONFIGS:
+        return {"error": f"Höchstens {WHAT_IF_MAX_CONFIGS} Konfigurationen je Anfrage."}, 400
+    try:
+        configs = [PayoutConfig.from_game(game)] + [
+            _what_if_config(game, raw, i) for i, raw in enumerate(raw_configs)
+        ]
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    standings = load_standings(db, game.id)
+    batch = compute_payouts(configs, [standing.victories for _, standing in standings])
+
+    results = []
+    for k, config in enumerate(configs):
+        totals = [int(c) for c in batch.total[k]]
+        paid = sum(totals)
+        results.append({
+            "label": "aktuell" if k == 0 else config.label,
+            "total_stake": format_cents(batch.total_stake[k]),
+            "victory_pot": format_cents(batch.victory_pot[k]),
+            "placement_pot": format_cents(batch.placement_pot[k]),
+            "per_matchday": format_cents(batch.per_matchday[k]),
+            "paid": format_cents(paid),
+            # nicht verteilt (Rundung, Prozente < 100, offene Spieltage); negativ = mehr als eingezahlt
+            "remainder": format_cents(batch.total_stake[k] - paid),
+            "payout_total": [format_cents(c) for c in totals],
+        })
+    return jsonify({
+        "game_id": game.id,
+        "members": [
+            {"id": m.id, "rank": rank, "nickname": m.nickname, "points": standing.points, "victories": standing.victories}
+            for rank, (m, standing) in enumerate(standings, start=1)
+        ],
+        "configs": results,
+    })
+
+
+@games_bp.route("/<int:game_id>/projection")
+def projection(game_id):
+    db = get_db()
+    game = db.get(TippingGame, game_id, options=[lazyload(TippingGame.members)])
+    if not game:
+        flash("Tippspiel nicht gefunden.", "warning")
+        return redirect(url_for("main.index"))
+    if not game.config:
+        flash("Bitte zuerst die Konfiguration einstellen.", "warning")
+        return redirect(url_for("games.config", game_id=game.id))
+    try:
+        result = get_projection(db, game)
+    except ProjectionUnavailable as e:
+        flash(str(e), "warning")
+        return redirect(url_for("games.evaluation", game_id=game.id))
+    return render_template("games/projection.html", game=game, result=result)
+
+
+@games_bp.route("/<int:game_id>/projection.json")
+def projection_json(game_id):
+    db = get_db()
+    game = db.get(TippingGame, game_id, options=[lazyload(TippingGame.members)])
+    if not game:
+        return {"error": "Tippspiel nicht gefunden."}, 404
+    if not game.config:
+        return {"error": "Tippspiel hat noch keine Konfiguration."}, 409
+    try:
+        return jsonify(get_projection(db, game))
+    except ProjectionUnavailable as e:
+        return {"error": str(e)}, 503
+
+
+@games_bp.route("/<int:game_id>/timeline")
+def timeline(game_id):
+    db = get_db()
+    game = db.get(TippingGame, game_id, options=[lazyload(TippingGame.members)])
+    if not game:
+        flash("Tippspiel nicht gefunden.", "warning")
+        return redirect(url_for("main.index"))
+    if not game.config:
+        flash("Bitte zuerst die Konfiguration einstellen.", "warning")
+        return redirect(url_for("games.config", game_id=game.id))
+
+    result = get_timeline(db, game)
+    members = result["members"]
+    position = {m["id"]: i for i, m in enumerate(members)}
+    # je Tag die ersten drei Plätze mit Ausschüttung; neueste zuerst
+    days = []
+    for day_index in reversed(range(len(result["dates"]))):
+        top = [
+            (members[position[member_id]], result["payout_total"][position[member_id]][day_index])
+            for member_id in result["top3"][day_index]
+        ]
+        days.append((result["dates"][day_index], top))
+    return render_template("games/timeline.html", game=game, days=days)
+
+
+@games_bp.route("/<int:game_id>/timeline.json")
+def timeline_json(game_id):
+    db = get_db()
+    game = db.get(TippingGame, game_id, options=[lazyload(TippingGame.members)])
+    if not game:
+        return {"error": "Tippspiel nicht gefunden."}, 404
+    if not game.config:
+        return {"error": "Tippspiel hat noch keine Konfiguration."}, 409
+    return jsonify(get_timeline(db, game))
+
+
+@games_bp.route("/<int:game_id>/export/<kind>.<fmt>")
+def export(game_id, kind, fmt):
+    db = get_db()
+    if kind not in EXPORT_KINDS or fmt not in EXPORT_FORMATS:
+        return {"error": f"Export nicht verfügbar (Arten: {', '.join(EXPORT_KINDS)}; Formate: csv, json)."}, 404
+    game = db.get(TippingGame, game_id, options=[lazyload(TippingGame.members)])
+    if not game:
+        return {"error": "Tippspiel nicht gefunden."}, 404
+    if kind != "history" and not game.config:
+        return {"error": "Tippspiel hat noch keine Konfiguration."}, 409
+
+    # Session bleibt bis zum Ende des Streams offen (Teardown erst danach)
+    response = current_app.response_class(
+        stream_with_context(export_game(db, game, kind, fmt)), mimetype=EXPORT_FORMATS[fmt]
+    )
+    response.headers["Content-Disposition"] = f'attachment; filename="{export_filename(game, kind, fmt)}"'
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+# ------------------------------
+#   Verlauf (JSON für Diagramme)
+# ------------------------------
+@games_bp.route("/<int:game_id>/history.json")
+def history(game_id):
+    db = get_db()
+    if db.get(TippingGame, game_id, options=[lazyload(TippingGame.members)]) is None:
+        return {"error": "Tippspiel nicht gefunden."}, 404
+    try:
+        start = date.fromisoformat(request.args["from"]) if request.args.get("from") else None
+        end = date.fromisoformat(request.args["to"]) if request.args.get("to") else None
+        max_points = int(request.args["points"]) if request.args.get("points") else None
+    except ValueError:
+        return {"error": "Ungültige Parameter (from/to: YYYY-MM-DD, points: Zahl)."}, 400
+    fill = request.args.get("fill", "1") not in ("0", "false")
+
+    key = f"history:{game_id}:v{get_game_version(db, game_id)}:{start}:{end}:{fill}:{max_points}"
+    return get_result_cache().get_or_compute(
+        key, lambda: game_history(db, game_id, start=start, end=end, fill=fill, max_points=max_points)
     )
+
+
+# ------------------------------
+#   Kicktipp-Sync (Hintergrund-Job)
+# ------------------------------
+def _wants_json() -> bool:
+    # Formular im Browser -> Redirect; API-Clients (ohne Accept, */* oder JSON) -> 202 + JSON
+    return request.accept_mimetypes.best_match(["application/json", "text/html"], default="application/json") == "application/json"
+
+
+@games_bp.route("/<int:game_id>/sync", methods=["POST"])
+def sync(game_id):
+    """Plant einen Kicktipp-Sync ein (läuft im Worker, Antwort kommt sofort)."""
+    db = get_db()
+    if db.get(TippingGame, game_id, options=[lazyload(TippingGame.members)]) is None:
+        if _wants_json():
+            return {"error": "Tippspiel nicht gefunden."}, 404
+        flash("Tippspiel nicht gefunden.", "warning")
+        return redirect(url_for("main.index"))
+    force = request.values.get("force") in ("1", "true", "on")
+    try:
+        job, created = enqueue_sync(db, game_id, force=force)
+    except ValueError as e:
+        if _wants_json():
+            return {"error": str(e)}, 409
+        flash(str(e), "danger")
+        return redirect(url_for("games.detail", game_id=game_id))
+
+    status_url = url_for("games.sync_job", job_id=job.id)
+    if _wants_json():
+        return dict(job_to_dict(job), created=created, status_url=status_url), 202, {"Location": status_url}
+    flash("Kicktipp-Sync wurde eingeplant." if created else "Für dieses Tippspiel ist bereits ein Sync eingeplant.", "info")
+    return redirect(url_for("games.detail", game_id=game_id))
+
+
+@games_bp.route("/sync-jobs/<int:job_id>")
+def sync_job(job_id):
+    job = get_db().get(SyncJob, job_id)
+    if job is None:
+        return {"error": "Job nicht gefunden."}, 404
+    return job_to_dict(job)
@@ -1,11 +1,16 @@
 from flask import Blueprint, render_template
 from db import get_db
-from models import TippingGame
+from cache import get_result_cache
+from queries import game_overview_rows
 
 main_bp = Blueprint("main", __name__)
 
 @main_bp.route("/")
 def index():
     db = get_db()
-    games = db.query(TippingGame).all()
+    games = game_overview_rows(db)
     return render_template("index.html", games=games)
+
+@main_bp.route("/cache/stats")
+def cache_stats():
+    return get_result_cache().snapshot()
@@ -2,6 +2,9 @@ from datetime import date
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from db import get_db
 from models import TippingGame, Member, PaymentMethod, VictoryStatus, PointsStatus
+from standings import refresh_standings, rerank_game
+from evaluation import bump_game_version
+from importer import ImportFileError, import_file
 
 members_bp = Blueprint("members", __name__, template_folder="../templates/members")
 
@@ -37,12 +40,57 @@ def create(game_id):
 
         db.add(member)
         db.add(pm)
+        db.flush()
+        refresh_standings(db, game.id, [member.id])
+        bump_game_version(db, game.id)
         db.commit()
         flash("Mitglied wurde angelegt.", "success")
         return redirect(url_for("games.detail", game_id=game.id))
 
     return render_template("members/form.html", member=None, game=game, today=date.today())
 
+# Obergrenze für hochgeladene Import-Dateien
+IMPORT_MAX_BYTES = 5 * 1024 * 1024
+
+
+@members_bp.route("/import/<int:game_id>", methods=["GET", "POST"])
+def import_members(game_id):
+    db = get_db()
+    game = db.get(TippingGame, game_id)
+    if not game:
+        flash("Tippspiel nicht gefunden.", "warning")
+        return redirect(url_for("main.index"))
+
+    report = None
+    if request.method == "POST":
+        upload = request.files.get("file")
+        if not upload or not upload.filename:
+            flash("Bitte eine CSV- oder JSON-Datei auswählen.", "danger")
+            return render_template("members/import.html", game=game, report=None)
+        data = upload.read(IMPORT_MAX_BYTES + 1)
+        if len(data) > IMPORT_MAX_BYTES:
+            flash("Datei ist zu groß (max. 5 MB).", "danger")
+            return render_template("members/import.html", game=game, report=None)
+        try:
+            report = import_file(
+                db, game, data, filename=upload.filename,
+                skip_invalid=bool(request.form.get("skip_invalid")),
+                dry_run=bool(request.form.get("dry_run")),
+            )
+        except (ImportFileError, UnicodeDecodeError) as e:
+            db.rollback()
+            flash(f"Datei konnte nicht gelesen werden: {e}", "danger")
+            return render_template("members/import.html", game=game, report=None)
+        if report.errors and not (report.dry_run or request.form.get("skip_invalid")):
+            flash(f"{report.invalid} ungültige Zeile(n) – es wurde nichts importiert.", "danger")
+        elif report.dry_run:
+            flash("Prüfung abgeschlossen – es wurde nichts geschrieben.", "info")
+        else:
+            flash("Import abgeschlossen.", "success")
+
+    return render_template("members/import.html", game=game, report=report)
+
+
 @members_bp.route("/edit/<int:member_id>", methods=["GET", "POST"])
 def edit(member_id):
     db = get_db()
@@ -75,6 +123,9 @@ def edit(member_id):
                 member.payment_method.label = pm_label
                 member.payment_method.reference = pm_ref
 
+            # Name ist Tie-Breaker im Ranking
+            rerank_game(db, game.id)
+            bump_game_version(db, game.id)
             db.commit()
             flash("Mitglied wurde aktualisiert.", "success")
             return redirect(url_for("members.edit", member_id=member.id))
@@ -89,6 +140,8 @@ def edit(member_id):
                 v_date_str = request.form.get("new_victories_date") or str(date.today())
                 v_date = date.fromisoformat(v_date_str)
                 db.add(VictoryStatus(member=member, victories=victories_val, date=v_date))
+                refresh_standings(db, member.game_id, [member.id])
+                bump_game_version(db, member.game_id)
                 db.commit()
                 flash("Neuer Siege-Status hinzugefügt.", "success")
             except Exception:
@@ -106,6 +159,8 @@ def edit(member_id):
                 p_date_str = request.form.get("new_points_date") or str(date.today())
                 p_date = date.fromisoformat(p_date_str)
                 db.add(PointsStatus(member=member, points=points_val, date=p_date))
+                refresh_standings(db, member.game_id, [member.id])
+                bump_game_version(db, member.game_id)
                 db.commit()
                 flash("Neuer Punkte-Status hinzugefügt.", "success")
             except Exception:
@@ -128,6 +183,8 @@ def delete(member_id):
         return redirect(url_for("main.index"))
     game_id = member.game_id
     db.delete(member)
+    rerank_game(db, game_id)
+    bump_game_version(db, game_id)
     db.commit()
     flash("Mitglied wurde gelöscht.", "info")
     return redirect(url_for("games.detail", game_id=game_id))
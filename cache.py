@@ -0,0 +1,223 @@
+"""
+cache.py
+--------
+Zweistufiger Ergebnis-Cache für berechnete Seiten-Daten (z. B. Auswertung).
+
+  L1: In-Process-LRU je Gunicorn-Worker (thread-sicher)
+  L2: optionaler geteilter Backend-Speicher, damit alle Worker profitieren
+      - file:<verzeichnis>   JSON-Dateien (Default: file:data/cache)
+      - redis://...          Redis (optional, benötigt das Paket `redis`)
+      - leer                 nur L1
+
+Werte müssen JSON-serialisierbar sein. Invalidiert wird nicht aktiv, sondern
+über versionierte Schlüssel (siehe evaluation.py): ein neuer Schlüssel
+verdrängt alte Einträge mit der Zeit per LRU/TTL.
+
+Konfiguration per ENV:
+  - CACHE_BACKEND_URL   (Default: file:data/cache)
+  - CACHE_LRU_SIZE      Einträge je Worker (Default: 256)
+  - CACHE_TTL           Sekunden im geteilten Backend (Default: 86400)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import redis as _redis
+except ImportError:  # optional
+    _redis = None
+
+_MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class FileBackend:
+    """Eine JSON-Datei je Schlüssel; verdrängt die ältesten über `max_entries`."""
+
+    def __init__(self, directory, ttl_seconds: float = 86400, max_entries: int = 1024):
+        self.directory = Path(directory)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / (hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl_seconds:
+                path.unlink()
+                return _MISSING
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return _MISSING
+        return data["value"] if data.get("key") == key else _MISSING
+
+    def set(self, key: str, value: Any) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "value": value}, f)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        self._evict()
+
+    def _evict(self) -> None:
+        paths = list(self.directory.glob("*.json"))
+        if len(paths) <= self.max_entries:
+            return
+
+        def mtime(p: Path) -> float:
+            try:
+                return p.stat().st_mtime
+            except OSError:
+                return 0.0
+
+        paths.sort(key=mtime)
+        for path in paths[: len(paths) - self.max_entries]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+class RedisBackend:
+    def __init__(self, url: str, ttl_seconds: float = 86400, prefix: str = "tipptrace:"):
+        if _redis is None:
+            raise RuntimeError("CACHE_BACKEND_URL=redis://… benötigt das Paket 'redis'.")
+        self.client = _redis.Redis.from_url(url)
+        self.ttl_seconds = int(ttl_seconds)
+        self.prefix = prefix
+
+    def get(self, key: str):
+        raw = self.client.get(self.prefix + key)
+        return _MISSING if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl_seconds)
+
+
+class ResultCache:
+    """L1 (LRU) vor optionalem L2 (geteilt), mit Hit/Miss-Zählern."""
+
+    def __init__(self, lru: LRUCache, shared=None):
+        self.lru = lru
+        self.shared = shared
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hits_local": 0, "hits_shared": 0, "misses": 0, "errors": 0}
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def get(self, key: str, default=None):
+        value = self.lru.get(key, _MISSING)
+        if value is not _MISSING:
+            self._count("hits_local")
+            return value
+        if self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except Exception:
+                self._count("errors")
+                value = _MISSING
+            if value is not _MISSING:
+                self._count("hits_shared")
+                self.lru.set(key, value)
+                return value
+        self._count("misses")
+        return default
+
+    def set(self, key: str, value: Any) -> None:
+        self.lru.set(key, value)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value)
+            except Exception:
+                # Geteilter Cache ist nur Beschleunigung – Fehler nicht durchreichen
+                self._count("errors")
+
+    def get_or_compute(self, key: str, compute):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["local_entries"] = len(self.lru)
+        stats["backend"] = type(self.shared).__name__ if self.shared is not None else None
+        return stats
+
+
+def _backend_from_url(url: str, ttl: float):
+    if not url:
+        return None
+    if url.startswith("redis://") or url.startswith("rediss://"):
+        return RedisBackend(url, ttl_seconds=ttl)
+    if url.startswith("file:"):
+        return FileBackend(url[len("file:"):], ttl_seconds=ttl)
+    raise ValueError(f"Unbekanntes CACHE_BACKEND_URL-Schema: {url!r}")
+
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Prozessweiter Ergebnis-Cache gemäß ENV."""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                ttl = float(os.getenv("CACHE_TTL", "86400"))
+                _result_cache = ResultCache(
+                    LRUCache(int(os.getenv("CACHE_LRU_SIZE", "256"))),
+                    _backend_from_url(os.getenv("CACHE_BACKEND_URL", "file:data/cache"), ttl),
+                )
+    return _result_cache
@@ -0,0 +1,230 @@
+"""
+CLI-Kommandos (Flask-CLI), z. B.:
+
+    flask --app app:app kicktipp sync 3
+    flask --app app:app kicktipp sync-all --workers 8
+    flask --app app:app kicktipp worker
+    flask --app app:app standings rebuild
+    flask --app app:app db upgrade
+    flask --app app:app seed --games 5 --members 200
+    flask --app app:app import 3 liga.csv
+    flask --app app:app export 3 history -o verlauf.csv
+"""
+
+import datetime
+
+import click
+from flask import Flask
+from flask.cli import AppGroup
+
+kicktipp_cli = AppGroup("kicktipp", help="Kicktipp-Synchronisation.")
+standings_cli = AppGroup("standings", help="Tabelle current_standings pflegen.")
+db_cli = AppGroup("db", help="Schema-Migrationen.")
+
+
+def _parse_date(value):
+    return datetime.date.fromisoformat(value) if value else None
+
+
+@kicktipp_cli.command("sync")
+@click.argument("game_id", type=int)
+@click.option("--date", "as_of", help="Stichtag (YYYY-MM-DD), Standard: heute.")
+@click.option("--force", is_flag=True, help="Fetch-Cache ignorieren und voll abgleichen.")
+@click.option("--stream", is_flag=True, help="Seite inkrementell lesen und batchweise schreiben (große Ligen).")
+def sync_command(game_id, as_of, force, stream):
+    """Synchronisiert ein einzelnes Tippspiel."""
+    from kicktipp_sync import sync_kicktipp_game
+
+    summary = sync_kicktipp_game(game_id, as_of_date=_parse_date(as_of), force=force, stream=stream)
+    if summary.get("unchanged"):
+        click.echo(f"Spiel {game_id}: Seite unverändert, kein Abgleich nötig.")
+        return
+    click.echo(
+        f"Spiel {game_id}: {summary['scraped_count']} Spieler, "
+        f"{summary['created_members']} neue Mitglieder, "
+        f"Punkte {summary['points']}, Siege {summary['victories']}"
+    )
+
+
+@kicktipp_cli.command("sync-all")
+@click.option("--date", "as_of", help="Stichtag (YYYY-MM-DD), Standard: heute.")
+@click.option("--workers", type=int, default=None, help="Parallele Abrufe (Standard: KICKTIPP_HTTP_POOL_SIZE).")
+@click.option("--force", is_flag=True, help="Fetch-Cache ignorieren und voll abgleichen.")
+def sync_all_command(as_of, workers, force):
+    """Synchronisiert alle Tippspiele mit URL parallel."""
+    from kicktipp import HTTP_POOL_SIZE
+    from kicktipp_sync import sync_all_kicktipp_games
+
+    report = sync_all_kicktipp_games(
+        as_of_date=_parse_date(as_of), max_workers=workers or HTTP_POOL_SIZE, force=force
+    )
+    for r in report["games"]:
+        fetch = f"{r['fetch_seconds']:.2f}s" if r["fetch_seconds"] is not None else "-"
+        write = f"{r['write_seconds']:.2f}s" if r["write_seconds"] is not None else "-"
+        if not r["ok"]:
+            status = f"FEHLER ({r['error']})"
+        elif r["summary"].get("unchanged"):
+            status = "unverändert"
+        else:
+            status = "OK"
+        click.echo(f"Spiel {r['game_id']}: {status} – Abruf {fetch}, Schreiben {write}")
+    click.echo(
+        f"{report['succeeded']} erfolgreich, {report['failed']} fehlgeschlagen "
+        f"in {report['total_seconds']:.2f}s"
+    )
+    if report["failed"]:
+        raise SystemExit(1)
+
+
+@kicktipp_cli.command("worker")
+@click.option("--poll", type=float, default=2.0, show_default=True, help="Sekunden zwischen Abfragen der Queue.")
+@click.option("--once", is_flag=True, help="Nur fällige Jobs abarbeiten, dann beenden.")
+def worker_command(poll, once):
+    """Arbeitet eingeplante Sync-Jobs ab (Hintergrund-Prozess)."""
+    import logging
+    import signal
+    import threading
+
+    from jobs import run_worker
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+    processed = run_worker(poll_interval=poll, once=once, stop=stop)
+    click.echo(f"{processed} Job(s) bearbeitet.")
+
+
+@standings_cli.command("rebuild")
+@click.option("--game", "game_id", type=int, default=None, help="Nur dieses Tippspiel neu aufbauen.")
+def standings_rebuild_command(game_id):
+    """Baut current_standings aus den Punkte-/Sieg-Historien neu auf."""
+    from db import new_session
+    from evaluation import bump_game_version
+    from standings import rebuild_all_standings, refresh_standings
+
+    with new_session() as db:
+        if game_id is None:
+            game_ids = rebuild_all_standings(db)
+        else:
+            refresh_standings(db, game_id)
+            game_ids = [game_id]
+        for gid in game_ids:
+            bump_game_version(db, gid)
+        db.commit()
+    click.echo(f"current_standings für {len(game_ids)} Tippspiel(e) neu aufgebaut.")
+
+
+@db_cli.command("upgrade")
+def db_upgrade_command():
+    """Wendet ausstehende Migrationen an."""
+    import db
+    from migrations import run_migrations
+
+    applied = run_migrations(db.engine)
+    click.echo("Angewendet: " + ", ".join(applied) if applied else "Schema ist aktuell.")
+
+
+@db_cli.command("status")
+def db_status_command():
+    """Zeigt angewendete und ausstehende Migrationen."""
+    import db
+    from migrations import MIGRATIONS, pending_migrations
+
+    pending = set(pending_migrations(db.engine))
+    for mid, _ in MIGRATIONS:
+        click.echo(f"{'ausstehend' if mid in pending else 'angewendet'}  {mid}")
+
+
+@click.command("seed")
+@click.option("--games", type=int, default=5, show_default=True)
+@click.option("--members", type=int, default=50, show_default=True, help="Mitglieder je Spiel.")
+@click.option("--statuses", type=int, default=34, show_default=True, help="Punkte-/Siegstände je Mitglied.")
+@click.option("--ranks", type=int, default=3, show_default=True, help="Platzierungsregeln je Spiel.")
+@click.option("--seed", "random_seed", type=int, default=1, show_default=True)
+@click.option("--reset", is_flag=True, help="Vorher ALLE vorhandenen Daten löschen.")
+def seed_command(games, members, statuses, ranks, random_seed, reset):
+    """Befüllt die Datenbank mit synthetischen Testdaten."""
+    from db import new_session
+    from seed import reset_database, seed
+
+    with new_session() as db:
+        if reset:
+            reset_database(db)
+        counts = seed(db, games=games, members=members, statuses=statuses, ranks=ranks, random_seed=random_seed)
+        db.commit()
+    click.echo(", ".join(f"{name}: {count}" for name, count in counts.items()))
+
+
+@click.command("import")
+@click.argument("game_id", type=int)
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "json"]), default=None, help="Standard: aus Dateiendung.")
+@click.option("--chunk-size", type=int, default=1000, show_default=True, help="Zeilen je Transaktion.")
+@click.option("--skip-invalid", is_flag=True, help="Ungültige Zeilen überspringen statt abzubrechen.")
+@click.option("--dry-run", is_flag=True, help="Nur validieren, nichts schreiben.")
+def import_command(game_id, path, fmt, chunk_size, skip_invalid, dry_run):
+    """Importiert Mitglieder und Punkte-/Siegstände aus CSV/JSON."""
+    from pathlib import Path
+
+    from db import new_session
+    from importer import ImportFileError, import_file
+    from models import TippingGame
+
+    def progress(report, processed, total):
+        click.echo(
+            f"Chunk {report.chunks}: {processed}/{total} Zeilen – {report.created_members} Mitglieder, "
+            f"{report.points_created} Punkte-, {report.victories_created} Siegstände"
+        )
+
+    with new_session() as db:
+        game = db.get(TippingGame, game_id)
+        if game is None:
+            raise click.ClickException(f"TippingGame mit id={game_id} nicht gefunden.")
+        try:
+            report = import_file(
+                db, game, Path(path).read_bytes(), fmt=fmt, filename=path, chunk_size=chunk_size,
+                skip_invalid=skip_invalid, dry_run=dry_run, progress=progress,
+            )
+        except ImportFileError as e:
+            raise click.ClickException(str(e))
+
+    for line, message in report.errors:
+        click.echo(f"Zeile {line}: {message}", err=True)
+    if report.errors and not (skip_invalid or dry_run):
+        raise click.ClickException(f"{report.invalid} ungültige Zeile(n) – nichts importiert (--skip-invalid?).")
+    click.echo(
+        f"{report.rows} Zeilen{' geprüft' if dry_run else ''}, {report.invalid} ungültig; "
+        f"{report.created_members} Mitglieder, {report.points_created} Punkte-, {report.victories_created} Siegstände "
+        f"angelegt, {report.skipped_duplicates} bereits vorhanden."
+    )
+
+
+@click.command("export")
+@click.argument("game_id", type=int)
+@click.argument("kind", type=click.Choice(["evaluation", "payouts", "history"]))
+@click.option("--format", "fmt", type=click.Choice(["csv", "json"]), default="csv", show_default=True)
+@click.option("-o", "--output", type=click.File("w", encoding="utf-8", lazy=True), default="-", help="Standard: stdout.")
+def export_command(game_id, kind, fmt, output):
+    """Exportiert Auswertung, Ausschüttungen oder Verlauf als CSV/JSON."""
+    from db import new_session
+    from exporter import export_game
+    from models import TippingGame
+
+    with new_session() as db:
+        game = db.get(TippingGame, game_id)
+        if game is None:
+            raise click.ClickException(f"TippingGame mit id={game_id} nicht gefunden.")
+        if kind != "history" and not game.config:
+            raise click.ClickException("Tippspiel hat noch keine Konfiguration.")
+        for chunk in export_game(db, game, kind, fmt):
+            output.write(chunk)
+
+
+def register_cli(app: Flask) -> None:
+    app.cli.add_command(kicktipp_cli)
+    app.cli.add_command(standings_cli)
+    app.cli.add_command(db_cli)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(import_command)
+    app.cli.add_command(export_command)
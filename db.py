@@ -1,26 +1,221 @@
-from sqlalchemy import create_engine
+import logging
+import os
+import random
+import time
+
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
 from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base
-from flask import g
+from flask import current_app, g, has_request_context, request
+
+import metrics
 
 engine = None
 SessionLocal = None
+# Optionales Lese-Replikat (DATABASE_REPLICA_URI)
+replica_engine = None
+ReplicaSessionLocal = None
 Base = declarative_base()
 
+logger = logging.getLogger(__name__)
+
+# SQLite-Profil (per ENV überschreibbar; SQLITE_TUNING=0 = altes Verhalten)
+SQLITE_TUNING = os.getenv("SQLITE_TUNING", "1") != "0"
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(128 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-16000")),  # negativ = KiB
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+SQLITE_BEGIN_RETRIES = int(os.getenv("SQLITE_BEGIN_RETRIES", "5"))
+SQLITE_BEGIN_BACKOFF = float(os.getenv("SQLITE_BEGIN_BACKOFF", "0.05"))
+
+# Pool-Profil für Server-Datenbanken (Postgres, z. B. Supabase)
+DB_POOL = os.getenv("DB_POOL", "queue")  # "queue" oder "null" (keine eigene Poolung, z. B. hinter PgBouncer)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Sekunden; -1 = aus
+DB_POOL_LIFO = os.getenv("DB_POOL_LIFO", "1") != "0"
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") != "0"
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "0") != "0"
+
+# Nach einem Schreibzugriff liest der Browser so lange vom Primary (Replikations-Verzögerung)
+REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", "10"))
+_PRIMARY_COOKIE = "tt_primary_until"
+
+# Lesende Requests starten eine normale (verzögerte) Transaktion
+_READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
 
 def _is_sqlite(url: str) -> bool:
     return url.startswith("sqlite:")
 
 
-def init_engine_and_session(database_url: str):
+def _install_query_hooks(engine) -> None:
+    """Meldet Dauer jedes SQL-Statements an metrics.py (Zählung je Request, langsame Queries)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        metrics.record_query(statement, time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        # after_cursor_execute entfällt bei Fehlern
+        stack = context.connection.info.get("query_started") if context.connection is not None else None
+        if stack:
+            stack.pop()
+
+
+def _is_sqlite_file(url: str) -> bool:
+    # In-Memory-DBs teilen sich je Thread EINE Verbindung (SingletonThreadPool):
+    # dort weder WAL noch eigene Transaktionssteuerung
+    database = make_url(url).database
+    return bool(database) and database != ":memory:" and "mode=memory" not in url
+
+
+def _is_lock_error(exc: OperationalError) -> bool:
+    message = str(exc.orig).lower()
+    return "locked" in message or "busy" in message
+
+
+def read_only(view):
     """
-    Initialisiert die globale Engine/Session.
-    - pool_pre_ping für stabile Verbindungen (wichtig bei Cloud-DBs wie Supabase)
-    - SQLite: check_same_thread=False für Flask-Threading
+    Markiert einen Handler als rein lesend, auch wenn er per POST aufgerufen
+    wird (z. B. Berechnungen mit JSON-Body): verzögertes BEGIN statt
+    Schreibsperre, Replikat wie bei GET, kein Primary-Cookie.
     """
-    global engine, SessionLocal
-    if engine is not None:
+    view.read_only = True
+    return view
+
+
+def in_read_request() -> bool:
+    """True in lesenden Requests (GET/HEAD, `read_only`): dort beginnen Transaktionen verzögert."""
+    if not has_request_context():
+        return False
+    if request.method in _READ_METHODS:
+        return True
+    view = current_app.view_functions.get(request.endpoint) if request.endpoint else None
+    return getattr(view, "read_only", False)
+
+
+def _begin_statement(conn) -> str:
+    """
+    Schreibende Transaktionen (Formular-POSTs, CLI, Sync, Hintergrund-Threads,
+    `new_session`) holen die Schreibsperre gleich mit BEGIN IMMEDIATE. Eine
+    verzögerte Transaktion, die erst liest und dann schreibt, kann unter WAL
+    nicht auf die Sperre warten (SQLITE_BUSY ohne busy_timeout), wenn
+    inzwischen ein anderer Prozess geschrieben hat – lesende Requests
+    schreiben deshalb nie in ihrer eigenen Session, sondern über `new_session`.
+    """
+    if in_read_request() and not conn.get_execution_options().get("begin_immediate"):
+        return "BEGIN"
+    return "BEGIN IMMEDIATE"
+
+
+def _configure_sqlite(engine) -> None:
+    """
+    Produktionsprofil für SQLite (mehrere Gunicorn-Worker auf einer Datei):
+    - Pragmas je Verbindung: WAL (Leser blockieren Schreiber nicht und
+      umgekehrt), synchronous, busy_timeout, mmap_size, cache_size, temp_store
+    - Transaktionen selbst steuern (pysqlite-Autobegin aus) und schreibende
+      mit BEGIN IMMEDIATE beginnen; ist die Sperre auch nach busy_timeout
+      belegt, wird das BEGIN mit exponentiellem Backoff wiederholt
+    """
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in SQLITE_PRAGMAS.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        statement = _begin_statement(conn)
+        for attempt in range(SQLITE_BEGIN_RETRIES + 1):
+            try:
+                conn.exec_driver_sql(statement)
+                return
+            except OperationalError as e:
+                if attempt == SQLITE_BEGIN_RETRIES or not _is_lock_error(e):
+                    raise
+                delay = SQLITE_BEGIN_BACKOFF * (2 ** attempt) * (0.5 + random.random())
+                logger.warning("SQLite gesperrt (%s), neuer Versuch in %.2fs", statement, delay)
+                time.sleep(delay)
+
+
+class _CheckoutTimer:
+    """Misst die Wartezeit beim Checkout (inkl. Verbindungsaufbau) für metrics.py."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            metrics.observe_pool_checkout(time.perf_counter() - started, timed_out=True)
+            raise
+        metrics.observe_pool_checkout(time.perf_counter() - started)
+        return connection
+
+
+class _TimedQueuePool(_CheckoutTimer, QueuePool):
+    pass
+
+
+class _TimedNullPool(_CheckoutTimer, NullPool):
+    pass
+
+
+def _server_pool_kwargs(database_url: str) -> dict:
+    """
+    Pool-Profil aus ENV (DB_POOL*, DB_MAX_OVERFLOW, DB_PGBOUNCER):
+    - LIFO hält wenige Verbindungen warm, der Rest läuft über pool_recycle aus
+    - pool_pre_ping kostet je Checkout einen Roundtrip und lässt sich abschalten
+      (dann fängt pool_recycle die meisten toten Verbindungen ab)
+    - PgBouncer (Transaktions-Pooling): keine serverseitigen Prepared
+      Statements (psycopg 3); psycopg2 nutzt ohnehin keine
+    Je Prozess gilt höchstens pool_size + max_overflow Verbindungen; mal der
+    Gunicorn-Worker muss das unter dem Verbindungslimit der DB bleiben.
+    """
+    kwargs = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    if DB_POOL == "null":
+        kwargs["poolclass"] = _TimedNullPool
+    else:
+        kwargs.update(
+            poolclass=_TimedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_use_lifo=DB_POOL_LIFO,
+        )
+    if DB_PGBOUNCER and make_url(database_url).get_driver_name() == "psycopg":
+        kwargs["connect_args"] = {"prepare_threshold": None}
+    return kwargs
+
+
+def _register_pool_gauges(engine) -> None:
+    if not isinstance(engine.pool, QueuePool):
         return
+    # engine.pool jedes Mal neu lesen: dispose() ersetzt den Pool
+    metrics.registry.register_gauges(lambda: {
+        "tipptrace_db_pool_checked_out": engine.pool.checkedout(),
+        "tipptrace_db_pool_capacity": engine.pool.size() + max(DB_MAX_OVERFLOW, 0),
+    })
 
+
+def _create_engine(database_url: str, replica: bool = False):
     engine_kwargs = {
         "future": True,
         "pool_pre_ping": True,
@@ -29,14 +224,97 @@ def init_engine_and_session(database_url: str):
     if _is_sqlite(database_url):
         # SQLite: mehr Toleranz für parallele Threads (Gunicorn-Worker sprechen je eigenen Prozess)
         engine_kwargs["connect_args"] = {"check_same_thread": False}
+    else:
+        engine_kwargs.update(_server_pool_kwargs(database_url))
+
+    new_engine = create_engine(database_url, **engine_kwargs)
+    _install_query_hooks(new_engine)
+    if not _is_sqlite(database_url) and not replica:
+        _register_pool_gauges(new_engine)
+        logger.info(
+            "DB-Pool: %s, size=%s, max_overflow=%s, timeout=%ss, recycle=%ss, lifo=%s, pre_ping=%s, pgbouncer=%s",
+            type(new_engine.pool).__name__, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+            DB_POOL_RECYCLE, DB_POOL_LIFO, DB_POOL_PRE_PING, DB_PGBOUNCER,
+        )
+    if _is_sqlite_file(database_url) and SQLITE_TUNING:
+        _configure_sqlite(new_engine)
+    if replica and _is_sqlite(database_url):
+        # Wie ein Postgres-Standby: versehentliche Schreibzugriffe schlagen fehl
+        @event.listens_for(new_engine, "connect")
+        def _query_only(dbapi_connection, connection_record):
+            dbapi_connection.execute("PRAGMA query_only=1")
+    return new_engine
 
-    engine = create_engine(database_url, **engine_kwargs)
+
+def init_engine_and_session(database_url: str, replica_url: str = None):
+    """
+    Initialisiert die globale Engine/Session.
+    - Server-DBs: Pool-Profil aus `_server_pool_kwargs` (ENV), Wartezeit und
+      Auslastung des Pools landen in metrics.py
+    - SQLite: check_same_thread=False für Flask-Threading, dazu das
+      Produktionsprofil aus `_configure_sqlite` (abschaltbar mit SQLITE_TUNING=0)
+    - optional `replica_url`: lesende Requests laufen über das Replikat (siehe get_db)
+    """
+    global engine, SessionLocal, replica_engine, ReplicaSessionLocal
+    if engine is not None:
+        return
+
+    engine = _create_engine(database_url)
     SessionLocal = scoped_session(
         sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
     )
+    event.listen(SessionLocal, "after_commit", _mark_committed)
+    if replica_url:
+        replica_engine = _create_engine(replica_url, replica=True)
+        ReplicaSessionLocal = scoped_session(
+            sessionmaker(bind=replica_engine, autoflush=False, autocommit=False, future=True, info={"replica": True})
+        )
+
+
+def dispose_engines(close: bool = True) -> None:
+    """
+    Verwirft die Verbindungspools (Primary und Replikat).
+    - close=True: Verbindungen schließen – im Gunicorn-Master vor dem Forken,
+      damit kein Worker einen Socket/Dateihandle des Masters erbt
+    - close=False: nach dem Fork im Worker; geerbte Verbindungen werden nur
+      vergessen, nicht geschlossen (sie gehören dem Master). Die nächste
+      Session baut einen frischen Pool auf.
+    """
+    for e in (engine, replica_engine):
+        if e is not None:
+            e.dispose(close=close)
+
+
+def _mark_committed(session):
+    if has_request_context():
+        g.db_committed = True
+
+
+def _use_replica() -> bool:
+    if ReplicaSessionLocal is None or not in_read_request():
+        return False
+    try:
+        primary_until = float(request.cookies.get(_PRIMARY_COOKIE, 0))
+    except ValueError:
+        primary_until = 0
+    return primary_until < time.time()
 
 
 def get_db():
+    """
+    Request-scoped Session. Ist ein Replikat konfiguriert, bekommen lesende
+    Requests (GET/HEAD, `read_only`) eine Replikat-Session – außer der Browser hat gerade
+    geschrieben (Cookie aus `remember_primary`, read-your-writes). GET-Handler,
+    die schreiben müssen, nehmen `get_primary_db()`.
+    """
+    if _use_replica():
+        if "replica_db" not in g:
+            g.replica_db = ReplicaSessionLocal()
+        return g.replica_db
+    return get_primary_db()
+
+
+def get_primary_db():
     # Request-scoped session via Flask's g
     if "db" not in g:
         if SessionLocal is None:
@@ -45,13 +323,44 @@ def get_db():
     return g.db
 
 
+def primary_for(session):
+    """Schreibfähige Session zu `session` (im Request: die Primary-Session statt des Replikats)."""
+    if session.info.get("replica"):
+        return get_primary_db()
+    return session
+
+
+def remember_primary(response):
+    """after_request: nach einem Schreibzugriff eine Weile vom Primary lesen."""
+    if ReplicaSessionLocal is not None and (not in_read_request() or g.get("db_committed")):
+        response.set_cookie(
+            _PRIMARY_COOKIE,
+            str(int(time.time()) + REPLICA_STICKY_SECONDS),
+            max_age=REPLICA_STICKY_SECONDS,
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+def new_session():
+    """
+    Eigenständige Session auf dem Primary (CLI, Hintergrundjobs – und
+    Schreibzugriffe aus lesenden Requests). Beginnt immer mit BEGIN IMMEDIATE.
+    """
+    if SessionLocal is None:
+        raise RuntimeError("Database not initialized. Call init_engine_and_session first.")
+    return SessionLocal.session_factory(bind=engine.execution_options(begin_immediate=True))
+
+
 def close_db(e=None):
-    db = g.pop("db", None)
-    if db is not None:
-        db.close()
+    for key in ("db", "replica_db"):
+        db = g.pop(key, None)
+        if db is not None:
+            db.close()
 
 
 def init_db():
-    # Import der Modelle registriert die Tabellen am Base.metadata
-    from models import TippingGame, Member, PaymentMethod, VictoryStatus, PointsStatus  # noqa: F401
-    Base.metadata.create_all(bind=engine)
+    # Schema über migrations.py (legt Tabellen an und ergänzt bestehende DBs)
+    from migrations import run_migrations
+    run_migrations(engine)
@@ -0,0 +1,263 @@
+"""
+evaluation.py
+-------------
+Berechnung der Auswertung (Töpfe, Ranking, Ausschüttungen) eines Tippspiels
+und deren versionierter Cache.
+
+Jedes Spiel hat einen Änderungszähler (`game_versions`). Alle Schreibpfade,
+die das Ergebnis beeinflussen (Spiel/Einsatz, Konfiguration, Platzierungs-
+regeln, Mitglieder, Status-Einträge, Kicktipp-Sync), rufen vor ihrem Commit
+`bump_game_version` auf. Die Auswertung wird unter (Spiel, Version) gecacht –
+eine Änderung erzeugt also einfach einen neuen Schlüssel, es muss nichts
+aktiv gelöscht werden.
+
+Die Version wird VOR der Berechnung gelesen: ein parallel committeter
+Schreibvorgang kann damit höchstens neuere Daten unter einem alten Schlüssel
+ablegen, nie veraltete unter einem neuen.
+
+Die Beträge rechnet payouts.py in ganzen Cent (ein Aufruf für alle Plätze).
+
+Stichtag (`as_of`): Stände und Ausschüttungen, wie sie an einem vergangenen
+Tag galten (letzter Eintrag <= Stichtag je Mitglied). Mitglieder, Einsatz und
+Konfiguration sind die heutigen – es gibt keine Historie dafür.
+
+Saisonverlauf (`compute_timeline`): Ranking und Ausschüttung für JEDEN Tag mit
+Status-Einträgen in einem Durchlauf – eine nach Datum sortierte Query über
+beide Status-Tabellen (wie history.py), fortgeschriebener Stand je Mitglied,
+am Ende jedes Tags neu sortiert. Da sich von Tag zu Tag nur wenige Plätze
+ändern, sortiert Timsort die vorige Reihenfolge nahezu linear.
+"""
+
+from __future__ import annotations
+
+import datetime
+import secrets
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from cache import get_result_cache
+from history import FETCH_SIZE, POINTS, iso_date, status_rows
+from models import GameVersion, Member, TippingGame
+from payouts import PayoutConfig, compute_payouts, format_cents
+from queries import latest_statuses_for_game
+from standings import load_standings, ranking_key
+
+# -------------------------------
+# Versionszähler
+# -------------------------------
+def get_game_version(db: Session, game_id: int) -> int:
+    version = db.scalar(select(GameVersion.version).where(GameVersion.game_id == game_id))
+    return version or 0
+
+
+def get_existing_game_version(db: Session, game_id: int) -> Optional[int]:
+    """Wie get_game_version, aber None, wenn das Spiel nicht (mehr) existiert – eine Query."""
+    row = db.execute(
+        select(TippingGame.id, GameVersion.version)
+        .outerjoin(GameVersion, GameVersion.game_id == TippingGame.id)
+        .where(TippingGame.id == game_id)
+    ).first()
+    if row is None:
+        return None
+    return row.version or 0
+
+
+def bump_game_version(db: Session, game_id: int) -> None:
+    """Erhöht den Änderungszähler des Spiels (ohne Commit)."""
+    db.flush()  # Fehler ausstehender Änderungen nicht im Savepoint unten abfangen
+    bumped = db.execute(
+        update(GameVersion)
+        .where(GameVersion.game_id == game_id)
+        .values(version=GameVersion.version + 1)
+    )
+    if bumped.rowcount:
+        return
+    try:
+        # Zufälliger Startwert: nach einem Neuaufsetzen der Datenbank (gleiche
+        # Spiel-IDs) trifft man keine alten Einträge im geteilten Cache.
+        with db.begin_nested():
+            db.execute(insert(GameVersion).values(game_id=game_id, version=secrets.randbelow(2**31)))
+    except IntegrityError:
+        # parallel angelegt – dann eben hochzählen
+        db.execute(
+            update(GameVersion)
+            .where(GameVersion.game_id == game_id)
+            .values(version=GameVersion.version + 1)
+        )
+
+
+# -------------------------------
+# Berechnung
+# -------------------------------
+def _standings_as_of(db: Session, game: TippingGame, as_of: datetime.date) -> List[Tuple[Member, object]]:
+    """Wie load_standings, aber mit dem letzten Stand <= as_of (sortiert wie die Rangliste)."""
+    latest = latest_statuses_for_game(db, game.id, as_of=as_of)
+    # bei Gleichstand in allem: kleinere Mitglieds-ID zuerst (stabile Sortierung)
+    members = db.scalars(select(Member).where(Member.game_id == game.id).order_by(Member.id)).all()
+    return sorted(
+        ((m, latest[m.id]) for m in members),
+        key=lambda pair: ranking_key(pair[1].points, pair[1].victories, pair[0].last_name, pair[0].first_name),
+        reverse=True,
+    )
+
+
+def compute_evaluation(db: Session, game: TippingGame, as_of: Optional[datetime.date] = None) -> dict:
+    """
+    Auswertung als reine Daten (JSON-tauglich, Geldbeträge als Strings mit
+    zwei Nachkommastellen). Setzt eine vorhandene Konfiguration voraus.
+    Mit `as_of`: Stand zu diesem Tag statt aktuell.
+    """
+    # Ranking (Punkte, Siege, Name) kommt fertig aus current_standings
+    standings = load_standings(db, game.id) if as_of is None else _standings_as_of(db, game, as_of)
+
+    # Beträge aller Plätze in einem Aufruf (ganze Cent, siehe payouts.py)
+    payouts = compute_payouts([PayoutConfig.from_game(game)], [standing.victories for _, standing in standings])
+    payout_victories, payout_placement, payout_total = payouts.victories[0], payouts.placement[0], payouts.total[0]
+
+    rows = []
+    for idx, (m, standing) in enumerate(standings, start=1):
+        rows.append(
+            {
+                "rank": idx,
+                "member_id": m.id,
+                "first_name": m.first_name,
+                "last_name": m.last_name,
+                "nickname": m.nickname,
+                "points": standing.points,
+                "victories": float(standing.victories),
+                "payout_victories": format_cents(payout_victories[idx - 1]),
+                "payout_placement": format_cents(payout_placement[idx - 1]),
+                "payout_total": format_cents(payout_total[idx - 1]),
+            }
+        )
+
+    return {
+        "game_id": game.id,
+        "as_of": as_of.isoformat() if as_of is not None else None,
+        "member_count": len(standings),
+        "total_stake": format_cents(payouts.total_stake[0]),
+        "victory_pot": format_cents(payouts.victory_pot[0]),
+        "placement_pot": format_cents(payouts.placement_pot[0]),
+        "per_matchday": format_cents(payouts.per_matchday[0]),
+        # Summe der Platzierungs-Prozente zur Info
+        "placement_percent_sum": str(sum((Decimal(pp.percent) for pp in game.placement_payouts), Decimal("0"))),
+        "rows": rows,
+    }
+
+
+def compute_timeline(db: Session, game: TippingGame) -> dict:
+    """
+    Platz und Ausschüttung aller Mitglieder an jedem Tag mit Status-Einträgen
+    (Spalten parallel zu `dates`, wie history.py). Ein Tag entspricht genau
+    `compute_evaluation(as_of=Tag)`.
+    """
+    members = db.execute(
+        select(Member.id, Member.first_name, Member.last_name, Member.nickname)
+        .where(Member.game_id == game.id)
+        .order_by(Member.id)
+    ).all()
+    position = {m.id: i for i, m in enumerate(members)}
+    count = len(members)
+
+    points = [0] * count
+    victories = [0.0] * count
+    order = list(range(count))
+    dates: List[str] = []
+    ranks: List[List[int]] = [[] for _ in range(count)]
+    leaders: List[List[int]] = []
+    # je Tag und Mitglied (Reihenfolge wie `members`): Platz und Siege –
+    # die Beträge rechnet payouts.py am Ende in einem Aufruf
+    flat_ranks: List[int] = []
+    flat_victories: List[float] = []
+
+    def close_day(day) -> None:
+        # Gleichstand wie in _standings_as_of: kleinere Mitglieds-ID zuerst
+        order.sort(
+            key=lambda i: ranking_key(points[i], victories[i], members[i].last_name, members[i].first_name) + (-i,),
+            reverse=True,
+        )
+        dates.append(iso_date(day))
+        day_ranks = [0] * count
+        for rank, i in enumerate(order, start=1):
+            day_ranks[i] = rank
+            ranks[i].append(rank)
+        flat_ranks.extend(day_ranks)
+        flat_victories.extend(victories)
+        leaders.append([members[i].id for i in order[:3]])
+
+    current = None
+    for chunk in status_rows(db, game.id, None).partitions(FETCH_SIZE):
+        for day, kind, member_id, value in chunk:
+            if day != current:
+                if current is not None:
+                    close_day(current)
+                current = day
+            if kind == POINTS:
+                points[position[member_id]] = int(value)
+            else:
+                victories[position[member_id]] = value
+    if current is not None:
+        close_day(current)
+
+    payouts = compute_payouts(
+        [PayoutConfig.from_game(game)], flat_victories, ranks=flat_ranks, member_count=count
+    )
+    flat_totals = [format_cents(c) for c in payouts.total[0]]
+    totals = [flat_totals[i::count] for i in range(count)] if count else []
+
+    return {
+        "game_id": game.id,
+        "member_count": count,
+        "total_stake": format_cents(payouts.total_stake[0]),
+        "dates": dates,
+        "members": [
+            {"id": m.id, "first_name": m.first_name, "last_name": m.last_name, "nickname": m.nickname}
+            for m in members
+        ],
+        "rank": ranks,
+        "payout_total": totals,
+        "top3": leaders,
+    }
+
+
+def evaluation_cache_key(game_id: int, version: int, as_of: Optional[datetime.date] = None) -> str:
+    return f"evaluation:{game_id}:v{version}" + (f":{as_of.isoformat()}" if as_of is not None else "")
+
+
+def evaluation_etag(game_id: int, version: int, as_of: Optional[datetime.date] = None) -> str:
+    """Starker ETag der JSON-Auswertung – ändert sich genau mit der Spielversion."""
+    return f"evaluation-{game_id}-{version}" + (f"-{as_of.isoformat()}" if as_of is not None else "")
+
+
+def get_evaluation(
+    db: Session,
+    game: TippingGame,
+    version: Optional[int] = None,
+    as_of: Optional[datetime.date] = None,
+) -> dict:
+    """
+    Auswertung aus dem Cache bzw. frisch berechnet; enthält zusätzlich
+    `version`. Gemeinsamer Pfad für HTML und JSON.
+    """
+    if version is None:
+        version = get_game_version(db, game.id)
+    result = get_result_cache().get_or_compute(
+        evaluation_cache_key(game.id, version, as_of),
+        lambda: compute_evaluation(db, game, as_of=as_of),
+    )
+    return dict(result, version=version)
+
+
+def get_timeline(db: Session, game: TippingGame, version: Optional[int] = None) -> dict:
+    """Saisonverlauf aus dem Cache (je Spielversion) bzw. frisch berechnet."""
+    if version is None:
+        version = get_game_version(db, game.id)
+    result = get_result_cache().get_or_compute(
+        f"timeline:{game.id}:v{version}",
+        lambda: compute_timeline(db, game),
+    )
+    return dict(result, version=version)
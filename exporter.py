@@ -0,0 +1,185 @@
+"""
+exporter.py
+-----------
+Export eines Tippspiels als CSV oder JSON – für die Buchhaltung, statt die
+Auswertungsseite abzuschreiben.
+
+Arten:
+  - evaluation: Auswertung je Mitglied (Platz, Punkte, Siege, Ausschüttungen)
+  - payouts:    Ausschüttungen je Mitglied mit E-Mail und Zahlungsart
+  - history:    kompletter Punkte-/Siegverlauf (eine Zeile je Status-Eintrag)
+
+Alles wird als Generator geliefert (Flask: `stream_with_context`, CLI: direkt
+in die Datei). Die Tabellenabfragen laufen mit `yield_per` – unter Postgres
+also über einen serverseitigen Cursor (`stream_results`), die Zeilen kommen
+in Blöcken zu EXPORT_BATCH_SIZE. Der Speicher bleibt damit unabhängig von der
+Länge des Verlaufs, und die ersten Bytes (Kopfzeile, erste Blöcke) gehen
+raus, bevor die Abfrage komplett durch ist.
+
+    flask --app app:app export 3 history --format csv -o verlauf.csv
+"""
+
+from __future__ import annotations
+
+import csv
+import heapq
+import io
+import json
+from typing import Iterable, Iterator, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from evaluation import get_evaluation
+from models import CurrentStanding, Member, PaymentMethod, PointsStatus, TippingGame, VictoryStatus
+
+EXPORT_BATCH_SIZE = 1000
+# ab dieser Puffergröße wird ein Block an den Client geschickt
+_CHUNK_BYTES = 64 * 1024
+
+EVALUATION_COLUMNS = (
+    "rank", "member_id", "nickname", "first_name", "last_name", "points", "victories",
+    "payout_victories", "payout_placement", "payout_total",
+)
+PAYOUT_COLUMNS = (
+    "rank", "member_id", "nickname", "first_name", "last_name", "email",
+    "payment_label", "payment_reference", "payout_victories", "payout_placement", "payout_total",
+)
+HISTORY_COLUMNS = ("member_id", "nickname", "date", "kind", "value")
+
+EXPORT_KINDS = ("evaluation", "payouts", "history")
+EXPORT_FORMATS = {"csv": "text/csv; charset=utf-8", "json": "application/json"}
+
+
+# -------------------------------
+# Zeilen
+# -------------------------------
+def iter_evaluation(db: Session, game: TippingGame) -> Iterator[dict]:
+    # die Auswertung liegt ohnehin komplett vor (Cache je Spielversion)
+    for row in get_evaluation(db, game)["rows"]:
+        yield {column: row[column] for column in EVALUATION_COLUMNS}
+
+
+def iter_payouts(db: Session, game: TippingGame) -> Iterator[dict]:
+    payouts = {row["member_id"]: row for row in get_evaluation(db, game)["rows"]}
+    stmt = (
+        select(Member.id, Member.nickname, Member.first_name, Member.last_name, Member.email,
+               PaymentMethod.label, PaymentMethod.reference)
+        .outerjoin(PaymentMethod, PaymentMethod.member_id == Member.id)
+        .outerjoin(CurrentStanding, CurrentStanding.member_id == Member.id)
+        .where(Member.game_id == game.id)
+        .order_by(CurrentStanding.rank, Member.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    for member_id, nickname, first_name, last_name, email, label, reference in db.execute(stmt):
+        row = payouts.get(member_id)
+        if row is None:
+            continue  # nach der Auswertung angelegt
+        yield {
+            "rank": row["rank"],
+            "member_id": member_id,
+            "nickname": nickname,
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": email,
+            "payment_label": label,
+            "payment_reference": reference,
+            "payout_victories": row["payout_victories"],
+            "payout_placement": row["payout_placement"],
+            "payout_total": row["payout_total"],
+        }
+
+
+def _history_query(model, value_column, game_id: int):
+    # IN statt JOIN: SQLite liest dann den Index (member_id, date) in
+    # Reihenfolge und sortiert nur noch Einträge desselben Tages nach id –
+    # kein Sortieren der Gesamtmenge, die ersten Zeilen kommen sofort
+    return (
+        select(model.member_id, model.date, value_column)
+        .where(model.member_id.in_(select(Member.id).where(Member.game_id == game_id)))
+        .order_by(model.member_id, model.date, model.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+
+def iter_history(db: Session, game_id: int) -> Iterator[dict]:
+    """Alle Status-Einträge des Spiels, sortiert nach Mitglied, Datum, Art."""
+    # Nicknames einmal vorab (wächst mit den Mitgliedern, nicht mit dem Verlauf)
+    nicknames = dict(db.execute(select(Member.id, Member.nickname).where(Member.game_id == game_id)).all())
+    points = (
+        (member_id, day, "points", int(value))
+        for member_id, day, value in db.execute(_history_query(PointsStatus, PointsStatus.points, game_id))
+    )
+    victories = (
+        (member_id, day, "victories", float(value))
+        for member_id, day, value in db.execute(_history_query(VictoryStatus, VictoryStatus.victories, game_id))
+    )
+    # beide Cursor parallel lesen und nach (Mitglied, Datum, Art) mischen
+    for member_id, day, kind, value in heapq.merge(points, victories, key=lambda r: r[:3]):
+        yield {
+            "member_id": member_id,
+            "nickname": nicknames.get(member_id),
+            "date": day.isoformat(),
+            "kind": kind,
+            "value": value,
+        }
+
+
+# -------------------------------
+# Formate
+# -------------------------------
+def stream_csv(columns: Tuple[str, ...], rows: Iterable[dict]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    # Kopfzeile sofort – der Client sieht, dass der Export läuft
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    for row in rows:
+        writer.writerow([row[column] for column in columns])
+        if buffer.tell() >= _CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_json(rows: Iterable[dict]) -> Iterator[str]:
+    """JSON-Liste, Element für Element geschrieben."""
+    yield "["
+    parts = []
+    size = 0
+    separator = ""
+    for row in rows:
+        part = separator + json.dumps(row, ensure_ascii=False)
+        separator = ","
+        parts.append(part)
+        size += len(part)
+        if size >= _CHUNK_BYTES:
+            yield "".join(parts)
+            parts, size = [], 0
+    parts.append("]\n")
+    yield "".join(parts)
+
+
+def export_game(db: Session, game: TippingGame, kind: str, fmt: str = "csv") -> Iterator[str]:
+    """Export als Generator von Textblöcken. ValueError bei unbekannter Art/Format."""
+    if kind == "evaluation":
+        columns, rows = EVALUATION_COLUMNS, iter_evaluation(db, game)
+    elif kind == "payouts":
+        columns, rows = PAYOUT_COLUMNS, iter_payouts(db, game)
+    elif kind == "history":
+        columns, rows = HISTORY_COLUMNS, iter_history(db, game.id)
+    else:
+        raise ValueError(f"Unbekannte Export-Art: {kind}")
+    if fmt == "csv":
+        return stream_csv(columns, rows)
+    if fmt == "json":
+        return stream_json(rows)
+    raise ValueError(f"Unbekanntes Format: {fmt}")
+
+
+def export_filename(game: TippingGame, kind: str, fmt: str) -> str:
+    return f"tippspiel-{game.id}-{kind}.{fmt}"
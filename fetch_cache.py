@@ -0,0 +1,134 @@
+"""
+fetch_cache.py
+--------------
+Persistenter Cache für Kicktipp-Abrufe, je Schlüssel (i. d. R. die URL) eine
+JSON-Datei mit ETag/Last-Modified, SHA-256 des Bodys und der geparsten
+Spielerliste.
+
+Damit kann ein Sync bedingt anfragen (If-None-Match / If-Modified-Since) und
+bei 304 oder identischem Inhalt Parsing und DB-Abgleich komplett überspringen.
+Einträge verfallen nach `ttl_seconds` (dann wird wieder voll abgeglichen);
+über `max_entries` hinaus werden die ältesten Einträge verdrängt.
+
+Konfiguration per ENV:
+  - KICKTIPP_CACHE_DIR          (Default: data/kicktipp_cache, leer = aus)
+  - KICKTIPP_CACHE_TTL          Sekunden (Default: 21600)
+  - KICKTIPP_CACHE_MAX_ENTRIES  (Default: 256)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    body_hash: str
+    players: List[dict] = field(default_factory=list)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    stored_at: float = 0.0
+
+
+class FetchCache:
+    def __init__(self, directory, max_entries: int = 256, ttl_seconds: float = 21600):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / (hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        entry = CacheEntry(**data)
+        if entry.key != key:
+            return None
+        if time.time() - entry.stored_at > self.ttl_seconds:
+            self.delete(key)
+            return None
+        return entry
+
+    def put(self, entry: CacheEntry) -> None:
+        entry.stored_at = time.time()
+        path = self._path(entry.key)
+        # Atomar schreiben (mehrere Gunicorn-Worker/Threads)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry.__dict__, f)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        self._evict()
+
+    def delete(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.json"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _evict(self) -> None:
+        paths = list(self.directory.glob("*.json"))
+        if len(paths) <= self.max_entries:
+            return
+
+        def mtime(p: Path) -> float:
+            try:
+                return p.stat().st_mtime
+            except OSError:
+                return 0.0
+
+        paths.sort(key=mtime)
+        for path in paths[: len(paths) - self.max_entries]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def body_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+_default_cache: Optional[FetchCache] = None
+
+
+def get_fetch_cache() -> Optional[FetchCache]:
+    """Prozessweiter Default-Cache gemäß ENV; None, wenn deaktiviert."""
+    global _default_cache
+    if _default_cache is None:
+        directory = os.getenv("KICKTIPP_CACHE_DIR", "data/kicktipp_cache")
+        if not directory:
+            return None
+        _default_cache = FetchCache(
+            directory,
+            max_entries=int(os.getenv("KICKTIPP_CACHE_MAX_ENTRIES", "256")),
+            ttl_seconds=float(os.getenv("KICKTIPP_CACHE_TTL", "21600")),
+        )
+    return _default_cache
@@ -0,0 +1,53 @@
+"""
+gunicorn.conf.py
+----------------
+Produktionsstart (Dockerfile, systemd):
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Mit `preload_app` importiert der Master die App genau einmal: Schema-Prüfung
+und Migrationen (`init_db`) laufen einmal statt in jedem Worker parallel,
+Modelle, Blueprints und kompilierte Templates liegen schon im Speicher
+(`app.preload`) und werden per Copy-on-Write geteilt. Das spart Startzeit und
+RAM je Worker (Raspberry Pi).
+
+Nach dem Fork verwirft jeder Worker die geerbten Verbindungspools und baut
+eigene auf (`db.dispose_engines(close=False)`), Metriken beginnen bei null.
+
+Konfiguration per ENV:
+  - PORT               (Default: 8000)
+  - GUNICORN_WORKERS   (Default: 2)
+  - GUNICORN_THREADS   (Default: 1)
+  - GUNICORN_TIMEOUT   (Default: 30)
+  - GUNICORN_LOG_LEVEL (Default: info)
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+accesslog = "-"
+preload_app = True
+
+
+def on_starting(server):
+    # Metrik-Dateien früherer Läufe (siehe metrics.py) – Zähler beginnen neu
+    import metrics
+
+    metrics.clear_dir()
+    if server.cfg.preload_app:
+        # App ist schon geladen (preload_app); nur noch vor dem Forken vorbereiten
+        from app import app, preload
+
+        preload(app)
+
+
+def post_fork(server, worker):
+    import metrics
+    from db import dispose_engines
+
+    dispose_engines(close=False)
+    metrics.reset_after_fork()
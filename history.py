@@ -0,0 +1,158 @@
+"""
+history.py
+----------
+Punkte-/Sieg-Verlauf eines Tippspiels in Spaltenform (für Diagramme).
+
+Ergebnis: eine Datumsachse plus je Mitglied ein Array Punkte und ein Array
+Siege, jeweils parallel zur Achse. Gelesen wird mit EINER nach Datum
+sortierten Query über beide Status-Tabellen (UNION ALL) auf Core-Ebene, die
+in einem Durchlauf in flache Listen-Puffer (ein Snapshot je Datum) gefegt und
+am Ende transponiert wird – ohne ORM-Objekte.
+
+- fill=True: Treppenfunktion – zwischen zwei Einträgen gilt der letzte Wert
+  (vor dem ersten Eintrag: null).
+- fill=False: nur an Tagen mit Eintrag ein Wert, sonst null.
+- max_points: Achse wird in gleich große Abschnitte geteilt; je Abschnitt
+  bleibt das letzte Datum mit dem jeweils letzten Wert darin.
+
+Bei mehreren Einträgen am selben Tag zählt (wie überall) der zuletzt angelegte.
+"""
+
+from __future__ import annotations
+
+import datetime
+from typing import List, Optional
+
+from sqlalchemy import Float, String, cast, literal, select, type_coerce, union_all
+from sqlalchemy.orm import Session
+
+from models import Member, PointsStatus, VictoryStatus
+
+POINTS, VICTORIES = 0, 1
+FETCH_SIZE = 10_000
+
+
+def status_rows(db: Session, game_id: int, end: Optional[datetime.date]):
+    parts = []
+    for kind, model, column in (
+        (POINTS, PointsStatus, PointsStatus.points),
+        (VICTORIES, VictoryStatus, VictoryStatus.victories),
+    ):
+        stmt = (
+            select(
+                # Datum roh durchreichen (SQLite: ISO-String) – spart das Parsen je Zeile
+                type_coerce(model.date, String).label("date"),
+                literal(kind).label("kind"),
+                model.id.label("id"),
+                model.member_id.label("member_id"),
+                cast(column, Float).label("value"),
+            )
+            .join(Member, Member.id == model.member_id)
+            .where(Member.game_id == game_id)
+        )
+        if end is not None:
+            stmt = stmt.where(model.date <= end)
+        parts.append(stmt)
+    union = union_all(*parts).subquery()
+    return db.connection().execute(
+        select(union.c.date, union.c.kind, union.c.member_id, union.c.value)
+        .order_by(union.c.date, union.c.kind, union.c.id)
+    )
+
+
+def iso_date(day) -> str:
+    return day if isinstance(day, str) else day.isoformat()
+
+
+def _downsample(dates: list, snapshots: List[list], max_points: int):
+    """Je Abschnitt letztes Datum und je Mitglied der letzte vorhandene Wert."""
+    n = len(dates)
+    bounds = [round(i * n / max_points) for i in range(max_points + 1)]
+    new_dates = []
+    new_snapshots: List[list] = [[] for _ in snapshots]
+    for lo, hi in zip(bounds, bounds[1:]):
+        if hi <= lo:
+            continue
+        new_dates.append(dates[hi - 1])
+        for kind, rows in enumerate(snapshots):
+            merged = list(rows[lo])
+            for row in rows[lo + 1:hi]:
+                for i, v in enumerate(row):
+                    if v is not None:
+                        merged[i] = v
+            new_snapshots[kind].append(merged)
+    return new_dates, new_snapshots
+
+
+def game_history(
+    db: Session,
+    game_id: int,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    fill: bool = True,
+    max_points: Optional[int] = None,
+) -> dict:
+    members = db.execute(
+        select(Member.id, Member.first_name, Member.last_name, Member.nickname)
+        .where(Member.game_id == game_id)
+        .order_by(Member.id)
+    ).all()
+    position = {m.id: i for i, m in enumerate(members)}
+    count = len(members)
+    first_day = start.isoformat() if start is not None else None
+
+    # Zeilenweise Puffer: je Datum ein Snapshot (Liste je Mitglied) pro Serie;
+    # `state` ist die Treppenfunktion, `touched` nur die Werte des laufenden Tags.
+    state = [[None] * count, [None] * count]
+    touched = [[None] * count, [None] * count]
+    snapshots: List[list] = [[], []]
+    dates: list = []
+
+    def close_day(day) -> None:
+        nonlocal touched
+        if first_day is None or iso_date(day) >= first_day:
+            dates.append(day)
+            for kind in (POINTS, VICTORIES):
+                snapshots[kind].append(state[kind][:] if fill else touched[kind])
+        if not fill:
+            touched = [[None] * count, [None] * count]
+
+    current = None
+    for chunk in status_rows(db, game_id, end).partitions(FETCH_SIZE):
+        for day, kind, member_id, value in chunk:
+            if day != current:
+                if current is not None:
+                    close_day(current)
+                current = day
+            i = position[member_id]
+            if kind == POINTS:
+                value = int(value)
+            state[kind][i] = value
+            touched[kind][i] = value
+    if current is not None:
+        close_day(current)
+
+    downsampled = max_points is not None and 0 < max_points < len(dates)
+    source_points = len(dates)
+    if downsampled:
+        dates, snapshots = _downsample(dates, snapshots, max_points)
+
+    # transponieren: ein Array je Mitglied
+    columns = [
+        [list(col) for col in zip(*rows)] if rows else [[] for _ in range(count)]
+        for rows in snapshots
+    ]
+
+    return {
+        "game_id": game_id,
+        "fill": fill,
+        "downsampled": downsampled,
+        "source_points": source_points,
+        "dates": [iso_date(d) for d in dates],
+        "members": [
+            {"id": m.id, "first_name": m.first_name, "last_name": m.last_name, "nickname": m.nickname}
+            for m in members
+        ],
+        "points": columns[POINTS],
+        "victories": columns[VICTORIES],
+    }
@@ -0,0 +1,318 @@
+"""
+importer.py
+-----------
+Massen-Import von Mitgliedern (inkl. Zahlungsart) und datierten Punkte-/
+Siegständen aus CSV oder JSON – statt einzelner Formular-Posts.
+
+Format: eine Zeile je Eintrag (CSV mit Kopfzeile, Trennzeichen , oder ;
+wird erkannt; JSON als Liste von Objekten mit denselben Schlüsseln):
+
+    nickname, first_name, last_name, email, payment_label, payment_reference,
+    date, points, victories
+
+- `nickname` ist der Schlüssel je Tippspiel. Unbekannte Nicknames werden als
+  Mitglied angelegt (Pflicht wie im Formular: Vor-/Nachname, E-Mail,
+  Zahlungsart); bestehende Mitglieder werden nicht verändert.
+- Mit `date` (YYYY-MM-DD oder TT.MM.JJJJ) und `points` und/oder `victories`
+  wird ein Stand angelegt. Ein identischer Stand (Mitglied, Datum, Wert), der
+  schon existiert, wird übersprungen – erneutes Importieren derselben Datei
+  ändert nichts.
+
+Ablauf: erst alle Zeilen validieren (Fehler mit Zeilennummer; ohne
+`skip_invalid` wird dann nichts geschrieben), danach in Chunks zu je
+`chunk_size` Zeilen, jeder in eigener Transaktion: Mitglieder per
+INSERT ... RETURNING, Stände gebündelt (SQLite: executemany, Postgres mit
+psycopg2: COPY). current_standings und Spielversion werden in derselben
+Transaktion nachgezogen – lesende Seiten sehen zwischen zwei Chunks einen
+konsistenten Stand (keine fehlenden Stände, kein Cache-Eintrag unter der alten
+Version). Nach jedem Chunk wird `progress` aufgerufen.
+
+    flask --app app:app import 3 liga.csv [--chunk-size 1000] [--skip-invalid] [--dry-run]
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime
+import io
+import json
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from evaluation import bump_game_version
+from models import Member, PaymentMethod, PointsStatus, TippingGame, VictoryStatus
+from standings import refresh_standings
+
+IMPORT_CHUNK_SIZE = 1000
+COLUMNS = (
+    "nickname", "first_name", "last_name", "email", "payment_label", "payment_reference",
+    "date", "points", "victories",
+)
+_REQUIRED_FOR_NEW = ("first_name", "last_name", "email", "payment_label")
+
+
+class ImportFileError(ValueError):
+    """Datei nicht lesbar (Format, Kopfzeile)."""
+
+
+@dataclass
+class ImportRow:
+    line: int
+    nickname: str
+    first_name: str = ""
+    last_name: str = ""
+    email: str = ""
+    payment_label: str = ""
+    payment_reference: str = ""
+    date: Optional[datetime.date] = None
+    points: Optional[int] = None
+    victories: Optional[float] = None
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    invalid: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+    created_members: int = 0
+    points_created: int = 0
+    victories_created: int = 0
+    skipped_duplicates: int = 0
+    chunks: int = 0
+    dry_run: bool = False
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "invalid": self.invalid,
+            "errors": [{"line": line, "error": msg} for line, msg in self.errors],
+            "created_members": self.created_members,
+            "points_created": self.points_created,
+            "victories_created": self.victories_created,
+            "skipped_duplicates": self.skipped_duplicates,
+            "chunks": self.chunks,
+            "dry_run": self.dry_run,
+        }
+
+
+# -------------------------------
+# Lesen & Validieren
+# -------------------------------
+def read_records(data: bytes, fmt: Optional[str] = None, filename: str = "") -> Iterable[Tuple[int, dict]]:
+    """(Zeilennummer, Rohdaten) aus CSV/JSON; Format aus `fmt` oder Dateiendung/Inhalt."""
+    text = data.decode("utf-8-sig")
+    if fmt is None:
+        fmt = "json" if filename.lower().endswith(".json") or text.lstrip().startswith("[") else "csv"
+    if fmt == "json":
+        try:
+            records = json.loads(text)
+        except ValueError as e:
+            raise ImportFileError(f"Ungültiges JSON: {e}") from None
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            raise ImportFileError("JSON muss eine Liste von Objekten sein.")
+        return ((i, r) for i, r in enumerate(records, start=1))
+    if fmt != "csv":
+        raise ImportFileError(f"Unbekanntes Format: {fmt}")
+
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(io.StringIO(text), dialect=dialect)
+    header = [h.strip().lower() for h in reader.fieldnames or []]
+    if "nickname" not in header:
+        raise ImportFileError("Kopfzeile ohne Spalte 'nickname'.")
+    unknown = sorted(set(header) - set(COLUMNS))
+    if unknown:
+        raise ImportFileError(f"Unbekannte Spalte(n): {', '.join(unknown)}")
+    reader.fieldnames = header
+    # Zeile 1 ist die Kopfzeile
+    return ((reader.line_num, r) for r in reader)
+
+
+def _clean(value) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def _parse_date(value: str) -> datetime.date:
+    if "." in value:
+        day, month, year = value.split(".")
+        return datetime.date(int(year), int(month), int(day))
+    return datetime.date.fromisoformat(value)
+
+
+def parse_row(line: int, raw: dict) -> ImportRow:
+    """Validiert eine Rohzeile. ValueError mit lesbarer Meldung."""
+    values = {key: _clean(raw.get(key)) for key in COLUMNS}
+    if not values["nickname"]:
+        raise ValueError("nickname fehlt")
+    row = ImportRow(line=line, **{k: values[k] for k in COLUMNS[:6]})
+
+    if values["date"]:
+        try:
+            row.date = _parse_date(values["date"])
+        except ValueError:
+            raise ValueError(f"ungültiges Datum '{values['date']}'") from None
+    if values["points"]:
+        try:
+            row.points = int(values["points"])
+        except ValueError:
+            raise ValueError(f"Punkte '{values['points']}' sind keine ganze Zahl") from None
+        if row.points < 0:
+            raise ValueError("Punkte müssen ≥ 0 sein")
+    if values["victories"]:
+        try:
+            row.victories = float(values["victories"].replace(",", "."))
+        except ValueError:
+            raise ValueError(f"Siege '{values['victories']}' sind keine Zahl") from None
+        if row.victories < 0:
+            raise ValueError("Siege müssen ≥ 0 sein")
+
+    has_value = row.points is not None or row.victories is not None
+    if row.date and not has_value:
+        raise ValueError("Datum ohne Punkte/Siege")
+    if has_value and not row.date:
+        raise ValueError("Punkte/Siege ohne Datum")
+    return row
+
+
+# -------------------------------
+# Schreiben
+# -------------------------------
+def _copy_rows(db: Session, table, columns: Tuple[str, ...], rows: List[tuple]) -> None:
+    """Postgres (psycopg2): COPY FROM STDIN; sonst gebündeltes INSERT (executemany)."""
+    if not rows:
+        return
+    connection = db.connection()
+    if connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        cursor = connection.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+        return
+    db.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+
+
+def _existing_statuses(db: Session, model, column, keys: set) -> set:
+    """Vorhandene (member_id, datum, wert) für die betroffenen Mitglieder/Tage."""
+    if not keys:
+        return set()
+    member_ids = {member_id for member_id, _ in keys}
+    dates = {day for _, day in keys}
+    rows = db.execute(
+        select(model.member_id, model.date, column)
+        .where(model.member_id.in_(member_ids), model.date.in_(dates))
+    )
+    return {(member_id, day, value) for member_id, day, value in rows}
+
+
+def _write_chunk(db: Session, game_id: int, rows: List[ImportRow], member_ids: Dict[str, int], report: ImportReport) -> None:
+    """Ein Chunk inkl. Stände und Spielversion, ohne Commit."""
+    new_members: Dict[str, ImportRow] = {}
+    for row in rows:
+        if row.nickname not in member_ids and row.nickname not in new_members:
+            new_members[row.nickname] = row
+    if new_members:
+        created = db.execute(
+            insert(Member).returning(Member.id),
+            [
+                {"game_id": game_id, "first_name": r.first_name, "last_name": r.last_name,
+                 "email": r.email, "nickname": nickname}
+                for nickname, r in new_members.items()
+            ],
+            execution_options={"sort_by_parameter_order": True},
+        )
+        new_ids = list(created.scalars())
+        member_ids.update(zip(new_members, new_ids))
+        _copy_rows(
+            db, PaymentMethod.__table__, ("member_id", "label", "reference"),
+            [(member_ids[n], r.payment_label, r.payment_reference) for n, r in new_members.items()],
+        )
+        report.created_members += len(new_ids)
+
+    for model, column, attr, counter in (
+        (PointsStatus, PointsStatus.points, "points", "points_created"),
+        (VictoryStatus, VictoryStatus.victories, "victories", "victories_created"),
+    ):
+        entries = [(member_ids[r.nickname], r.date, getattr(r, attr)) for r in rows if getattr(r, attr) is not None]
+        existing = _existing_statuses(db, model, column, {(m, d) for m, d, _ in entries})
+        fresh = []
+        for entry in entries:
+            if entry in existing:
+                report.skipped_duplicates += 1
+                continue
+            existing.add(entry)  # Duplikate innerhalb der Datei
+            fresh.append((entry[0], entry[2], entry[1]))
+        _copy_rows(db, model.__table__, ("member_id", attr, "date"), fresh)
+        setattr(report, counter, getattr(report, counter) + len(fresh))
+
+    refresh_standings(db, game_id, {member_ids[r.nickname] for r in rows})
+    bump_game_version(db, game_id)
+
+
+def import_rows(
+    db: Session,
+    game: TippingGame,
+    records: Iterable[Tuple[int, dict]],
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    skip_invalid: bool = False,
+    dry_run: bool = False,
+    progress: Optional[Callable[[ImportReport, int, int], None]] = None,
+) -> ImportReport:
+    """
+    Validiert und importiert; committet je Chunk (samt Ständen und
+    Spielversion). Bei Validierungsfehlern ohne `skip_invalid` (oder mit
+    `dry_run`) wird nichts geschrieben.
+    `progress(report, verarbeitete_zeilen, gültige_zeilen)` nach jedem Chunk.
+    Bricht ein Chunk ab, bleiben die vorherigen erhalten.
+    """
+    report = ImportReport(dry_run=dry_run)
+    game_id = game.id
+    member_ids: Dict[str, int] = {}
+    for member_id, nickname in db.execute(
+        select(Member.id, Member.nickname).where(Member.game_id == game_id).order_by(Member.id)
+    ):
+        member_ids.setdefault(nickname, member_id)
+
+    rows: List[ImportRow] = []
+    complete: set = set(member_ids)  # Nicknames mit vollständigen Stammdaten
+    for line, raw in records:
+        report.rows += 1
+        try:
+            row = parse_row(line, raw)
+            if row.nickname not in complete:
+                missing = [c for c in _REQUIRED_FOR_NEW if not getattr(row, c)]
+                if missing:
+                    raise ValueError(f"neues Mitglied '{row.nickname}': {', '.join(missing)} fehlt")
+                complete.add(row.nickname)
+        except ValueError as e:
+            report.invalid += 1
+            report.errors.append((line, str(e)))
+            continue
+        rows.append(row)
+
+    if dry_run or (report.errors and not skip_invalid):
+        return report
+
+    processed = 0
+    chunk_size = max(1, chunk_size)
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        _write_chunk(db, game_id, chunk, member_ids, report)
+        db.commit()
+        report.chunks += 1
+        processed += len(chunk)
+        if progress is not None:
+            progress(report, processed, len(rows))
+    return report
+
+
+def import_file(db: Session, game: TippingGame, data: bytes, fmt: Optional[str] = None, filename: str = "", **kwargs) -> ImportReport:
+    return import_rows(db, game, read_records(data, fmt, filename), **kwargs)
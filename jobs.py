@@ -0,0 +1,317 @@
+"""
+jobs.py
+-------
+Datenbank-gestützte Job-Queue für Kicktipp-Syncs.
+
+Web-Requests legen nur einen Job an (`enqueue_sync`, antwortet sofort mit der
+Job-ID); abgearbeitet wird in einem eigenen Prozess:
+
+    flask --app app:app kicktipp worker [--once] [--poll 2]
+
+- Deduplizierung: je Spiel höchstens ein offener Job (queued/running). Ein
+  weiterer Aufruf liefert den offenen Job zurück; abgesichert über einen
+  partiellen Unique-Index, also auch bei parallelen Requests.
+- Abholen: Compare-and-Set (`UPDATE ... WHERE status = 'queued'`), unter
+  Postgres zusätzlich `FOR UPDATE SKIP LOCKED` – mehrere Worker holen nie
+  denselben Job. Ein Lauf hat eine Lease (JOB_LEASE_SECONDS), die der Worker
+  während des Syncs regelmäßig verlängert (JOB_HEARTBEAT_SECONDS); stirbt
+  der Worker, wird der Job nach Ablauf erneut vergeben – höchstens bis
+  `max_attempts`, danach `failed` (z. B. ein Sync, der den Worker per OOM
+  abschießt). Ergebnis und Status schreibt nur der Worker, dem der Lauf
+  gerade gehört; hat er die Lease verloren, wird sein Sync verworfen. Die
+  Kicktipp-Seite wird außerhalb jeder Transaktion geladen, die Schreibsperre
+  hält der Worker nur für Abgleich, Besitzprüfung und Commit.
+- Fehler: Netzwerk-/DB-Fehler werden mit exponentiellem Backoff (plus
+  Jitter) wiederholt, bis `max_attempts` erreicht ist; fachliche Fehler
+  (ValueError, z. B. Spiel ohne URL) sofort `failed`.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import db as database
+from models import SyncJob, TippingGame
+
+logger = logging.getLogger(__name__)
+
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_BACKOFF_SECONDS = float(os.getenv("JOB_BACKOFF_SECONDS", "30"))
+JOB_BACKOFF_MAX_SECONDS = float(os.getenv("JOB_BACKOFF_MAX_SECONDS", "3600"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "600"))
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", str(max(JOB_LEASE_SECONDS / 3, 1))))
+
+OPEN_STATUSES = ("queued", "running")
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _iso(value: Optional[datetime.datetime]) -> Optional[str]:
+    return value.isoformat() + "Z" if value is not None else None
+
+
+def job_to_dict(job: SyncJob) -> dict:
+    return {
+        "id": job.id,
+        "game_id": job.game_id,
+        "status": job.status,
+        "force": job.force,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_at": _iso(job.run_at),
+        "created_at": _iso(job.created_at),
+        "started_at": _iso(job.started_at),
+        "finished_at": _iso(job.finished_at),
+        "last_error": job.last_error,
+        "result": json.loads(job.result) if job.result else None,
+    }
+
+
+def _open_job(db: Session, game_id: int) -> Optional[SyncJob]:
+    return db.scalars(
+        select(SyncJob).where(SyncJob.game_id == game_id, SyncJob.status.in_(OPEN_STATUSES))
+    ).first()
+
+
+def enqueue_sync(db: Session, game_id: int, force: bool = False) -> Tuple[SyncJob, bool]:
+    """
+    Legt einen Sync-Job an (mit Commit) oder liefert den offenen Job des Spiels.
+    Returns: (Job, neu angelegt?). ValueError, wenn das Spiel fehlt oder keine URL hat.
+    """
+    game = db.get(TippingGame, game_id)
+    if game is None:
+        raise ValueError(f"TippingGame mit id={game_id} nicht gefunden.")
+    if not (game.url or "").strip():
+        raise ValueError("Es wurde keine gültige Kicktipp-URL gefunden (game.url ist leer).")
+
+    existing = _open_job(db, game_id)
+    if existing is not None:
+        return existing, False
+
+    now = _now()
+    job = SyncJob(
+        game_id=game_id, status="queued", force=force, attempts=0,
+        max_attempts=JOB_MAX_ATTEMPTS, run_at=now, created_at=now,
+    )
+    try:
+        with db.begin_nested():
+            db.add(job)
+    except IntegrityError:
+        # parallel angelegt (Unique-Index auf offene Jobs)
+        existing = _open_job(db, game_id)
+        if existing is None:
+            raise
+        return existing, False
+    db.commit()
+    return job, True
+
+
+def _due(now: datetime.datetime):
+    """Fällig: wartend oder Lease abgelaufen (mit verbleibenden Versuchen)."""
+    return ((SyncJob.status == "queued") & (SyncJob.run_at <= now)) | (
+        (SyncJob.status == "running")
+        & (SyncJob.lease_until < now)
+        & (SyncJob.attempts < SyncJob.max_attempts)
+    )
+
+
+def _fail_exhausted(db: Session, now: datetime.datetime) -> None:
+    """Abgelaufene Läufe ohne verbleibende Versuche endgültig `failed` setzen."""
+    failed = db.execute(
+        update(SyncJob)
+        .where(
+            SyncJob.status == "running",
+            SyncJob.lease_until < now,
+            SyncJob.attempts >= SyncJob.max_attempts,
+        )
+        .values(
+            status="failed",
+            finished_at=now,
+            lease_until=None,
+            last_error="Lease abgelaufen, keine Versuche mehr (Worker abgestürzt?)",
+        )
+    ).rowcount
+    if failed:
+        logger.warning("%s Sync-Job(s) nach abgelaufener Lease endgültig fehlgeschlagen", failed)
+
+
+def claim_next(db: Session, worker: str) -> Optional[SyncJob]:
+    """Holt den nächsten fälligen Job und markiert ihn als `running` (mit Commit)."""
+    while True:
+        now = _now()
+        _fail_exhausted(db, now)
+        candidate = db.scalar(
+            select(SyncJob.id)
+            .where(_due(now))
+            .order_by(SyncJob.run_at, SyncJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        if candidate is None:
+            db.commit()
+            return None
+        claimed = db.execute(
+            update(SyncJob)
+            .where(SyncJob.id == candidate, _due(now))
+            .values(
+                status="running",
+                attempts=SyncJob.attempts + 1,
+                started_at=now,
+                lease_until=now + datetime.timedelta(seconds=JOB_LEASE_SECONDS),
+                worker=worker,
+            )
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.get(SyncJob, candidate)
+        # ein anderer Worker war schneller – nächsten Kandidaten versuchen
+
+
+def _backoff(attempts: int) -> float:
+    delay = min(JOB_BACKOFF_SECONDS * (2 ** (attempts - 1)), JOB_BACKOFF_MAX_SECONDS)
+    return delay * (0.5 + random.random() / 2)
+
+
+def _owned(job_id: int, worker: str):
+    """Bedingung: der Lauf gehört (noch) diesem Worker."""
+    return (SyncJob.id == job_id) & (SyncJob.worker == worker) & (SyncJob.status == "running")
+
+
+def _finish(job_id: int, worker: str, **values) -> bool:
+    """Schreibt Status/Ergebnis, sofern der Lauf noch diesem Worker gehört."""
+    with database.new_session() as db:
+        updated = db.execute(update(SyncJob).where(_owned(job_id, worker)).values(lease_until=None, **values)).rowcount
+        db.commit()
+    if not updated:
+        logger.warning("Sync-Job %s gehört nicht mehr Worker %s – Ergebnis verworfen", job_id, worker)
+    return bool(updated)
+
+
+def _renew_lease(job_id: int, worker: str) -> bool:
+    with database.new_session() as db:
+        renewed = db.execute(
+            update(SyncJob)
+            .where(_owned(job_id, worker))
+            .values(lease_until=_now() + datetime.timedelta(seconds=JOB_LEASE_SECONDS))
+        ).rowcount
+        db.commit()
+    return bool(renewed)
+
+
+@contextmanager
+def _lease_heartbeat(job_id: int, worker: str) -> Iterator[threading.Event]:
+    """Verlängert die Lease im Hintergrund; das gelieferte Event wird bei Verlust gesetzt."""
+    stop, lost = threading.Event(), threading.Event()
+
+    def beat():
+        while not stop.wait(JOB_HEARTBEAT_SECONDS):
+            try:
+                if not _renew_lease(job_id, worker):
+                    lost.set()
+                    logger.warning("Sync-Job %s: Lease verloren (Worker %s)", job_id, worker)
+                    return
+            except Exception:
+                # z. B. Datenbank kurz gesperrt – beim nächsten Takt erneut
+                logger.exception("Sync-Job %s: Lease nicht verlängert", job_id)
+
+    thread = threading.Thread(target=beat, name=f"sync-job-{job_id}-lease", daemon=True)
+    thread.start()
+    try:
+        yield lost
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job: SyncJob) -> str:
+    """
+    Führt einen abgeholten Job aus und schreibt das Ergebnis. Returns: neuer
+    Status (`lost`, wenn der Lauf inzwischen einem anderen Worker gehört –
+    dann wird nichts übernommen).
+    """
+    from kicktipp_sync import sync_kicktipp_game
+
+    job_id, game_id, attempts, max_attempts = job.id, job.game_id, job.attempts, job.max_attempts
+    worker = job.worker
+    try:
+        with _lease_heartbeat(job_id, worker) as lost:
+
+            def still_ours(db: Session) -> bool:
+                # in der Schreib-Transaktion des Syncs, direkt vor dessen Commit
+                if lost.is_set():
+                    return False
+                return db.scalar(select(SyncJob.id).where(_owned(job_id, worker)).with_for_update()) is not None
+
+            # Abruf ohne offene Transaktion, Schreibsperre nur für den Abgleich
+            summary = sync_kicktipp_game(game_id, force=job.force, may_commit=still_ours)
+        if summary is None:
+            logger.warning("Sync-Job %s: Lease verloren, Sync von Worker %s verworfen", job_id, worker)
+            return "lost"
+    except ValueError as e:
+        logger.warning("Sync-Job %s (Spiel %s) abgebrochen: %s", job_id, game_id, e)
+        _finish(job_id, worker, status="failed", finished_at=_now(), last_error=str(e))
+        return "failed"
+    except Exception as e:
+        if attempts >= max_attempts:
+            logger.exception("Sync-Job %s (Spiel %s) endgültig fehlgeschlagen", job_id, game_id)
+            _finish(job_id, worker, status="failed", finished_at=_now(), last_error=str(e))
+            return "failed"
+        delay = _backoff(attempts)
+        logger.warning(
+            "Sync-Job %s (Spiel %s), Versuch %s/%s fehlgeschlagen: %s – neuer Versuch in %.0fs",
+            job_id, game_id, attempts, max_attempts, e, delay,
+        )
+        _finish(
+            job_id, worker, status="queued", last_error=str(e),
+            run_at=_now() + datetime.timedelta(seconds=delay),
+        )
+        return "queued"
+    if not _finish(job_id, worker, status="done", finished_at=_now(), last_error=None, result=json.dumps(summary)):
+        return "lost"
+    return "done"
+
+
+def run_worker(
+    poll_interval: float = 2.0,
+    once: bool = False,
+    stop: Optional[threading.Event] = None,
+) -> int:
+    """
+    Arbeitet Jobs ab, bis `stop` gesetzt ist (bzw. bei `once` keine fälligen
+    Jobs mehr da sind). Returns: Anzahl bearbeiteter Jobs.
+    """
+    stop = stop or threading.Event()
+    # eindeutig je Worker-Schleife (auch mehrere Threads in einem Prozess)
+    worker = f"{socket.gethostname()}:{os.getpid()}:{threading.get_native_id()}"
+    processed = 0
+    logger.info("Sync-Worker %s gestartet", worker)
+    while not stop.is_set():
+        with database.new_session() as db:
+            job = claim_next(db, worker)
+            if job is not None:
+                db.expunge(job)
+        if job is None:
+            if once:
+                break
+            stop.wait(poll_interval)
+            continue
+        started = time.perf_counter()
+        status = run_job(job)
+        processed += 1
+        logger.info("Sync-Job %s (Spiel %s): %s in %.2fs", job.id, job.game_id, status, time.perf_counter() - started)
+    return processed
@@ -1,9 +1,33 @@
+import os
 import re
-from typing import List, Dict, Union
+import codecs
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Callable, Iterator, List, Dict, Optional, Union
 from urllib.parse import urljoin
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
+
+from fetch_cache import CacheEntry, FetchCache, body_hash
+from metrics import observe_sync_phase
+
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/127.0.0.0 Safari/537.36"
+)
+
+# Größe des Keep-Alive-Pools je Host (= sinnvolle Obergrenze paralleler Abrufe)
+HTTP_POOL_SIZE = int(os.getenv("KICKTIPP_HTTP_POOL_SIZE", "8"))
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
 
 
 def _clean_text(s: str) -> str:
@@ -37,60 +61,491 @@ def _to_float_de(s: str) -> float:
         return 0.0
 
 
-def _fetch_html(url: str, timeout: int = 15) -> str:
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/127.0.0.0 Safari/537.36"
-        )
+def get_http_session() -> requests.Session:
+    """
+    Prozessweit geteilte requests-Session mit Keep-Alive-Connection-Pool.
+    Thread-sicher nutzbar; der Pool fasst HTTP_POOL_SIZE Verbindungen je Host.
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["User-Agent"] = USER_AGENT
+                _http_session = session
+    return _http_session
+
+
+def _fetch(
+    url: str,
+    timeout: int = 15,
+    session: Optional[requests.Session] = None,
+    headers=None,
+    stream: bool = False,
+) -> requests.Response:
+    session = session or get_http_session()
+    resp = session.get(url, headers=headers, timeout=timeout, allow_redirects=True, stream=stream)
+    if resp.status_code != 304:
+        try:
+            resp.raise_for_status()
+        except requests.HTTPError:
+            resp.close()
+            raise
+    return resp
+
+
+def _fetch_html(url: str, timeout: int = 15, session: Optional[requests.Session] = None) -> str:
+    return _fetch(url, timeout=timeout, session=session).text
+
+
+# -------------------------------
+# Parser-Backends
+# -------------------------------
+# Alle Backends liefern exakt dieselbe Liste; gewählt wird per Argument oder
+# ENV KICKTIPP_PARSER ("auto" | "lxml" | "strainer" | "soup").
+#   - soup:     komplettes Dokument mit BeautifulSoup/html.parser (Fallback)
+#   - strainer: nur table#ranking (Ausschnitt + SoupStrainer), reines Python
+#   - stream:   inkrementeller HTMLParser ohne Baum (auch für Streaming-Abrufe)
+#   - lxml:     nur table#ranking, C-Parser (optional, falls lxml installiert)
+
+try:
+    import lxml.html as _lxml_html
+except ImportError:  # optional
+    _lxml_html = None
+
+PlayerDict = Dict[str, Union[str, int, float]]
+
+_RANKING_TABLE_START = re.compile(r"""<table\b[^>]*?\sid\s*=\s*["']?ranking\b""", re.IGNORECASE)
+_TABLE_TAG = re.compile(r"<(/?)table\b[^>]*>", re.IGNORECASE)
+
+
+def _player(nickname: str, points: str, victories: str) -> PlayerDict:
+    return {
+        "nickname": _clean_text(nickname),
+        "victories": _to_float_de(victories),
+        "points": _to_int(points),
     }
-    resp = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True)
-    resp.raise_for_status()
-    return resp.text
 
 
-def _parse_players_from_html(html: str) -> List[Dict[str, Union[str, int, float]]]:
+def _slice_ranking_table(html: str) -> Optional[str]:
     """
-    Parst die Tabelle #ranking und liefert:
-      - nickname: str (aus .mg_name)
-      - points:   int (aus td.gesamtpunkte)
-      - victories: float (aus td.siege; deutsche Schreibweise möglich, z.B. '1,00')
+    Schneidet `<table id="ranking">…</table>` (inkl. verschachtelter Tabellen)
+    aus dem Dokument, damit nicht die ganze Seite geparst werden muss.
     """
+    start = _RANKING_TABLE_START.search(html)
+    if not start:
+        return None
+    depth = 0
+    for tag in _TABLE_TAG.finditer(html, start.start()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return html[start.start():tag.end()]
+    return html[start.start():]
+
+
+def _parse_soup(html: str) -> List[PlayerDict]:
     soup = BeautifulSoup(html, "html.parser")
     table = soup.select_one("table#ranking")
     if not table:
         raise ValueError("Ranking-Tabelle (#ranking) wurde nicht gefunden.")
 
-    players: List[Dict[str, Union[str, int, float]]] = []
+    players: List[PlayerDict] = []
     for tr in table.select("tbody > tr.teilnehmer"):
         name_el = tr.select_one(".mg_name")
-        nickname = _clean_text(name_el.get_text() if name_el else "")
-
         points_el = tr.select_one("td.gesamtpunkte")
-        points = _to_int(points_el.get_text() if points_el else "")
-
         victories_el = tr.select_one("td.siege")
-        victories = _to_float_de(victories_el.get_text() if victories_el else "")
-
         players.append(
-            {
-                "nickname": nickname,
-                "victories": victories,
-                "points": points,
-            }
+            _player(
+                name_el.get_text() if name_el else "",
+                points_el.get_text() if points_el else "",
+                victories_el.get_text() if victories_el else "",
+            )
         )
     return players
 
 
-def scrape_kicktipp_players(base_url: str) -> List[Dict[str, Union[str, int, float]]]:
+def _parse_strainer(html: str) -> List[PlayerDict]:
+    fragment = _slice_ranking_table(html) or html
+    soup = BeautifulSoup(fragment, "html.parser", parse_only=SoupStrainer("table", id="ranking"))
+    table = soup.find("table", id="ranking")
+    if not table:
+        raise ValueError("Ranking-Tabelle (#ranking) wurde nicht gefunden.")
+
+    players: List[PlayerDict] = []
+    for tbody in table.find_all("tbody"):
+        for tr in tbody.find_all("tr", class_="teilnehmer", recursive=False):
+            name_el = tr.find(class_="mg_name")
+            points_el = tr.find("td", class_="gesamtpunkte")
+            victories_el = tr.find("td", class_="siege")
+            players.append(
+                _player(
+                    name_el.get_text() if name_el else "",
+                    points_el.get_text() if points_el else "",
+                    victories_el.get_text() if victories_el else "",
+                )
+            )
+    return players
+
+
+def _has_class(name: str) -> str:
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+_LXML_ROWS = f'.//tbody/tr[{_has_class("teilnehmer")}]'
+_LXML_NAME = f'.//*[{_has_class("mg_name")}]'
+_LXML_POINTS = f'.//td[{_has_class("gesamtpunkte")}]'
+_LXML_VICTORIES = f'.//td[{_has_class("siege")}]'
+
+
+def _parse_lxml(html: str) -> List[PlayerDict]:
+    fragment = _slice_ranking_table(html)
+    if fragment is None:
+        raise ValueError("Ranking-Tabelle (#ranking) wurde nicht gefunden.")
+    table = _lxml_html.fragment_fromstring(fragment)
+
+    def first_text(tr, xpath: str) -> str:
+        found = tr.xpath(xpath)
+        return found[0].text_content() if found else ""
+
+    return [
+        _player(first_text(tr, _LXML_NAME), first_text(tr, _LXML_POINTS), first_text(tr, _LXML_VICTORIES))
+        for tr in table.xpath(_LXML_ROWS)
+    ]
+
+
+@dataclass(frozen=True, slots=True)
+class Player:
+    """Kompakter Datensatz je Spieler (Streaming-API)."""
+
+    nickname: str
+    points: int
+    victories: float
+
+    def as_dict(self) -> PlayerDict:
+        return {"nickname": self.nickname, "victories": self.victories, "points": self.points}
+
+
+# Elemente ohne End-Tag (wie BeautifulSoup sie behandelt)
+_VOID_ELEMENTS = frozenset(
+    "area base br col embed hr img input keygen link menuitem meta param source track wbr "
+    "basefont bgsound command frame image isindex nextid spacer".split()
+)
+_NON_TEXT_ELEMENTS = frozenset(("script", "style", "template"))
+_ROW_FIELDS = (("nickname", None, "mg_name"), ("points", "td", "gesamtpunkte"), ("victories", "td", "siege"))
+
+
+class _RankingStreamParser(HTMLParser):
     """
-    Nimmt die Basis-URL (z.B. 'https://www.kicktipp.de/bl-amigos-2025'),
-    hängt '/tippuebersicht' an, scraped die Seite und liefert die Spieler-Liste.
+    Inkrementeller Parser (feed()) für `table#ranking tbody > tr.teilnehmer`.
+    Baut keinen Baum auf, sondern hält nur den Element-Stack und liefert
+    fertige Zeilen über `ready`, sobald deren </tr> gelesen wurde.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: List[tuple] = []  # (tag, ist_ranking_tabelle)
+        self.ranking_depth = 0
+        self.non_text_depth = 0
+        self.row_depth: Optional[int] = None
+        self.captures: Dict[str, tuple] = {}  # feld -> (stack-tiefe, textteile)
+        self.values: Dict[str, Optional[str]] = {}
+        self.ready: List[Player] = []
+        self.seen_ranking = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+        parent = self.stack[-1][0] if self.stack else None
+        is_ranking = tag == "table" and attrs.get("id") == "ranking"
+
+        self.stack.append((tag, is_ranking))
+        depth = len(self.stack)
+        if is_ranking:
+            self.ranking_depth += 1
+            self.seen_ranking = True
+        if tag in _NON_TEXT_ELEMENTS:
+            self.non_text_depth += 1
+
+        if self.row_depth is None:
+            if self.ranking_depth and tag == "tr" and parent == "tbody" and "teilnehmer" in classes:
+                self.row_depth = depth
+                self.values = {}
+        else:
+            for field, field_tag, css_class in _ROW_FIELDS:
+                if field in self.values or field in self.captures:
+                    continue
+                if css_class in classes and (field_tag is None or field_tag == tag):
+                    self.captures[field] = (depth, [])
+
+        if tag in _VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        for idx in range(len(self.stack) - 1, -1, -1):
+            if self.stack[idx][0] == tag:
+                break
+        else:
+            return  # End-Tag ohne offenes Element -> ignorieren
+        while len(self.stack) > idx:
+            self._pop()
+
+    def _pop(self):
+        depth = len(self.stack)
+        tag, is_ranking = self.stack.pop()
+        if is_ranking:
+            self.ranking_depth -= 1
+        if tag in _NON_TEXT_ELEMENTS:
+            self.non_text_depth -= 1
+        for field, (capture_depth, parts) in list(self.captures.items()):
+            if capture_depth == depth:
+                self.values[field] = "".join(parts)
+                del self.captures[field]
+        if self.row_depth == depth:
+            for field, (_, parts) in self.captures.items():
+                self.values[field] = "".join(parts)
+            self.captures = {}
+            p = _player(self.values.get("nickname", ""), self.values.get("points", ""), self.values.get("victories", ""))
+            self.ready.append(Player(p["nickname"], p["points"], p["victories"]))
+            self.row_depth = None
+
+    def handle_data(self, data):
+        if self.captures and not self.non_text_depth:
+            for _, parts in self.captures.values():
+                parts.append(data)
+
+    def close(self):
+        super().close()
+        while self.stack:
+            self._pop()
+
+
+def _iter_players_from_chunks(chunks) -> Iterator[Player]:
+    parser = _RankingStreamParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.ready:
+            yield from parser.ready
+            parser.ready.clear()
+    parser.close()
+    yield from parser.ready
+    if not parser.seen_ranking:
+        raise ValueError("Ranking-Tabelle (#ranking) wurde nicht gefunden.")
+
+
+def _parse_stream(html: str) -> List[PlayerDict]:
+    return [p.as_dict() for p in _iter_players_from_chunks((html,))]
+
+
+PARSER_BACKENDS: Dict[str, Callable[[str], List[PlayerDict]]] = {
+    "soup": _parse_soup,
+    "strainer": _parse_strainer,
+    "stream": _parse_stream,
+}
+if _lxml_html is not None:
+    PARSER_BACKENDS["lxml"] = _parse_lxml
+
+DEFAULT_PARSER = os.getenv("KICKTIPP_PARSER", "auto")
+
+
+def _resolve_parser(backend: Optional[str]) -> str:
+    backend = backend or DEFAULT_PARSER
+    if backend == "auto":
+        return "lxml" if "lxml" in PARSER_BACKENDS else "stream"
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unbekanntes Parser-Backend: {backend!r} (verfügbar: {', '.join(PARSER_BACKENDS)})")
+    return backend
+
+
+def _parse_players_from_html(html: str, backend: Optional[str] = None) -> List[PlayerDict]:
     """
+    Parst die Tabelle #ranking und liefert:
+      - nickname: str (aus .mg_name)
+      - points:   int (aus td.gesamtpunkte)
+      - victories: float (aus td.siege; deutsche Schreibweise möglich, z.B. '1,00')
+
+    Schlägt ein schnelles Backend fehl, wird mit dem vollständigen
+    BeautifulSoup-Parser ("soup") erneut geparst.
+    """
+    name = _resolve_parser(backend)
+    if name == "soup":
+        return _parse_soup(html)
+    try:
+        return PARSER_BACKENDS[name](html)
+    except Exception:
+        return _parse_soup(html)
+
+
+def tippuebersicht_url(base_url: str) -> str:
+    """'https://www.kicktipp.de/bl-amigos-2025' -> '.../bl-amigos-2025/tippuebersicht'"""
     if not base_url.endswith("/"):
         base_url = base_url + "/"
-    url = urljoin(base_url, "tippuebersicht")
-    html = _fetch_html(url)
-    return _parse_players_from_html(html)
+    return urljoin(base_url, "tippuebersicht")
+
+
+class PlayerStream:
+    """
+    Streamt die Spieler der Tippübersicht, während die Antwort noch geladen wird
+    (kein vollständiges HTML, keine Dict-Liste im Speicher).
+
+    Mit `cache` wird bedingt angefragt: bei 304 ist `unchanged=True` und die
+    Iteration liefert die Spieler aus dem Cache. Nach vollständiger Iteration
+    steht in `cache_entry` der neue Eintrag (Body-Hash wird mitgerechnet), der
+    wie bei `scrape_kicktipp_players_cached` erst nach dem Commit gespeichert
+    werden sollte.
+
+    `seconds` ist die Zeit für Abruf und Parsen ohne die Zeit beim Verbraucher
+    (Sync-Phase „fetch_parse“, da beides ineinandergreift).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        cache: Optional[FetchCache] = None,
+        cache_key: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        chunk_size: int = 16 * 1024,
+    ):
+        self.url = tippuebersicht_url(base_url)
+        self.cache = cache
+        self.cache_key = cache_key or self.url
+        self.chunk_size = chunk_size
+        self.cache_entry: Optional[CacheEntry] = None
+        self._cached = cache.get(self.cache_key) if cache is not None else None
+        self.seconds = 0.0
+
+        headers = {}
+        if self._cached and self._cached.etag:
+            headers["If-None-Match"] = self._cached.etag
+        if self._cached and self._cached.last_modified:
+            headers["If-Modified-Since"] = self._cached.last_modified
+        started = time.perf_counter()
+        self.response = _fetch(self.url, session=session, headers=headers, stream=True)
+        self.seconds += time.perf_counter() - started
+        self.unchanged = self.response.status_code == 304 and self._cached is not None
+
+    def __iter__(self) -> Iterator[Player]:
+        if self.unchanged:
+            self.response.close()
+            for p in self._cached.players:
+                yield Player(p["nickname"], p["points"], p["victories"])
+            return
+
+        hasher = hashlib.sha256()
+        decoder = codecs.getincrementaldecoder(self.response.encoding or "utf-8")(errors="replace")
+        collected: Optional[List[PlayerDict]] = [] if self.cache is not None else None
+
+        def chunks():
+            for raw in self.response.iter_content(self.chunk_size):
+                hasher.update(raw)
+                yield decoder.decode(raw)
+            yield decoder.decode(b"", final=True)
+
+        resumed = time.perf_counter()
+        try:
+            for player in _iter_players_from_chunks(chunks()):
+                if collected is not None:
+                    collected.append(player.as_dict())
+                self.seconds += time.perf_counter() - resumed
+                yield player
+                resumed = time.perf_counter()
+        finally:
+            self.response.close()
+        self.seconds += time.perf_counter() - resumed
+        observe_sync_phase("fetch_parse", self.seconds)
+
+        if collected is not None:
+            self.cache_entry = CacheEntry(
+                key=self.cache_key,
+                body_hash=hasher.hexdigest(),
+                players=collected,
+                etag=self.response.headers.get("ETag"),
+                last_modified=self.response.headers.get("Last-Modified"),
+            )
+
+
+def iter_kicktipp_players(base_url: str, session: Optional[requests.Session] = None) -> Iterator[Player]:
+    """Generator-Variante von `scrape_kicktipp_players` (liefert `Player`-Datensätze)."""
+    return iter(PlayerStream(base_url, session=session))
+
+
+def scrape_kicktipp_players(base_url: str) -> List[PlayerDict]:
+    """
+    Nimmt die Basis-URL (z.B. 'https://www.kicktipp.de/bl-amigos-2025'),
+    hängt '/tippuebersicht' an, scraped die Seite und liefert die Spieler-Liste.
+    Parser laut KICKTIPP_PARSER (wie `scrape_kicktipp_players_cached`); für
+    echtes Streaming `iter_kicktipp_players` bzw. `PlayerStream` nehmen.
+    """
+    started = time.perf_counter()
+    html = _fetch_html(tippuebersicht_url(base_url))
+    observe_sync_phase("fetch", time.perf_counter() - started)
+    started = time.perf_counter()
+    players = _parse_players_from_html(html)
+    observe_sync_phase("parse", time.perf_counter() - started)
+    return players
+
+
+
+@dataclass
+class ScrapeResult:
+    """
+    Ergebnis eines bedingten Abrufs. `unchanged=True` heißt: 304 oder gleicher
+    Body-Hash wie im Cache – `players` stammt dann aus dem Cache.
+    `cache_entry` wird erst nach erfolgreichem Schreiben gespeichert.
+    """
+
+    url: str
+    players: List[PlayerDict]
+    unchanged: bool
+    cache_entry: Optional[CacheEntry] = None
+
+
+def scrape_kicktipp_players_cached(
+    base_url: str,
+    cache: FetchCache,
+    cache_key: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+) -> ScrapeResult:
+    """
+    Wie `scrape_kicktipp_players`, aber mit bedingter Anfrage gegen den Cache.
+    Der Cache wird hier nicht aktualisiert; dafür `cache.put(result.cache_entry)`
+    aufrufen, sobald die Daten übernommen wurden.
+    """
+    url = tippuebersicht_url(base_url)
+    key = cache_key or url
+    cached = cache.get(key)
+
+    headers = {}
+    if cached and cached.etag:
+        headers["If-None-Match"] = cached.etag
+    if cached and cached.last_modified:
+        headers["If-Modified-Since"] = cached.last_modified
+
+    started = time.perf_counter()
+    resp = _fetch(url, session=session, headers=headers)
+    observe_sync_phase("fetch", time.perf_counter() - started)
+    if resp.status_code == 304 and cached:
+        return ScrapeResult(url=url, players=cached.players, unchanged=True)
+
+    digest = body_hash(resp.content)
+    if cached and cached.body_hash == digest:
+        return ScrapeResult(url=url, players=cached.players, unchanged=True)
 
+    started = time.perf_counter()
+    players = _parse_players_from_html(resp.text)
+    observe_sync_phase("parse", time.perf_counter() - started)
+    entry = CacheEntry(
+        key=key,
+        body_hash=digest,
+        players=players,
+        etag=resp.headers.get("ETag"),
+        last_modified=resp.headers.get("Last-Modified"),
+    )
+    return ScrapeResult(url=url, players=players, unchanged=False, cache_entry=entry)
@@ -9,6 +9,11 @@ der Wert gegenüber dem letzten Wert (neuester Status <= Datum) geändert hat.
 Existiert bereits ein Status am Datum und der Wert ist unterschiedlich, wird
 dieser aktualisiert; ist er identisch, passiert nichts.
 
+Mengenbasiert: Mitglieder und die jeweils letzten Stände (<= Datum) werden mit
+einer konstanten Anzahl Queries geladen, der Abgleich läuft im Speicher und
+geschrieben wird per Bulk-Insert/-Update innerhalb der laufenden Transaktion
+(Commit macht der Aufrufer).
+
 Voraussetzungen:
 - Modelle in models.py (TippingGame, Member, PointsStatus, VictoryStatus)
 - Scraper-Funktion `scrape_kicktipp_players(base_url)` aus kicktipp.py
@@ -17,19 +22,41 @@ Voraussetzungen:
 from __future__ import annotations
 
 import datetime
+import logging
 import re
-from typing import Optional
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from sqlalchemy import event, insert, select, update
 
-from ..models import (
+import db as database
+from models import (
     TippingGame,
     Member,
     PointsStatus,
     VictoryStatus,
 )
-from ..kicktipp import scrape_kicktipp_players  # type: ignore
+from fetch_cache import CacheEntry, FetchCache, get_fetch_cache
+from kicktipp import (
+    HTTP_POOL_SIZE,
+    Player,
+    PlayerStream,
+    ScrapeResult,
+    scrape_kicktipp_players,
+    scrape_kicktipp_players_cached,
+    tippuebersicht_url,
+)
+from queries import latest_status_rows
+from standings import refresh_standings
+from evaluation import bump_game_version
+from metrics import observe_sync_phase
+
+logger = logging.getLogger(__name__)
+
+# Spieler je Abgleich-/Schreib-Batch (konstante Query-Anzahl je Batch)
+SYNC_BATCH_SIZE = 500
 
 
 # -------------------------------
@@ -43,111 +70,273 @@ def _slugify(value: str) -> str:
     return value or "user"
 
 
-def _get_or_create_member_by_nickname(db: Session, game: TippingGame, nickname: str) -> Member:
-    member = (
-        db.query(Member)
-        .filter(Member.game_id == game.id, Member.nickname == nickname)
-        .first()
-    )
-    if member:
-        return member
-
+def _new_member_values(game: TippingGame, nickname: str) -> dict:
     base = _slugify(nickname) if nickname else "spieler"
-    email = f"{base}@placeholder.local"
-
-    member = Member(
-        game_id=game.id,
-        first_name=nickname or "Spieler",
-        last_name="",
-        email=email,
-        nickname=nickname or base,
-    )
-    db.add(member)
-    db.flush()
-    return member
-
-
-def _latest_points_status_on_or_before(db: Session, member_id: int, date: datetime.date) -> Optional[PointsStatus]:
-    return (
-        db.query(PointsStatus)
-        .filter(and_(PointsStatus.member_id == member_id, PointsStatus.date <= date))
-        .order_by(desc(PointsStatus.date))
-        .first()
-    )
+    return {
+        "game_id": game.id,
+        "first_name": nickname or "Spieler",
+        "last_name": "",
+        "email": f"{base}@placeholder.local",
+        "nickname": nickname or base,
+    }
 
 
-def _latest_victory_status_on_or_before(db: Session, member_id: int, date: datetime.date) -> Optional[VictoryStatus]:
-    return (
-        db.query(VictoryStatus)
-        .filter(and_(VictoryStatus.member_id == member_id, VictoryStatus.date <= date))
-        .order_by(desc(VictoryStatus.date))
-        .first()
+def _load_member_ids_by_nickname(db: Session, game: TippingGame) -> Dict[str, int]:
+    """Alle Mitglieder des Spiels in einer Query: nickname -> member_id."""
+    rows = db.execute(
+        select(Member.id, Member.nickname)
+        .where(Member.game_id == game.id)
+        .order_by(Member.id)
     )
+    ids: Dict[str, int] = {}
+    for member_id, nickname in rows:
+        # Wie bisher (.first()): bei doppelten Nicknames gewinnt das älteste Mitglied
+        ids.setdefault(nickname, member_id)
+    return ids
 
 
-def _upsert_points_status_if_changed(
-    db: Session,
-    member: Member,
-    points: int,
-    date: datetime.date,
-) -> str:
+class _StatusDiff:
     """
-    - Falls es an `date` schon einen PointsStatus gibt:
+    Abgleich einer Statusart (Punkte oder Siege) im Speicher.
+
+    - Falls es an `date` schon einen Status gibt:
         * Wert unterschiedlich -> Update
         * Wert gleich          -> keine Änderung
     - Falls es an `date` keinen Status gibt:
         * letzter Wert (<= date) identisch -> kein Insert
         * sonst -> Insert
-    Returns: "created" | "updated" | "skipped"
+
+    Der bekannte Stand (`latest`) wird batchweise nachgeladen und nach jedem
+    Schreiben fortgeschrieben, sodass mehrfach auftauchende Spieler auch über
+    Batch-Grenzen hinweg korrekt behandelt werden.
     """
-    existing_today = (
-        db.query(PointsStatus)
-        .filter(PointsStatus.member_id == member.id, PointsStatus.date == date)
-        .first()
-    )
-    if existing_today:
-        if int(existing_today.points) != int(points):
-            existing_today.points = int(points)
-            return "updated"
-        return "skipped"
 
-    latest_before_or_today = _latest_points_status_on_or_before(db, member.id, date)
-    if latest_before_or_today and int(latest_before_or_today.points) == int(points):
-        return "skipped"
+    def __init__(self, model, field: str, date: datetime.date, cast):
+        self.model = model
+        self.field = field
+        self.date = date
+        self.cast = cast
+        self.latest: Dict[int, List] = {}  # member_id -> [status_id | None, wert, datum]
+        self.loaded: set = set()
+        self.inserts: Dict[int, object] = {}  # member_id -> neuer Wert
+        self.updates: Dict[int, object] = {}  # status_id -> neuer Wert
+        self.changed: set = set()  # member_ids mit Insert/Update
+
+    def load(self, db: Session, member_ids: Iterable[int]) -> None:
+        missing = [mid for mid in member_ids if mid not in self.loaded]
+        if missing:
+            column = getattr(self.model, self.field)
+            self.latest.update(latest_status_rows(db, self.model, column, missing, as_of=self.date))
+            self.loaded.update(missing)
+
+    def mark_new(self, member_ids: Iterable[int]) -> None:
+        # Frisch angelegte Mitglieder haben noch keinen Status
+        self.loaded.update(member_ids)
+
+    def apply(self, member_id: int, value) -> str:
+        value = self.cast(value)
+        current = self.latest.get(member_id)
+
+        if current and current[2] == self.date:
+            if self.cast(current[1]) == value:
+                return "skipped"
+            current[1] = value
+            self.changed.add(member_id)
+            if current[0] is None:
+                # Spieler mehrfach in der Tabelle: noch nicht geschriebenen Insert anpassen
+                self.inserts[member_id] = value
+            else:
+                self.updates[current[0]] = value
+            return "updated"
 
-    ps = PointsStatus(member_id=member.id, points=int(points), date=date)
-    db.add(ps)
-    return "created"
+        if current and self.cast(current[1]) == value:
+            return "skipped"
+
+        self.inserts[member_id] = value
+        self.latest[member_id] = [None, value, self.date]
+        self.changed.add(member_id)
+        return "created"
+
+    def write(self, db: Session) -> None:
+        if self.inserts:
+            created = db.execute(
+                insert(self.model).returning(self.model.member_id, self.model.id),
+                [{"member_id": mid, self.field: value, "date": self.date} for mid, value in self.inserts.items()],
+            )
+            for member_id, status_id in created:
+                self.latest[member_id][0] = status_id
+            self.inserts = {}
+        if self.updates:
+            db.execute(
+                update(self.model),
+                [{"id": sid, self.field: value} for sid, value in self.updates.items()],
+            )
+            self.updates = {}
+
+
+def _entry_values(entry: Union[Player, dict]) -> Tuple[str, int, float]:
+    if isinstance(entry, Player):
+        return entry.nickname.strip(), int(entry.points), float(entry.victories)
+    return (
+        str(entry.get("nickname") or "").strip(),
+        int(entry.get("points") or 0),
+        float(entry.get("victories") or 0.0),
+    )
 
 
-def _upsert_victory_status_if_changed(
+def _sync_players(
     db: Session,
-    member: Member,
-    victories: float,
-    date: datetime.date,
-) -> str:
+    game: TippingGame,
+    scraped: Iterable[Union[Player, dict]],
+    today: datetime.date,
+    batch_size: int = SYNC_BATCH_SIZE,
+) -> dict:
     """
-    Logik analog zu Punkten, aber für Siege (float).
-    Returns: "created" | "updated" | "skipped"
+    Bulk-Abgleich gescrapter Spieler mit der Datenbank (ohne Commit).
+
+    `scraped` darf ein Generator sein (z. B. `PlayerStream`): verarbeitet und
+    geschrieben wird je `batch_size` Spieler, d. h. noch während des Downloads.
+    Je Batch fallen konstant viele Queries an.
     """
-    existing_today = (
-        db.query(VictoryStatus)
-        .filter(VictoryStatus.member_id == member.id, VictoryStatus.date == date)
-        .first()
-    )
-    if existing_today:
-        if float(existing_today.victories) != float(victories):
-            existing_today.victories = float(victories)
-            return "updated"
-        return "skipped"
+    started = time.perf_counter()
+    member_ids = _load_member_ids_by_nickname(db, game)
+    points_diff = _StatusDiff(PointsStatus, "points", today, int)
+    victories_diff = _StatusDiff(VictoryStatus, "victories", today, float)
+    counts = {
+        "points": {"created": 0, "updated": 0, "skipped": 0},
+        "victories": {"created": 0, "updated": 0, "skipped": 0},
+    }
+    scraped_count = 0
+    created_members = 0
+    new_member_ids: set = set()
+
+    for batch in _batched(scraped, batch_size):
+        entries = [_entry_values(e) for e in batch]
+        scraped_count += len(entries)
+
+        new_members: Dict[str, dict] = {}
+        for nickname, _, _ in entries:
+            if nickname not in member_ids and nickname not in new_members:
+                new_members[nickname] = _new_member_values(game, nickname)
+
+        # Neue Mitglieder gesammelt anlegen (ein INSERT ... RETURNING)
+        if new_members:
+            created = db.execute(
+                insert(Member).returning(Member.id),
+                list(new_members.values()),
+                execution_options={"sort_by_parameter_order": True},
+            )
+            new_ids = list(created.scalars())
+            member_ids.update(zip(new_members, new_ids))
+            new_member_ids.update(new_ids)
+            points_diff.mark_new(new_ids)
+            victories_diff.mark_new(new_ids)
+            created_members += len(new_ids)
+
+        batch_ids = {member_ids[nickname] for nickname, _, _ in entries}
+        points_diff.load(db, batch_ids)
+        victories_diff.load(db, batch_ids)
+
+        for nickname, points, victories in entries:
+            member_id = member_ids[nickname]
+            counts["points"][points_diff.apply(member_id, points)] += 1
+            counts["victories"][victories_diff.apply(member_id, victories)] += 1
+
+        points_diff.write(db)
+        victories_diff.write(db)
+
+    if created_members:
+        db.expire(game, ["members"])
+
+    # current_standings im selben Commit nachziehen (nur betroffene Mitglieder)
+    changed = points_diff.changed | victories_diff.changed | new_member_ids
+    refresh_standings(db, game.id, changed)
+    if changed:
+        bump_game_version(db, game.id)
+
+    # Bei einem PlayerStream steckt dessen Abruf-/Parse-Zeit mit in der Schleife
+    observe_sync_phase("write", time.perf_counter() - started - getattr(scraped, "seconds", 0.0))
+
+    return {
+        "date": today.isoformat(),
+        "scraped_count": scraped_count,
+        "created_members": created_members,
+        "points": counts["points"],
+        "victories": counts["victories"],
+    }
+
+
+def _batched(iterable, size: int):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _unchanged_summary(today: datetime.date, scraped_count: int) -> dict:
+    """Summary für eine unveränderte Seite: kein Abgleich, alles gilt als übersprungen."""
+    return {
+        "date": today.isoformat(),
+        "scraped_count": scraped_count,
+        "created_members": 0,
+        "points": {"created": 0, "updated": 0, "skipped": scraped_count},
+        "victories": {"created": 0, "updated": 0, "skipped": scraped_count},
+        "unchanged": True,
+    }
+
+
+def _cache_key(game_id: int, url: str) -> str:
+    # Je Spiel, da sich mehrere Spiele dieselbe Kicktipp-URL teilen können
+    return f"game:{game_id}:{url}"
+
+
+def _scrape(game_id: int, base_url: str, cache: Optional[FetchCache], force: bool) -> ScrapeResult:
+    if cache is None:
+        players = scrape_kicktipp_players(base_url)
+        return ScrapeResult(url=tippuebersicht_url(base_url), players=players, unchanged=False)
+    key = _cache_key(game_id, tippuebersicht_url(base_url))
+    if force:
+        cache.delete(key)
+    return scrape_kicktipp_players_cached(base_url, cache, cache_key=key)
 
-    latest_before_or_today = _latest_victory_status_on_or_before(db, member.id, date)
-    if latest_before_or_today and float(latest_before_or_today.victories) == float(victories):
-        return "skipped"
 
-    vs = VictoryStatus(member_id=member.id, victories=float(victories), date=date)
-    db.add(vs)
-    return "created"
+def _put_cache_after_commit(db: Session, cache: FetchCache, entry: CacheEntry) -> None:
+    """Cache erst nach erfolgreichem Commit fortschreiben (sonst würde ein Rollback übersprungen)."""
+
+    def on_commit(session):
+        event.remove(session, "after_soft_rollback", on_rollback)
+        cache.put(entry)
+
+    def on_rollback(session, previous_transaction):
+        event.remove(session, "after_commit", on_commit)
+
+    event.listen(db, "after_commit", on_commit, once=True)
+    event.listen(db, "after_soft_rollback", on_rollback, once=True)
+
+
+def _sync_streaming(
+    db: Session,
+    game: TippingGame,
+    base_url: str,
+    today: datetime.date,
+    cache: Optional[FetchCache],
+    force: bool,
+) -> dict:
+    key = _cache_key(game.id, tippuebersicht_url(base_url))
+    if cache is not None and force:
+        cache.delete(key)
+    players = PlayerStream(base_url, cache=cache, cache_key=key)
+    if players.unchanged:
+        return _unchanged_summary(today, len(list(players)))
+
+    summary = _sync_players(db, game, players, today)
+    if cache is not None and players.cache_entry is not None:
+        _put_cache_after_commit(db, cache, players.cache_entry)
+    return summary
 
 
 # -------------------------------
@@ -159,6 +348,9 @@ def sync_kicktipp_players_for_game(
     game: TippingGame,
     scrape_base_url: Optional[str] = None,
     as_of_date: Optional[datetime.date] = None,
+    cache: Optional[FetchCache] = None,
+    force: bool = False,
+    stream: bool = False,
 ) -> dict:
     """
     Synchronisiert alle Spieler, Punkte und Siege eines Tipp-Spiels.
@@ -166,6 +358,17 @@ def sync_kicktipp_players_for_game(
     Es werden nur dann neue Status-Objekte angelegt, wenn sich der Wert ggü. dem
     zuletzt bekannten Status (<= Datum) geändert hat. Bereits vorhandene Einträge
     am selben Datum werden nur bei Wertänderung aktualisiert.
+
+    Ist ein Fetch-Cache aktiv (`cache` oder Default aus fetch_cache.py) und die
+    Seite unverändert, entfällt der Abgleich (Summary mit "unchanged": True).
+    `force=True` ignoriert den Cache-Eintrag. Mit `as_of_date` (Nachtrag für
+    einen Stichtag) wird der Cache weder gelesen noch geschrieben: dass die Seite
+    seit dem letzten Lauf gleich ist, heißt nicht, dass dieser Stichtag schon
+    abgeglichen wurde.
+
+    `stream=True` liest die Seite inkrementell und schreibt batchweise, noch
+    während der Download läuft (für sehr große Ligen). Die Erkennung
+    „unverändert“ greift dann nur über 304, nicht über den Body-Hash.
     """
     if not scrape_base_url:
         scrape_base_url = (game.url or "").strip()
@@ -174,62 +377,18 @@ def sync_kicktipp_players_for_game(
 
     today = as_of_date or datetime.date.today()
 
-    scraped = scrape_kicktipp_players(scrape_base_url)
-    created_members = 0
-    created_points = 0
-    updated_points = 0
-    skipped_points = 0
-    created_victories = 0
-    updated_victories = 0
-    skipped_victories = 0
-
-    for entry in scraped:
-        nickname = str(entry.get("nickname") or "").strip()
-        points = int(entry.get("points") or 0)
-        victories = float(entry.get("victories") or 0.0)
-
-        member = (
-            db.query(Member)
-            .filter(Member.game_id == game.id, Member.nickname == nickname)
-            .first()
-        )
-        if not member:
-            member = _get_or_create_member_by_nickname(db, game, nickname)
-            created_members += 1
-
-        # Punkte
-        res_p = _upsert_points_status_if_changed(db, member, points, today)
-        if res_p == "created":
-            created_points += 1
-        elif res_p == "updated":
-            updated_points += 1
-        else:
-            skipped_points += 1
-
-        # Siege
-        res_v = _upsert_victory_status_if_changed(db, member, victories, today)
-        if res_v == "created":
-            created_victories += 1
-        elif res_v == "updated":
-            updated_victories += 1
-        else:
-            skipped_victories += 1
+    cache = None if as_of_date is not None else cache or get_fetch_cache()
+    if stream:
+        return _sync_streaming(db, game, scrape_base_url, today, cache, force)
 
-    return {
-        "date": today.isoformat(),
-        "scraped_count": len(scraped),
-        "created_members": created_members,
-        "points": {
-            "created": created_points,
-            "updated": updated_points,
-            "skipped": skipped_points,
-        },
-        "victories": {
-            "created": created_victories,
-            "updated": updated_victories,
-            "skipped": skipped_victories,
-        },
-    }
+    result = _scrape(game.id, scrape_base_url, cache, force)
+    if result.unchanged:
+        return _unchanged_summary(today, len(result.players))
+
+    summary = _sync_players(db, game, result.players, today)
+    if cache is not None and result.cache_entry is not None:
+        _put_cache_after_commit(db, cache, result.cache_entry)
+    return summary
 
 
 def sync_kicktipp_by_game_id(
@@ -237,10 +396,147 @@ def sync_kicktipp_by_game_id(
     game_id: int,
     as_of_date: Optional[datetime.date] = None,
     scrape_base_url: Optional[str] = None,
+    force: bool = False,
+    stream: bool = False,
 ) -> dict:
     game = db.query(TippingGame).get(game_id)  # type: ignore[attr-defined]
     if not game:
         raise ValueError(f"TippingGame mit id={game_id} nicht gefunden.")
     if scrape_base_url is None:
         scrape_base_url = game.url
-    return sync_kicktipp_players_for_game(db, game, scrape_base_url, as_of_date)
+    return sync_kicktipp_players_for_game(db, game, scrape_base_url, as_of_date, force=force, stream=stream)
+
+
+def sync_kicktipp_game(
+    game_id: int,
+    as_of_date: Optional[datetime.date] = None,
+    force: bool = False,
+    stream: bool = False,
+    may_commit: Optional[Callable[[Session], bool]] = None,
+) -> Optional[dict]:
+    """
+    Synchronisiert ein Tippspiel in eigenen Sessions (CLI, Job-Worker).
+
+    Anders als `sync_kicktipp_by_game_id` läuft der Abruf außerhalb jeder
+    Transaktion (wie bei `sync_all_kicktipp_games`): URL kurz lesen, Seite laden
+    und parsen, erst dann eine Schreib-Session (BEGIN IMMEDIATE) nur für den
+    Abgleich. Ein langsamer Kicktipp-Server hält so keine Schreibsperre. Nur bei
+    `stream=True` läuft der Download zwangsläufig in der Schreibtransaktion.
+
+    `may_commit(db)` wird in der Schreib-Session direkt vor dem Commit
+    aufgerufen; liefert es False, wird verworfen und None zurückgegeben.
+    """
+    today = as_of_date or datetime.date.today()
+    # Nachträge mit Stichtag ohne Fetch-Cache (siehe sync_kicktipp_players_for_game)
+    cache = get_fetch_cache() if as_of_date is None else None
+
+    with database.new_session() as db:
+        row = db.execute(select(TippingGame.url).where(TippingGame.id == game_id)).first()
+    if row is None:
+        raise ValueError(f"TippingGame mit id={game_id} nicht gefunden.")
+    url = (row.url or "").strip()
+    if not url:
+        raise ValueError("Es wurde keine gültige Kicktipp-URL gefunden (game.url ist leer).")
+
+    result = None
+    if not stream:
+        result = _scrape(game_id, url, cache, force)
+        if result.unchanged:
+            return _unchanged_summary(today, len(result.players))
+
+    with database.new_session() as db:
+        game = db.get(TippingGame, game_id)
+        if not game:
+            raise ValueError(f"TippingGame mit id={game_id} nicht gefunden.")
+        if result is None:
+            summary = _sync_streaming(db, game, url, today, cache, force)
+        else:
+            summary = _sync_players(db, game, result.players, today)
+        if may_commit is not None and not may_commit(db):
+            db.rollback()
+            return None
+        db.commit()
+    if result is not None and cache is not None and result.cache_entry is not None:
+        cache.put(result.cache_entry)
+    return summary
+
+
+def _fetch_game_players(game_id: int, url: str, cache: Optional[FetchCache], force: bool) -> Tuple[ScrapeResult, float]:
+    started = time.perf_counter()
+    result = _scrape(game_id, url, cache, force)
+    return result, time.perf_counter() - started
+
+
+def sync_all_kicktipp_games(
+    as_of_date: Optional[datetime.date] = None,
+    max_workers: int = HTTP_POOL_SIZE,
+    force: bool = False,
+) -> dict:
+    """
+    Synchronisiert alle Tippspiele mit hinterlegter URL.
+
+    Abruf und Parsing laufen parallel in einem begrenzten Thread-Pool (geteilte
+    Keep-Alive-Session aus kicktipp.py), geschrieben wird je Spiel in einer
+    eigenen DB-Session, sobald dessen Seite vorliegt. Unveränderte Seiten
+    (Fetch-Cache) werden ohne Abgleich übersprungen. Fehler einzelner Spiele
+    brechen den Lauf nicht ab, sondern landen im Report. Mit `as_of_date` bleibt
+    der Fetch-Cache außen vor (siehe `sync_kicktipp_players_for_game`).
+    """
+    today = as_of_date or datetime.date.today()
+    started = time.perf_counter()
+    cache = get_fetch_cache() if as_of_date is None else None
+
+    with database.new_session() as db:
+        targets = [
+            (game_id, url.strip())
+            for game_id, url in db.execute(select(TippingGame.id, TippingGame.url).order_by(TippingGame.id))
+            if url and url.strip()
+        ]
+
+    results: Dict[int, dict] = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="kicktipp-fetch") as pool:
+        futures = {
+            pool.submit(_fetch_game_players, game_id, url, cache, force): game_id
+            for game_id, url in targets
+        }
+        for future in as_completed(futures):
+            game_id = futures[future]
+            result = {"game_id": game_id, "ok": False, "fetch_seconds": None, "write_seconds": None}
+            results[game_id] = result
+            try:
+                scrape, result["fetch_seconds"] = future.result()
+            except Exception as e:
+                logger.warning("Kicktipp-Abruf für Spiel %s fehlgeschlagen: %s", game_id, e)
+                result["error"] = f"fetch: {e}"
+                continue
+
+            if scrape.unchanged:
+                result["summary"] = _unchanged_summary(today, len(scrape.players))
+                result["ok"] = True
+                continue
+
+            write_started = time.perf_counter()
+            with database.new_session() as db:
+                try:
+                    game = db.get(TippingGame, game_id)
+                    if not game:
+                        raise ValueError(f"TippingGame mit id={game_id} nicht gefunden.")
+                    result["summary"] = _sync_players(db, game, scrape.players, today)
+                    db.commit()
+                    result["ok"] = True
+                    if cache is not None and scrape.cache_entry is not None:
+                        cache.put(scrape.cache_entry)
+                except Exception as e:
+                    db.rollback()
+                    logger.exception("Kicktipp-Sync für Spiel %s fehlgeschlagen", game_id)
+                    result["error"] = f"write: {e}"
+            result["write_seconds"] = time.perf_counter() - write_started
+
+    games = [results[game_id] for game_id, _ in targets]
+    return {
+        "date": today.isoformat(),
+        "total_seconds": time.perf_counter() - started,
+        "succeeded": sum(1 for r in games if r["ok"]),
+        "failed": sum(1 for r in games if not r["ok"]),
+        "games": games,
+    }
@@ -0,0 +1,314 @@
+"""
+metrics.py
+----------
+Leichtgewichtige Laufzeit-Metriken im Prometheus-Textformat (ohne zusätzliche
+Abhängigkeit).
+
+Erfasst:
+  - Latenz je Route (Histogramm, Labels endpoint/method/status)
+  - SQL-Statements und SQL-Zeit je Request (Histogramme; Hooks in db.py)
+  - langsame Queries (Zähler + Log-Warnung ab SLOW_QUERY_MS)
+  - Dauer der Kicktipp-Sync-Phasen fetch / parse / fetch_parse / write
+  - Connection-Pool: Wartezeit beim Checkout, Timeouts, belegte Verbindungen
+    und Kapazität (Auslastung = checked_out / capacity, summiert über Worker)
+
+Mehrere Gunicorn-Worker: Jeder Prozess hält seine Werte im Speicher und
+schreibt sie (höchstens alle METRICS_FLUSH_SECONDS, zusätzlich beim Beenden)
+als JSON nach METRICS_DIR/metrics_<pid>.json. `/metrics` summiert alle Dateien
+– Zähler und Histogramme sind Summen, dadurch ist die Aggregation exakt (bis
+auf das Flush-Intervall). Dateien beendeter Worker bleiben liegen, damit Zähler
+monoton bleiben (ihre Gauges werden beim Beenden entfernt); das Verzeichnis
+beim Deploy/Container-Start leeren (gunicorn.conf.py erledigt das beim Start).
+Ohne METRICS_DIR zeigt `/metrics` nur den eigenen Prozess.
+
+Konfiguration per ENV:
+  - METRICS_DIR            (Default: leer = nur eigener Prozess)
+  - METRICS_FLUSH_SECONDS  (Default: 1.0)
+  - SLOW_QUERY_MS          (Default: 200; 0 = aus)
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HISTOGRAMS = {
+    "tipptrace_http_request_duration_seconds": ("Latenz je Request.", _LATENCY_BUCKETS),
+    "tipptrace_http_request_sql_statements": ("SQL-Statements je Request.", (0, 1, 2, 5, 10, 20, 50, 100, 250)),
+    "tipptrace_http_request_sql_seconds": ("SQL-Zeit je Request.", _LATENCY_BUCKETS),
+    "tipptrace_db_pool_wait_seconds": (
+        "Wartezeit auf eine Verbindung aus dem Pool (inkl. Verbindungsaufbau).",
+        (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+    ),
+    "tipptrace_sync_phase_seconds": (
+        "Dauer der Kicktipp-Sync-Phasen (fetch, parse, fetch_parse bei Streaming, write).",
+        (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+    ),
+}
+COUNTERS = {
+    "tipptrace_db_slow_queries_total": "SQL-Statements über SLOW_QUERY_MS.",
+    "tipptrace_db_pool_timeouts_total": "Checkouts, die am Pool-Timeout gescheitert sind.",
+}
+GAUGES = {
+    "tipptrace_db_pool_checked_out": "Belegte Pool-Verbindungen (Summe der Worker).",
+    "tipptrace_db_pool_capacity": "Maximale Pool-Verbindungen, pool_size + max_overflow (Summe der Worker).",
+}
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "1.0"))
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Registry:
+    """Prozesslokale Zähler/Histogramme (thread-sicher)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        # (name, labels) -> [bucket_counts..., +Inf-count, sum]
+        self.histograms: Dict[Tuple[str, Labels], list] = {}
+        # liefern beim Schreiben aktuelle Gauge-Werte: {name: wert}
+        self.gauge_callbacks: list = []
+
+    def inc(self, name: str, labels: Optional[dict] = None, value: float = 1.0) -> None:
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Optional[dict] = None) -> None:
+        buckets = HISTOGRAMS[name][1]
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            data = self.histograms.get(key)
+            if data is None:
+                data = self.histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+            data[bisect_left(buckets, value)] += 1
+            data[-1] += value
+
+    def register_gauges(self, callback) -> None:
+        self.gauge_callbacks.append(callback)
+
+    def dump(self) -> dict:
+        gauges = []
+        for callback in self.gauge_callbacks:
+            gauges.extend([name, [], value] for name, value in callback().items())
+        with self._lock:
+            return {
+                "counters": [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                "histograms": [[name, list(labels), list(data)] for (name, labels), data in self.histograms.items()],
+                "gauges": gauges,
+            }
+
+
+registry = Registry()
+_local = threading.local()
+
+
+# -------------------------------
+# Erfassung
+# -------------------------------
+def record_query(statement: str, seconds: float) -> None:
+    """Aus den Engine-Events in db.py für jedes SQL-Statement aufgerufen."""
+    stats = getattr(_local, "request", None)
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += seconds
+    if SLOW_QUERY_MS and seconds * 1000 >= SLOW_QUERY_MS:
+        registry.inc("tipptrace_db_slow_queries_total")
+        logger.warning("Langsame Query (%.0f ms): %s", seconds * 1000, " ".join(statement.split())[:500])
+
+
+def observe_sync_phase(phase: str, seconds: float) -> None:
+    registry.observe("tipptrace_sync_phase_seconds", seconds, {"phase": phase})
+
+
+def observe_pool_checkout(seconds: float, timed_out: bool = False) -> None:
+    registry.observe("tipptrace_db_pool_wait_seconds", seconds)
+    if timed_out:
+        registry.inc("tipptrace_db_pool_timeouts_total")
+
+
+# -------------------------------
+# Mehrprozess-Ablage
+# -------------------------------
+_last_flush = 0.0
+_flush_lock = threading.Lock()
+
+
+def _metrics_dir() -> Optional[Path]:
+    directory = os.getenv("METRICS_DIR")
+    return Path(directory) if directory else None
+
+
+def flush(force: bool = False) -> None:
+    """Schreibt die Werte dieses Prozesses nach METRICS_DIR (atomar)."""
+    global _last_flush
+    directory = _metrics_dir()
+    if directory is None:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < METRICS_FLUSH_SECONDS:
+        return
+    with _flush_lock:
+        _last_flush = now
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(registry.dump(), f)
+        os.replace(tmp, directory / f"metrics_{os.getpid()}.json")
+
+
+def reset_after_fork() -> None:
+    """Im Gunicorn-Worker nach dem Fork: Werte des Masters nicht mitzählen."""
+    global _last_flush, _flush_lock
+    registry._lock = threading.Lock()
+    _flush_lock = threading.Lock()
+    with registry._lock:
+        registry.counters.clear()
+        registry.histograms.clear()
+    _last_flush = 0.0
+
+
+def clear_dir() -> None:
+    """Dateien früherer Prozesse entfernen (Gunicorn-Start, siehe gunicorn.conf.py)."""
+    directory = _metrics_dir()
+    if directory is None or not directory.is_dir():
+        return
+    for path in directory.glob("metrics_*.json"):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+@atexit.register
+def _final_flush() -> None:
+    # Gauges eines beendeten Prozesses zählen nicht mehr mit
+    registry.gauge_callbacks.clear()
+    flush(force=True)
+
+
+def _collect() -> list:
+    directory = _metrics_dir()
+    if directory is None:
+        return [registry.dump()]
+    flush(force=True)
+    dumps = []
+    for path in sorted(directory.glob("metrics_*.json")):
+        try:
+            dumps.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue  # gerade im Schreiben / verschwunden
+    return dumps
+
+
+def _fmt_labels(labels, extra=None) -> str:
+    items = [(k, v) for k, v in labels] + list((extra or {}).items())
+    if not items:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in items)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + "}"
+
+
+def _fmt_number(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def render_prometheus() -> str:
+    counters: Dict[Tuple[str, Labels], float] = {}
+    gauges: Dict[Tuple[str, Labels], float] = {}
+    histograms: Dict[Tuple[str, Labels], list] = {}
+    for dump in _collect():
+        for target, entries in ((counters, dump["counters"]), (gauges, dump.get("gauges", []))):
+            for name, labels, value in entries:
+                key = (name, tuple(tuple(x) for x in labels))
+                target[key] = target.get(key, 0.0) + value
+        for name, labels, data in dump["histograms"]:
+            if name not in HISTOGRAMS or len(data) != len(HISTOGRAMS[name][1]) + 2:
+                continue  # Datei einer älteren Version
+            key = (name, tuple(tuple(x) for x in labels))
+            agg = histograms.setdefault(key, [0] * len(data))
+            for i, v in enumerate(data):
+                agg[i] += v
+
+    lines = []
+    for name, help_text in COUNTERS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        series = {labels: v for (n, labels), v in counters.items() if n == name} or {(): 0.0}
+        for labels, value in sorted(series.items()):
+            lines.append(f"{name}{_fmt_labels(labels)} {_fmt_number(value)}")
+    for name, help_text in GAUGES.items():
+        series = {labels: v for (n, labels), v in gauges.items() if n == name}
+        if not series:
+            continue
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        for labels, value in sorted(series.items()):
+            lines.append(f"{name}{_fmt_labels(labels)} {_fmt_number(value)}")
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (n, labels), data in sorted(histograms.items()):
+            if n != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ["+Inf"], data[:-1]):
+                cumulative += count
+                le = bound if bound == "+Inf" else _fmt_number(bound)
+                lines.append(f"{name}_bucket{_fmt_labels(labels, {'le': le})} {cumulative}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {_fmt_number(data[-1])}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+# -------------------------------
+# Flask-Anbindung
+# -------------------------------
+def init_metrics(app) -> None:
+    """Request-Middleware und `/metrics` registrieren."""
+    from flask import request
+
+    @app.before_request
+    def _start_request():
+        _local.request = [0, 0.0]
+        _local.started = time.perf_counter()
+
+    def _finish(status: int) -> None:
+        stats = getattr(_local, "request", None)
+        if stats is None:
+            return
+        _local.request = None
+        endpoint = request.endpoint or "unbekannt"
+        registry.observe(
+            "tipptrace_http_request_duration_seconds",
+            time.perf_counter() - _local.started,
+            {"endpoint": endpoint, "method": request.method, "status": str(status)},
+        )
+        registry.observe("tipptrace_http_request_sql_statements", stats[0], {"endpoint": endpoint})
+        registry.observe("tipptrace_http_request_sql_seconds", stats[1], {"endpoint": endpoint})
+        flush()
+
+    @app.after_request
+    def _record_request(response):
+        _finish(response.status_code)
+        return response
+
+    @app.teardown_request
+    def _record_failed_request(exc=None):
+        # after_request läuft bei unbehandelten Fehlern nicht
+        _finish(500)
+
+    @app.get("/metrics")
+    def metrics():
+        return render_prometheus(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
@@ -0,0 +1,134 @@
+"""
+migrations.py
+-------------
+Schlanke Schema-Migrationen (SQLite und Postgres) statt eines reinen
+`create_all`: `create_all` legt nur fehlende Tabellen an, ergänzt bestehende
+Datenbanken aber weder um Indizes noch um sonstige Änderungen.
+
+Jede Migration hat eine fortlaufende ID und läuft genau einmal in eigener
+Transaktion; angewendete IDs stehen in `schema_migrations`. Migrationen sind
+idempotent geschrieben (checkfirst / IF NOT EXISTS), damit sie auch auf
+Datenbanken laufen, die schon per `create_all` im aktuellen Stand angelegt
+wurden.
+
+Neue Migration: Funktion `(connection) -> None` schreiben und unten an
+MIGRATIONS anhängen – nie bestehende IDs umnummerieren.
+
+    flask --app app:app db upgrade
+    flask --app app:app db status
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, func, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from db import Base
+
+logger = logging.getLogger(__name__)
+
+_meta = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _meta,
+    Column("id", String(100), primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Postgres: parallele Starts (mehrere Worker) serialisieren
+_PG_LOCK_ID = 7_352_019
+
+
+# -------------------------------
+# Migrationen
+# -------------------------------
+def _baseline(conn: Connection) -> None:
+    """Alle Tabellen gemäß models.py anlegen (fehlende)."""
+    import models  # noqa: F401  (registriert die Tabellen)
+
+    Base.metadata.create_all(bind=conn)
+
+
+def _create_indexes(*names: str) -> Callable[[Connection], None]:
+    def migrate(conn: Connection) -> None:
+        import models  # noqa: F401
+
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name in names:
+                    index.create(bind=conn, checkfirst=True)
+
+    return migrate
+
+
+def _create_tables(*names: str) -> Callable[[Connection], None]:
+    def migrate(conn: Connection) -> None:
+        import models  # noqa: F401
+
+        for name in names:
+            Base.metadata.tables[name].create(bind=conn, checkfirst=True)
+
+    return migrate
+
+
+MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = [
+    ("0001_baseline", _baseline),
+    (
+        "0002_status_and_member_indexes",
+        _create_indexes(
+            "ix_points_statuses_member_date",
+            "ix_victory_statuses_member_date",
+            "ix_members_game_nickname",
+        ),
+    ),
+    (
+        "0003_member_listing_indexes",
+        _create_indexes(
+            "ix_members_game_name",
+            "ix_current_standings_game_points",
+            "ix_current_standings_game_victories",
+        ),
+    ),
+    ("0004_sync_jobs", _create_tables("sync_jobs")),
+]
+
+
+# -------------------------------
+# Runner
+# -------------------------------
+def applied_migrations(conn: Connection) -> List[str]:
+    _meta.create_all(bind=conn)
+    return list(conn.scalars(select(schema_migrations.c.id).order_by(schema_migrations.c.id)))
+
+
+def pending_migrations(engine: Engine) -> List[str]:
+    with engine.begin() as conn:
+        done = set(applied_migrations(conn))
+    return [mid for mid, _ in MIGRATIONS if mid not in done]
+
+
+def run_migrations(engine: Engine) -> List[str]:
+    """Wendet alle ausstehenden Migrationen an. Returns: angewendete IDs."""
+    applied = []
+    for mid, migrate in MIGRATIONS:
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": _PG_LOCK_ID})
+            if mid in applied_migrations(conn):
+                continue
+            migrate(conn)
+            try:
+                with conn.begin_nested():
+                    conn.execute(
+                        insert(schema_migrations).values(id=mid, applied_at=func.current_timestamp())
+                    )
+            except IntegrityError:
+                # parallel von einem anderen Prozess eingetragen (Migrationen sind idempotent)
+                continue
+        logger.info("Migration %s angewendet", mid)
+        applied.append(mid)
+    return applied
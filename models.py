@@ -2,13 +2,18 @@ import datetime
 from decimal import Decimal
 
 from sqlalchemy import (
+    Boolean,
     Integer,
     String,
     Numeric,
     Float,
     ForeignKey,
     Date,
+    DateTime,
+    Text,
     UniqueConstraint,
+    Index,
+    text,
 )
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.ext.hybrid import hybrid_property
@@ -57,6 +62,10 @@ class TippingGame(Base):
 
 class Member(Base):
     __tablename__ = "members"
+    __table_args__ = (
+        Index("ix_members_game_nickname", "game_id", "nickname"),
+        Index("ix_members_game_name", "game_id", "last_name", "first_name", "id"),  # Keyset-Pagination
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     game_id: Mapped[int] = mapped_column(ForeignKey("tipping_games.id", ondelete="CASCADE"), nullable=False)
@@ -75,12 +84,21 @@ class Member(Base):
         lazy="selectin",
     )
 
+    standing: Mapped["CurrentStanding"] = relationship(
+        "CurrentStanding",
+        back_populates="member",
+        cascade="all, delete-orphan",
+        uselist=False,
+    )
+
+    # Historien nur bei Zugriff laden; Übersichten holen den letzten Stand per
+    # SQL (queries.latest_statuses_for_game) statt aller Einträge.
     victory_statuses: Mapped[list["VictoryStatus"]] = relationship(
         "VictoryStatus",
         back_populates="member",
         cascade="all, delete-orphan",
         order_by="VictoryStatus.date.desc()",
-        lazy="selectin",
+        lazy="select",
     )
 
     points_statuses: Mapped[list["PointsStatus"]] = relationship(
@@ -88,7 +106,7 @@ class Member(Base):
         back_populates="member",
         cascade="all, delete-orphan",
         order_by="PointsStatus.date.desc()",
-        lazy="selectin",
+        lazy="select",
     )
 
     @property
@@ -100,6 +118,45 @@ class Member(Base):
         return self.points_statuses[0] if self.points_statuses else None
 
 
+class CurrentStanding(Base):
+    """
+    Denormalisierter aktueller Stand je Mitglied (letzter Punkte-/Siegstand und
+    Platz im Spiel). Wird von standings.py im selben Commit wie die Status-
+    Einträge gepflegt; `flask standings rebuild` baut ihn neu auf.
+    """
+
+    __tablename__ = "current_standings"
+    # Keyset-Pagination der Mitgliederliste nach Punkten/Siegen
+    __table_args__ = (
+        Index("ix_current_standings_game_points", "game_id", "points", "member_id"),
+        Index("ix_current_standings_game_victories", "game_id", "victories", "member_id"),
+    )
+
+    member_id: Mapped[int] = mapped_column(ForeignKey("members.id", ondelete="CASCADE"), primary_key=True)
+    game_id: Mapped[int] = mapped_column(ForeignKey("tipping_games.id", ondelete="CASCADE"), nullable=False, index=True)
+    points: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    points_date: Mapped[datetime.date] = mapped_column(Date, nullable=True)
+    victories: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    victories_date: Mapped[datetime.date] = mapped_column(Date, nullable=True)
+    as_of: Mapped[datetime.date] = mapped_column(Date, nullable=True)  # jüngstes der beiden Daten
+    rank: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    member: Mapped["Member"] = relationship("Member", back_populates="standing")
+
+
+class GameVersion(Base):
+    """
+    Änderungszähler je Spiel. Jeder Schreibpfad, der die Auswertung
+    beeinflusst, erhöht ihn (evaluation.bump_game_version); gecachte
+    Auswertungen sind über (Spiel, Version) adressiert.
+    """
+
+    __tablename__ = "game_versions"
+
+    game_id: Mapped[int] = mapped_column(ForeignKey("tipping_games.id", ondelete="CASCADE"), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
 class PaymentMethod(Base):
     __tablename__ = "payment_methods"
 
@@ -113,6 +170,8 @@ class PaymentMethod(Base):
 
 class VictoryStatus(Base):
     __tablename__ = "victory_statuses"
+    # deckt "letzter Stand je Mitglied (<= Datum)" und die Historien-Loader ab
+    __table_args__ = (Index("ix_victory_statuses_member_date", "member_id", "date", "victories"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     member_id: Mapped[int] = mapped_column(ForeignKey("members.id", ondelete="CASCADE"), nullable=False)
@@ -124,6 +183,7 @@ class VictoryStatus(Base):
 
 class PointsStatus(Base):
     __tablename__ = "points_statuses"
+    __table_args__ = (Index("ix_points_statuses_member_date", "member_id", "date", "points"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     member_id: Mapped[int] = mapped_column(ForeignKey("members.id", ondelete="CASCADE"), nullable=False)
@@ -160,3 +220,42 @@ class PlacementPayout(Base):
     percent: Mapped[Decimal] = mapped_column(Numeric(5, 2), nullable=False)  # Anteil vom Platzierungs-Topf
 
     game: Mapped["TippingGame"] = relationship("TippingGame", back_populates="placement_payouts")
+
+
+# ------------------------------
+#  Hintergrund-Jobs (jobs.py)
+# ------------------------------
+class SyncJob(Base):
+    """
+    Kicktipp-Sync als Job in der Datenbank. Ein Worker-Prozess
+    (`flask kicktipp worker`) holt fällige Jobs atomar ab; je Spiel gibt es
+    höchstens einen offenen Job (queued/running, partieller Unique-Index).
+    Zeitstempel in UTC.
+    """
+
+    __tablename__ = "sync_jobs"
+    __table_args__ = (
+        Index("ix_sync_jobs_status_run_at", "status", "run_at"),
+        Index(
+            "uq_sync_jobs_open_game",
+            "game_id",
+            unique=True,
+            sqlite_where=text("status IN ('queued', 'running')"),
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    game_id: Mapped[int] = mapped_column(ForeignKey("tipping_games.id", ondelete="CASCADE"), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")  # queued/running/done/failed
+    force: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=5)
+    run_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)  # frühester (nächster) Start
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
+    started_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=True)
+    lease_until: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=True)  # danach gilt ein Lauf als abgebrochen
+    worker: Mapped[str] = mapped_column(String(100), nullable=True)
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    result: Mapped[str] = mapped_column(Text, nullable=True)  # Summary als JSON
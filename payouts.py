@@ -0,0 +1,249 @@
+"""
+payouts.py
+----------
+Ausschüttungs-Rechenkern in ganzen Cent, für viele Mitglieder und viele
+Konfigurationen in einem Aufruf.
+
+Ergebnis identisch zur bisherigen Decimal-Rechnung (`quantize(0.01)`,
+Rundung ROUND_HALF_EVEN):
+
+    Gesamteinsatz     = Einsatz × Mitglieder
+    Topf Siege        = rund(Gesamteinsatz × Siege-% / 100)
+    Topf Platzierung  = rund(Gesamteinsatz × Platzierungs-% / 100)
+    je Spieltag       = rund(Topf Siege / Spieltage)          (0 bei 0 Spieltagen)
+    Ausschüttung Sieg = rund(je Spieltag × Siege)
+    Ausschüttung Platz= rund(Topf Platzierung × Prozent des Platzes / 100)
+
+Prozente haben zwei Nachkommastellen (Numeric(5,2)) und werden als ganze
+Hundertstel-Prozent geführt, Einsätze als Cent, Siege als ganze Zahl mit
+gemeinsamem Zehnerpotenz-Nenner (aus der Dezimaldarstellung der Floats, wie
+`Decimal(str(x))`). Damit sind alle Zwischenwerte exakte Brüche und jede
+Rundung eine ganzzahlige Division mit Rest.
+
+Mit NumPy (optional) laufen Siege- und Platzierungsbeträge als
+(Konfigurationen × Mitglieder)-Arrays in int64; ohne NumPy bzw. wenn int64
+überlaufen könnte, in Python-Ganzzahlen (gleiches Ergebnis).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    import numpy as _np
+except ImportError:  # optional
+    _np = None
+
+# Produkte bis hierhin passen sicher in int64
+_INT64_SAFE = 2**62
+
+
+@dataclass(frozen=True)
+class PayoutConfig:
+    """Eine (ggf. hypothetische) Konfiguration in ganzen Einheiten."""
+
+    stake_cents: int
+    victory_share_bp: int  # Hundertstel Prozent: 40,5 % -> 4050
+    placement_share_bp: int
+    num_matchdays: int
+    rank_bp: Tuple[int, ...] = ()  # Index 0 = Platz 1
+    label: Optional[str] = field(default=None, compare=False)
+
+    @classmethod
+    def from_values(
+        cls,
+        stake_per_person,
+        victory_share_percent,
+        placement_share_percent,
+        num_matchdays: int,
+        rank_percents: Mapping[int, object],
+        label: Optional[str] = None,
+    ) -> "PayoutConfig":
+        """Aus Euro-/Prozentwerten (Decimal, str, int). ValueError bei mehr als zwei Nachkommastellen."""
+        ranks = [0] * max(rank_percents, default=0)
+        for rank, percent in rank_percents.items():
+            if rank < 1:
+                raise ValueError("Platz muss ≥ 1 sein.")
+            ranks[rank - 1] = to_hundredths(percent)
+        return cls(
+            stake_cents=to_hundredths(stake_per_person or 0),
+            victory_share_bp=to_hundredths(victory_share_percent),
+            placement_share_bp=to_hundredths(placement_share_percent),
+            num_matchdays=int(num_matchdays),
+            rank_bp=tuple(ranks),
+            label=label,
+        )
+
+    @classmethod
+    def from_game(cls, game) -> "PayoutConfig":
+        cfg = game.config
+        return cls.from_values(
+            game.stake_per_person,
+            cfg.victory_share_percent,
+            cfg.placement_share_percent,
+            cfg.num_matchdays,
+            {pp.rank: pp.percent for pp in game.placement_payouts},
+        )
+
+
+@dataclass
+class PayoutBatch:
+    """
+    Ergebnis für K Konfigurationen und N Zeilen: Töpfe als Listen der Länge K,
+    Beträge als K×N (NumPy-Array oder Liste von Listen), alles in Cent.
+    """
+
+    member_count: int
+    total_stake: List[int]
+    victory_pot: List[int]
+    placement_pot: List[int]
+    per_matchday: List[int]
+    victories: object
+    placement: object
+    total: object
+
+
+# -------------------------------
+# Umrechnung
+# -------------------------------
+def to_hundredths(value) -> int:
+    """Euro bzw. Prozent -> ganze Hundertstel (exakt)."""
+    scaled = Decimal(str(value)).scaleb(2)
+    if scaled != scaled.to_integral_value():
+        raise ValueError(f"Höchstens zwei Nachkommastellen erlaubt: {value}")
+    return int(scaled)
+
+
+def format_cents(cents: int) -> str:
+    """Cent -> '12.50' (wie str() eines auf 0.01 quantisierten Decimal)."""
+    cents = int(cents)
+    sign = "-" if cents < 0 else ""
+    cents = abs(cents)
+    return f"{sign}{cents // 100}.{cents % 100:02d}"
+
+
+def victory_units(victories: Sequence[float]) -> Tuple[List[int], int]:
+    """Siege als ganze Zahlen mit gemeinsamem Nenner 10**k: (Zähler, Nenner)."""
+    decimals = [Decimal(str(v)) for v in victories]
+    places = max((-d.as_tuple().exponent for d in decimals), default=0)
+    places = max(places, 0)
+    return [int(d.scaleb(places)) for d in decimals], 10**places
+
+
+def _round_div(num: int, den: int) -> int:
+    """num / den, halb auf gerade gerundet (den > 0)."""
+    if num < 0:
+        return -_round_div(-num, den)
+    q, r = divmod(num, den)
+    if 2 * r > den or (2 * r == den and q % 2):
+        q += 1
+    return q
+
+
+def _round_div_array(num, den: int):
+    sign = _np.sign(num)
+    q, r = _np.divmod(_np.abs(num), den)
+    twice = 2 * r
+    return sign * (q + ((twice > den) | ((twice == den) & (q % 2 == 1))))
+
+
+# -------------------------------
+# Berechnung
+# -------------------------------
+def compute_payouts(
+    configs: Sequence[PayoutConfig],
+    victories: Sequence[float],
+    ranks: Optional[Sequence[int]] = None,
+    member_count: Optional[int] = None,
+    victory_scale: Optional[int] = None,
+) -> PayoutBatch:
+    """
+    Beträge für jede Konfiguration × jede Zeile.
+
+    `victories[i]` und `ranks[i]` beschreiben eine Zeile (Standard: Zeile i =
+    Platz i+1, also nach Ranking sortierte Mitglieder). Für mehrere Stichtage
+    auf einmal (Saisonverlauf) einfach alle Zeilen hintereinander übergeben;
+    `member_count` bestimmt dann die Töpfe (Standard: Anzahl Zeilen).
+    Mit `victory_scale` sind `victories` bereits ganze Zahlen über diesem
+    Nenner (z. B. 100 = Hundertstel) – spart bei großen Arrays die
+    Umrechnung über Decimal.
+    """
+    rows = len(victories)
+    if ranks is None:
+        ranks = range(1, rows + 1)
+    if member_count is None:
+        member_count = rows
+
+    total_stake = [c.stake_cents * member_count for c in configs]
+    victory_pot = [_round_div(t * c.victory_share_bp, 10000) for t, c in zip(total_stake, configs)]
+    placement_pot = [_round_div(t * c.placement_share_bp, 10000) for t, c in zip(total_stake, configs)]
+    per_matchday = [
+        _round_div(pot, c.num_matchdays) if c.num_matchdays > 0 else 0 for pot, c in zip(victory_pot, configs)
+    ]
+    # Betrag je Platz (Platz 1..R), R = längste Rangtabelle
+    max_rank = max((len(c.rank_bp) for c in configs), default=0)
+    rank_amounts = [
+        [_round_div(pot * bp, 10000) for bp in c.rank_bp] + [0] * (max_rank - len(c.rank_bp))
+        for pot, c in zip(placement_pot, configs)
+    ]
+
+    if victory_scale is None:
+        units, scale = victory_units(victories)
+    else:
+        units, scale = victories, victory_scale
+    if _np is not None and isinstance(units, _np.ndarray):
+        max_units = int(_np.abs(units).max()) if units.size else 0
+    else:
+        max_units = max(map(abs, units), default=0)
+    # alle Zwischenwerte müssen in int64 passen, sonst exakt mit Python-ints
+    largest = max(
+        max(map(abs, per_matchday), default=0) * max_units,
+        max((abs(a) for row in rank_amounts for a in row), default=0),
+        max(map(abs, victory_pot), default=0),
+        max(map(abs, placement_pot), default=0),
+    )
+    use_numpy = _np is not None and largest < _INT64_SAFE
+
+    if use_numpy:
+        rank_index = _np.asarray(ranks, dtype=_np.int64) - 1
+        vic = _round_div_array(
+            _np.asarray(per_matchday, dtype=_np.int64)[:, None] * _np.asarray(units, dtype=_np.int64)[None, :],
+            scale,
+        )
+        # Spalte max_rank = 0 für alle Plätze ohne Regel
+        table = _np.zeros((len(configs), max_rank + 1), dtype=_np.int64)
+        if max_rank:
+            table[:, :max_rank] = _np.asarray(rank_amounts, dtype=_np.int64)
+        place = table[:, _np.where(rank_index < max_rank, rank_index, max_rank)]
+        total = vic + place
+    else:
+        ranks = list(ranks)
+        units = [int(u) for u in units]
+        vic, place, total = [], [], []
+        for k in range(len(configs)):
+            # viele Mitglieder teilen sich denselben Siegstand
+            amounts: Dict[int, int] = {}
+            row_vic = []
+            for u in units:
+                amount = amounts.get(u)
+                if amount is None:
+                    amount = amounts[u] = _round_div(per_matchday[k] * u, scale)
+                row_vic.append(amount)
+            table = rank_amounts[k]
+            row_place = [table[r - 1] if r <= len(table) else 0 for r in ranks]
+            vic.append(row_vic)
+            place.append(row_place)
+            total.append([a + b for a, b in zip(row_vic, row_place)])
+
+    return PayoutBatch(
+        member_count=member_count,
+        total_stake=total_stake,
+        victory_pot=victory_pot,
+        placement_pot=placement_pot,
+        per_matchday=per_matchday,
+        victories=vic,
+        placement=place,
+        total=total,
+    )
@@ -0,0 +1,332 @@
+"""
+projection.py
+-------------
+Monte-Carlo-Prognose der Ausschüttung am Saisonende („Was gewinne ich
+voraussichtlich?“).
+
+Modell:
+  - Gespielte Spieltage = Summe aller Siege im Spiel (je Spieltag wird genau
+    ein Sieg vergeben, ggf. geteilt), höchstens `num_matchdays`; ohne Siege
+    die Anzahl der Tage mit Punkte-Einträgen. Rest = `num_matchdays` − gespielt.
+  - Punkte je Spieltag und Mitglied ~ Poisson(Rate). Rate = bisherige Punkte
+    je gespieltem Spieltag, zum Spieldurchschnitt hin geglättet
+    (PROJECTION_PRIOR_MATCHDAYS Pseudo-Spieltage) – wenige Einträge
+    streuen sonst zu stark.
+  - Spieltagssieg: höchste Punktzahl des simulierten Spieltags; bei k
+    Gleichstand bekommt jeder 1/k (auf Hundertstel abgerundet, wie Kicktipp).
+  - Endstand wird wie `current_standings` sortiert (Punkte, Siege, Name),
+    die Ausschüttung kommt aus payouts.py – dieselben Regeln wie
+    `games.evaluation`.
+
+Gerechnet wird mit NumPy (optional; ohne NumPy keine Prognose) in Blöcken
+zu PROJECTION_BATCH Simulationen; je Block ein (Simulationen × Mitglieder)-
+Array, Schleife nur über die Restspieltage. Ein Block liefert nur ein
+Histogramm (Mitglied, Betrag in Cent) -> Anzahl zurück; Erwartungswert,
+Quantile und P(Auszahlung) ergeben sich daraus exakt, ohne dass die Matrix
+aller Simulationen im Web-Prozess liegt. Die Blöcke laufen parallel in
+einem ProcessPoolExecutor (erst beim ersten Bedarf gestartet, „spawn“ –
+keine geerbten DB-Verbindungen). Jeder Block hat seinen eigenen Seed aus
+einer SeedSequence über (Spiel, Version): das Ergebnis ist reproduzierbar
+und hängt nicht von der Anzahl Worker ab.
+
+Die Pool-Prozesse importieren nur dieses Modul, NumPy und payouts.py; alles
+mit Datenbankbezug wird erst in den aufrufenden Funktionen importiert.
+
+Ergebnisse liegen im Ergebnis-Cache je Spielversion; ein Seitenaufruf startet
+also nur nach einer Änderung eine neue Simulation (je Prozess höchstens eine
+gleichzeitig).
+
+Konfiguration per ENV:
+  - PROJECTION_SIMULATIONS     (Default: 20000)
+  - PROJECTION_BATCH           Simulationen je Block (Default: 1000)
+  - PROJECTION_BLOCK_CELLS     höchstens Simulationen × Mitglieder je Block –
+                               begrenzt den Speicher großer Spiele (Default: 200000)
+  - PROJECTION_WORKERS         Prozesse (Default: min(4, CPUs); 0/1 = im Prozess)
+  - PROJECTION_PRIOR_MATCHDAYS (Default: 3)
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import get_context
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from payouts import PayoutConfig, compute_payouts, format_cents, to_hundredths
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+    from models import TippingGame
+
+try:
+    import numpy as _np
+except ImportError:  # optional
+    _np = None
+
+PROJECTION_SIMULATIONS = int(os.getenv("PROJECTION_SIMULATIONS", "20000"))
+PROJECTION_BATCH = int(os.getenv("PROJECTION_BATCH", "1000"))
+PROJECTION_BLOCK_CELLS = int(os.getenv("PROJECTION_BLOCK_CELLS", "200000"))
+PROJECTION_WORKERS = int(os.getenv("PROJECTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+PROJECTION_PRIOR_MATCHDAYS = float(os.getenv("PROJECTION_PRIOR_MATCHDAYS", "3"))
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+class ProjectionUnavailable(RuntimeError):
+    """Prognose nicht möglich (NumPy fehlt)."""
+
+
+@dataclass(frozen=True)
+class SimulationInput:
+    """Alles, was ein Block braucht – picklebar, ohne DB."""
+
+    points: Tuple[int, ...]
+    victories: Tuple[int, ...]  # Hundertstel
+    rates: Tuple[float, ...]
+    tiebreak: Tuple[int, ...]  # größer = bei Gleichstand vorne
+    remaining: int
+    config: PayoutConfig
+
+
+# -------------------------------
+# Simulation (läuft in den Pool-Prozessen)
+# -------------------------------
+# Histogramm-Schlüssel: Mitglied in den oberen, Betrag (Cent, ≥ 0) in den unteren Bits
+_VALUE_BITS = 32
+
+
+def simulate_batch(inp: SimulationInput, simulations: int, seed) -> Tuple["_np.ndarray", "_np.ndarray", "_np.ndarray"]:
+    """
+    (Histogramm-Schlüssel Mitglied/Betrag sortiert, Anzahl je Schlüssel,
+    Anzahl Simulationen mit Platz 1 je Mitglied).
+    """
+    rng = _np.random.default_rng(seed)
+    count = len(inp.points)
+    rates = _np.asarray(inp.rates, dtype=_np.float64)
+    points = _np.tile(_np.asarray(inp.points, dtype=_np.int64), (simulations, 1))
+    victories = _np.tile(_np.asarray(inp.victories, dtype=_np.int64), (simulations, 1))
+
+    for _ in range(inp.remaining):
+        day = rng.poisson(rates, size=(simulations, count))
+        points += day
+        winners = day == day.max(axis=1, keepdims=True)
+        victories += winners * (100 // winners.sum(axis=1, keepdims=True))
+
+    # Rangliste je Simulation: Punkte, Siege, Name absteigend
+    tiebreak = _np.broadcast_to(_np.asarray(inp.tiebreak, dtype=_np.int64), points.shape)
+    order = _np.lexsort((-tiebreak, -victories, -points), axis=1)
+    ranks = _np.empty_like(order)
+    _np.put_along_axis(ranks, order, _np.arange(1, count + 1)[None, :], axis=1)
+
+    batch = compute_payouts(
+        [inp.config], victories.ravel(), ranks=ranks.ravel(), member_count=count, victory_scale=100
+    )
+    payouts = _np.asarray(batch.total[0], dtype=_np.int64).reshape(simulations, count)
+    keys = (_np.arange(count, dtype=_np.int64)[None, :] << _VALUE_BITS) | payouts
+    keys, counts = _np.unique(keys, return_counts=True)
+    return keys, counts, (ranks == 1).sum(axis=0)
+
+
+# -------------------------------
+# Prozess-Pool
+# -------------------------------
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+# je Prozess höchstens eine Simulation gleichzeitig (Cache-Miss bei parallelen Aufrufen)
+_compute_lock = threading.Lock()
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    if PROJECTION_WORKERS <= 1:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=PROJECTION_WORKERS, mp_context=get_context("spawn"))
+        return _executor
+
+
+def _reset_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+@atexit.register
+def shutdown_executor() -> None:
+    _reset_executor()
+
+
+def _run_batches(inp: SimulationInput, simulations: int, seed_parts: Tuple[int, ...]):
+    """
+    Alle Blöcke, parallel falls möglich: (Histogramm-Schlüssel sortiert,
+    Anzahl je Schlüssel, Platz-1-Zähler) über alle Simulationen.
+    """
+    batch = max(1, min(PROJECTION_BATCH, PROJECTION_BLOCK_CELLS // max(len(inp.points), 1)))
+    sizes = [batch] * (simulations // batch)
+    if simulations % batch:
+        sizes.append(simulations % batch)
+    seeds = _np.random.SeedSequence(list(seed_parts)).spawn(len(sizes))
+
+    executor = _get_executor() if len(sizes) > 1 else None
+    if executor is not None:
+        try:
+            return _merge(executor.map(simulate_batch, [inp] * len(sizes), sizes, seeds))
+        except BrokenProcessPool:
+            # z. B. Worker per OOM beendet – neu aufsetzen, diesmal im Prozess rechnen
+            _reset_executor()
+    return _merge(simulate_batch(inp, size, seed) for size, seed in zip(sizes, seeds))
+
+
+def _merge(results, group: int = 16):
+    """Histogramme der Blöcke zusammenführen, während sie eintreffen (je `group` Blöcke)."""
+    keys = _np.empty(0, dtype=_np.int64)
+    counts = _np.empty(0, dtype=_np.int64)
+    first = 0
+    pending = []
+
+    def fold():
+        nonlocal keys, counts
+        merged, inverse = _np.unique(_np.concatenate([keys] + [k for k, _ in pending]), return_inverse=True)
+        weights = _np.concatenate([counts] + [c for _, c in pending])
+        keys, counts = merged, _np.bincount(inverse, weights=weights, minlength=len(merged)).astype(_np.int64)
+        pending.clear()
+
+    for batch_keys, batch_counts, batch_first in results:
+        pending.append((batch_keys, batch_counts))
+        first = first + batch_first
+        if len(pending) >= group:
+            fold()
+    if pending:
+        fold()
+    return keys, counts, first
+
+
+# -------------------------------
+# Eingaben & Ergebnis
+# -------------------------------
+def _played_matchdays(db: Session, game: TippingGame, standings) -> int:
+    from sqlalchemy import distinct, func, select
+
+    from models import Member, PointsStatus
+
+    played = round(sum(standing.victories for _, standing in standings))
+    if played <= 0:
+        played = db.scalar(
+            select(func.count(distinct(PointsStatus.date)))
+            .join(Member, Member.id == PointsStatus.member_id)
+            .where(Member.game_id == game.id)
+        ) or 0
+    return min(played, game.config.num_matchdays)
+
+
+def build_input(db: Session, game: TippingGame, standings=None) -> Tuple[SimulationInput, list, int]:
+    """(Eingabe, Stände in Ranglistenreihenfolge, gespielte Spieltage)."""
+    from standings import load_standings
+
+    if standings is None:
+        standings = load_standings(db, game.id)
+    played = _played_matchdays(db, game, standings)
+    remaining = max(game.config.num_matchdays - played, 0)
+
+    points = [standing.points for _, standing in standings]
+    mean = sum(points) / (len(points) * played) if points and played else 0.0
+    prior = PROJECTION_PRIOR_MATCHDAYS
+    rates = [(p + prior * mean) / (played + prior) if played + prior > 0 else 0.0 for p in points]
+
+    # Gleichstand wie standings.ranking_key (+ kleinere ID zuerst)
+    by_name = sorted(
+        range(len(standings)),
+        key=lambda i: ((standings[i][0].last_name or "").lower(), (standings[i][0].first_name or "").lower(),
+                       -standings[i][0].id),
+    )
+    tiebreak = [0] * len(standings)
+    for position, i in enumerate(by_name):
+        tiebreak[i] = position
+
+    inp = SimulationInput(
+        points=tuple(points),
+        victories=tuple(to_hundredths(round(standing.victories, 2)) for _, standing in standings),
+        rates=tuple(rates),
+        tiebreak=tuple(tiebreak),
+        remaining=remaining,
+        config=PayoutConfig.from_game(game),
+    )
+    return inp, standings, played
+
+
+def compute_projection(
+    db: Session, game: TippingGame, simulations: int = PROJECTION_SIMULATIONS, seed: int = 0
+) -> dict:
+    """Erwartete Ausschüttung, Quantile und P(Platz 1) je Mitglied (Beträge als '12.50')."""
+    if _np is None:
+        raise ProjectionUnavailable("Für die Prognose wird NumPy benötigt.")
+    inp, standings, played = build_input(db, game)
+    result = {
+        "game_id": game.id,
+        "simulations": 0,
+        "played_matchdays": played,
+        "remaining_matchdays": inp.remaining,
+        "rows": [],
+    }
+    if not standings:
+        return result
+    if inp.remaining == 0:
+        simulations = 1  # nichts mehr offen: Ergebnis steht fest
+    simulations = max(simulations, 1)
+    if inp.config.stake_cents * len(standings) >= 2**_VALUE_BITS:
+        raise ProjectionUnavailable("Einsatz zu hoch für die Prognose.")
+    keys, counts, first = _run_batches(inp, simulations, (seed, game.id))
+
+    # Histogramm je Mitglied: Schlüssel sind nach (Mitglied, Betrag) sortiert,
+    # jedes Mitglied hat genau `simulations` Einträge
+    members = keys >> _VALUE_BITS
+    values = keys & ((1 << _VALUE_BITS) - 1)
+    count = len(standings)
+    expected = _np.bincount(members, weights=values * counts, minlength=count) / simulations
+    paid = _np.bincount(members, weights=counts * (values > 0), minlength=count)
+    # wie np.quantile(method="lower"): Index floor(q · (n − 1)) der sortierten Werte
+    cumulative = _np.cumsum(counts)
+    offsets = _np.arange(count, dtype=_np.int64)[:, None] * simulations
+    positions = offsets + _np.floor(_np.asarray(QUANTILES) * (simulations - 1)).astype(_np.int64)[None, :]
+    quantiles = values[_np.searchsorted(cumulative, positions, side="right")].T
+
+    rows: List[dict] = []
+    for i, (m, standing) in enumerate(standings):
+        rows.append({
+            "member_id": m.id,
+            "first_name": m.first_name,
+            "last_name": m.last_name,
+            "nickname": m.nickname,
+            "rank": i + 1,
+            "points": standing.points,
+            "victories": standing.victories,
+            "expected": format_cents(int(round(float(expected[i])))),
+            "quantiles": {f"p{int(q * 100)}": format_cents(int(v)) for q, v in zip(QUANTILES, quantiles[:, i])},
+            "p_payout": round(float(paid[i]) / simulations, 4),
+            "p_first": round(float(first[i]) / simulations, 4),
+        })
+    return dict(result, simulations=simulations, rows=rows)
+
+
+def get_projection(db: Session, game: TippingGame, version: Optional[int] = None) -> dict:
+    """Prognose aus dem Cache (je Spielversion) bzw. frisch simuliert."""
+    from cache import get_result_cache
+    from evaluation import get_game_version
+
+    if version is None:
+        version = get_game_version(db, game.id)
+    key = f"projection:{game.id}:v{version}:n{PROJECTION_SIMULATIONS}"
+    cache = get_result_cache()
+    result = cache.get(key)
+    if result is None:
+        with _compute_lock:
+            # evtl. hat ein anderer Thread inzwischen gerechnet
+            result = cache.get_or_compute(key, lambda: compute_projection(db, game, seed=version))
+    return dict(result, version=version)
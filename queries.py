@@ -0,0 +1,265 @@
+"""
+queries.py
+----------
+Lesende Abfragen, die direkt in SQL aggregieren, statt komplette ORM-Historien
+zu laden.
+
+Der „letzte Stand“ je Mitglied wird über eine Window-Function
+(ROW_NUMBER() OVER (PARTITION BY member_id ORDER BY date DESC, id DESC))
+ermittelt – das läuft auf SQLite (>= 3.25) und Postgres gleichermaßen.
+Bei mehreren Einträgen am selben Tag zählt der zuletzt angelegte.
+"""
+
+from __future__ import annotations
+
+import base64
+import datetime
+import json
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import Row, func, select, tuple_
+from sqlalchemy.orm import Session
+
+from models import CurrentStanding, Member, PaymentMethod, PointsStatus, TippingGame, VictoryStatus
+
+
+@dataclass(frozen=True)
+class LatestStatus:
+    points: int = 0
+    points_date: Optional[datetime.date] = None
+    victories: float = 0.0
+    victories_date: Optional[datetime.date] = None
+
+
+def latest_status_subquery(model, value_column, member_filter=None, as_of: Optional[datetime.date] = None):
+    """
+    Subquery mit genau einer Zeile je Mitglied: id, member_id, value, date.
+    `member_filter` schränkt die Mitglieder vor der Window-Berechnung ein.
+    """
+    rn = (
+        func.row_number()
+        .over(partition_by=model.member_id, order_by=(model.date.desc(), model.id.desc()))
+        .label("rn")
+    )
+    ranked = select(model.id, model.member_id, value_column.label("value"), model.date, rn)
+    if member_filter is not None:
+        ranked = ranked.where(member_filter)
+    if as_of is not None:
+        ranked = ranked.where(model.date <= as_of)
+    ranked = ranked.subquery()
+    return (
+        select(ranked.c.id, ranked.c.member_id, ranked.c.value, ranked.c.date)
+        .where(ranked.c.rn == 1)
+        .subquery()
+    )
+
+
+def latest_status_rows(
+    db: Session,
+    model,
+    value_column,
+    member_ids: Iterable[int],
+    as_of: Optional[datetime.date] = None,
+) -> Dict[int, list]:
+    """Letzter Status (<= as_of) je Mitglied: member_id -> [status_id, wert, datum]."""
+    latest = latest_status_subquery(model, value_column, model.member_id.in_(list(member_ids)), as_of)
+    return {
+        member_id: [status_id, value, d]
+        for status_id, member_id, value, d in db.execute(
+            select(latest.c.id, latest.c.member_id, latest.c.value, latest.c.date)
+        )
+    }
+
+
+def latest_statuses_for_game(
+    db: Session,
+    game_id: int,
+    as_of: Optional[datetime.date] = None,
+    member_ids: Optional[Iterable[int]] = None,
+) -> Dict[int, LatestStatus]:
+    """
+    Letzter Punkte- und Siegstand aller (bzw. der angegebenen) Mitglieder eines
+    Spiels in einer Query. Mitglieder ohne Status bekommen `LatestStatus()` (0 / 0.0).
+    """
+    member_filter = [Member.game_id == game_id]
+    if member_ids is not None:
+        member_filter.append(Member.id.in_(list(member_ids)))
+    game_members = select(Member.id).where(*member_filter)
+    points = latest_status_subquery(
+        PointsStatus, PointsStatus.points, PointsStatus.member_id.in_(game_members), as_of
+    )
+    victories = latest_status_subquery(
+        VictoryStatus, VictoryStatus.victories, VictoryStatus.member_id.in_(game_members), as_of
+    )
+    rows = db.execute(
+        select(Member.id, points.c.value, points.c.date, victories.c.value, victories.c.date)
+        .outerjoin(points, points.c.member_id == Member.id)
+        .outerjoin(victories, victories.c.member_id == Member.id)
+        .where(*member_filter)
+    )
+    return {
+        member_id: LatestStatus(
+            points=int(p) if p is not None else 0,
+            points_date=p_date,
+            victories=float(v) if v is not None else 0.0,
+            victories_date=v_date,
+        )
+        for member_id, p, p_date, v, v_date in rows
+    }
+
+
+def game_overview_rows(db: Session, game_id: Optional[int] = None) -> List[Row]:
+    """
+    Übersicht aller (bzw. eines) Spiele für die Startseite: Spielspalten plus
+    Mitgliederzahl und Gesamteinsatz, in einer aggregierenden Query
+    (ohne Member-/Status-Objekte).
+    """
+    member_count = func.count(Member.id)
+    stmt = (
+        select(
+            TippingGame.id,
+            TippingGame.name,
+            TippingGame.stake_per_person,
+            member_count.label("member_count"),
+            (TippingGame.stake_per_person * member_count).label("total_stake"),
+        )
+        .outerjoin(Member, Member.game_id == TippingGame.id)
+        .group_by(TippingGame.id, TippingGame.name, TippingGame.stake_per_person)
+        .order_by(TippingGame.id)
+    )
+    if game_id is not None:
+        stmt = stmt.where(TippingGame.id == game_id)
+    return list(db.execute(stmt))
+
+
+# -------------------------------
+# Mitgliederliste (Keyset-Pagination)
+# -------------------------------
+# Sortierschlüssel -> Spalten (eindeutig durch die Member-ID am Ende); passende
+# Indizes: ix_members_game_name, ix_current_standings_game_points/_victories
+MEMBER_SORTS = {
+    "name": (Member.last_name, Member.first_name, Member.id),
+    "points": (CurrentStanding.points, CurrentStanding.member_id),
+    "victories": (CurrentStanding.victories, CurrentStanding.member_id),
+}
+# Erlaubte JSON-Typen der Cursor-Werte je Sortierung (gleiche Reihenfolge)
+_CURSOR_TYPES = {
+    "name": (str, str, int),
+    "points": (int, int),
+    "victories": ((int, float), int),
+}
+MEMBER_PAGE_MAX = 500
+
+
+@dataclass
+class MemberPage:
+    rows: List[Row]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+def encode_cursor(sort: str, values) -> str:
+    raw = json.dumps([sort, *values], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _cursor_value_ok(value, kind) -> bool:
+    if isinstance(value, bool) or not isinstance(value, kind):
+        return False
+    if isinstance(value, int):
+        return -(2**63) <= value < 2**63  # Wertebereich von INTEGER/BIGINT
+    if isinstance(value, float):
+        return math.isfinite(value)
+    return True
+
+
+def decode_cursor(cursor: str, sort: str) -> list:
+    """
+    ValueError bei ungültigem/fremdem Cursor: der Cursor trägt die Sortierung,
+    für die er ausgestellt wurde, und jeder Wert muss zur Sortierspalte passen.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception as exc:
+        raise ValueError("Ungültiger Cursor") from exc
+    kinds = _CURSOR_TYPES[sort]
+    if not isinstance(values, list) or len(values) != len(kinds) + 1 or values[0] != sort:
+        raise ValueError("Ungültiger Cursor")
+    values = values[1:]
+    if not all(_cursor_value_ok(v, kind) for v, kind in zip(values, kinds)):
+        raise ValueError("Ungültiger Cursor")
+    return values
+
+
+def member_page(
+    db: Session,
+    game_id: int,
+    sort: str = "name",
+    descending: bool = False,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    limit: int = 50,
+) -> MemberPage:
+    """
+    Eine Seite der Mitgliederliste inkl. Zahlungsart und aktuellem Stand
+    (aus current_standings). Sortierung und LIMIT macht die Datenbank über
+    einen Keyset-Vergleich `(sortspalten, id) > cursor` – die Kosten hängen
+    damit nicht von der Position in der Liste oder der Liga-Größe ab.
+    `before` blättert rückwärts.
+    """
+    if sort not in MEMBER_SORTS:
+        raise ValueError(f"Unbekannte Sortierung: {sort}")
+    limit = max(1, min(limit, MEMBER_PAGE_MAX))
+    key_columns = MEMBER_SORTS[sort]
+    backwards = before is not None
+    # rückwärts: umgekehrt sortieren und das Ergebnis wieder umdrehen
+    scan_desc = descending != backwards
+
+    stmt = (
+        select(
+            Member.id,
+            Member.first_name,
+            Member.last_name,
+            Member.nickname,
+            Member.email,
+            PaymentMethod.label.label("pm_label"),
+            PaymentMethod.reference.label("pm_reference"),
+            CurrentStanding.points,
+            CurrentStanding.points_date,
+            CurrentStanding.victories,
+            CurrentStanding.victories_date,
+            CurrentStanding.rank,
+        )
+        .join(CurrentStanding, CurrentStanding.member_id == Member.id)
+        .outerjoin(PaymentMethod, PaymentMethod.member_id == Member.id)
+        # auf der Tabelle der Sortierspalten filtern, damit deren Index greift
+        .where(key_columns[0].class_.game_id == game_id)
+        .order_by(*(c.desc() if scan_desc else c.asc() for c in key_columns))
+        .limit(limit + 1)
+    )
+    cursor = before if backwards else after
+    if cursor is not None:
+        key = tuple_(*key_columns)
+        values = tuple_(*decode_cursor(cursor, sort))
+        stmt = stmt.where(key < values if scan_desc else key > values)
+
+    rows = list(db.execute(stmt))
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    def key_of(row) -> str:
+        return encode_cursor(sort, (getattr(row, c.key) if c.key != "member_id" else row.id for c in key_columns))
+
+    page = MemberPage(rows=rows)
+    if rows:
+        if backwards:
+            page.prev_cursor = key_of(rows[0]) if has_more else None
+            page.next_cursor = key_of(rows[-1])
+        else:
+            page.next_cursor = key_of(rows[-1]) if has_more else None
+            page.prev_cursor = key_of(rows[0]) if after is not None else None
+    return page
@@ -0,0 +1,160 @@
+"""
+seed.py
+-------
+Synthetische Testdaten (SQLite oder Postgres) für Entwicklung und Benchmarks.
+
+Legt `games` Tippspiele mit je `members` Mitgliedern (inkl. Zahlungsart),
+je `statuses` wöchentlichen Punkte- und Siegständen pro Mitglied, Konfiguration
+und `ranks` Platzierungsregeln an. Geschrieben wird per Bulk-INSERT; IDs
+vergibt die Datenbank. current_standings und Spielversionen werden wie bei
+jedem anderen Schreibpfad mitgepflegt. Deterministisch über `random_seed`.
+
+    flask --app app:app seed --games 5 --members 200 --statuses 34 --ranks 3
+"""
+
+from __future__ import annotations
+
+import datetime
+import random
+from decimal import Decimal
+from typing import Dict, List
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from db import Base
+from evaluation import bump_game_version
+from models import (
+    GameConfig,
+    Member,
+    PaymentMethod,
+    PlacementPayout,
+    PointsStatus,
+    TippingGame,
+    VictoryStatus,
+)
+from standings import refresh_standings
+
+SEED_START = datetime.date(2025, 8, 1)
+_INSERT_CHUNK = 20_000
+
+_FIRST_NAMES = ["Anna", "Ben", "Clara", "David", "Emma", "Felix", "Greta", "Hannes", "Ida", "Jonas", "Lena", "Max"]
+_LAST_NAMES = ["Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer", "Wagner", "Becker", "Schulz", "Hoffmann"]
+
+
+def reset_database(db: Session) -> None:
+    """Löscht alle Zeilen aller Tabellen (Schema bleibt)."""
+    for table in reversed(Base.metadata.sorted_tables):
+        db.execute(delete(table))
+
+
+def _insert_returning_ids(db: Session, model, rows: List[dict]) -> List[int]:
+    # Core-Insert auf die Tabelle (ORM-Bulk würde u. a. Hybrid-Properties auswerten)
+    table = model.__table__
+    ids: List[int] = []
+    for i in range(0, len(rows), _INSERT_CHUNK):
+        result = db.execute(
+            insert(table).returning(table.c.id),
+            rows[i:i + _INSERT_CHUNK],
+            execution_options={"sort_by_parameter_order": True},
+        )
+        ids.extend(result.scalars())
+    return ids
+
+
+def _insert(db: Session, model, rows: List[dict]) -> None:
+    for i in range(0, len(rows), _INSERT_CHUNK):
+        db.execute(insert(model.__table__), rows[i:i + _INSERT_CHUNK])
+
+
+def seed(
+    db: Session,
+    games: int = 5,
+    members: int = 50,
+    statuses: int = 34,
+    ranks: int = 3,
+    random_seed: int = 1,
+    start: datetime.date = SEED_START,
+) -> Dict[str, int]:
+    """Befüllt die Datenbank (ohne Commit). Returns: Anzahl angelegter Zeilen je Art."""
+    rnd = random.Random(random_seed)
+    counts = {"games": 0, "members": 0, "points_statuses": 0, "victory_statuses": 0}
+
+    game_ids = _insert_returning_ids(
+        db,
+        TippingGame,
+        [
+            {"name": f"Testspiel {i + 1}", "stake_per_person": Decimal(rnd.choice([5, 10, 20])), "url": None}
+            for i in range(games)
+        ],
+    )
+    counts["games"] = len(game_ids)
+
+    _insert(
+        db,
+        GameConfig,
+        [
+            {
+                "game_id": game_id,
+                "victory_share_percent": Decimal("40.00"),
+                "placement_share_percent": Decimal("60.00"),
+                "num_matchdays": max(statuses, 1),
+            }
+            for game_id in game_ids
+        ],
+    )
+    if ranks:
+        # absteigende Anteile, Summe 100 %
+        weights = [ranks - r for r in range(ranks)]
+        percents = [Decimal(100 * w / sum(weights)).quantize(Decimal("0.01")) for w in weights]
+        percents[0] += Decimal("100.00") - sum(percents)
+        _insert(
+            db,
+            PlacementPayout,
+            [
+                {"game_id": game_id, "rank": r + 1, "percent": percents[r]}
+                for game_id in game_ids
+                for r in range(ranks)
+            ],
+        )
+
+    for game_id in game_ids:
+        member_ids = _insert_returning_ids(
+            db,
+            Member,
+            [
+                {
+                    "game_id": game_id,
+                    "first_name": rnd.choice(_FIRST_NAMES),
+                    "last_name": rnd.choice(_LAST_NAMES),
+                    "email": f"spieler{i}@example.invalid",
+                    "nickname": f"spieler{i}",
+                }
+                for i in range(1, members + 1)
+            ],
+        )
+        counts["members"] += len(member_ids)
+        _insert(
+            db,
+            PaymentMethod,
+            [{"member_id": member_id, "label": "PayPal", "reference": f"ref-{member_id}"} for member_id in member_ids],
+        )
+
+        points_rows, victory_rows = [], []
+        for member_id in member_ids:
+            points, victories = 0, 0.0
+            for week in range(statuses):
+                day = start + datetime.timedelta(days=7 * week)
+                points += rnd.randint(0, 12)
+                victories += rnd.choice([0, 0, 0, 0, 0.5, 1])
+                points_rows.append({"member_id": member_id, "points": points, "date": day})
+                victory_rows.append({"member_id": member_id, "victories": victories, "date": day})
+        _insert(db, PointsStatus, points_rows)
+        _insert(db, VictoryStatus, victory_rows)
+        counts["points_statuses"] += len(points_rows)
+        counts["victory_statuses"] += len(victory_rows)
+
+        refresh_standings(db, game_id)
+        bump_game_version(db, game_id)
+
+    return counts
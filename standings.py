@@ -0,0 +1,190 @@
+"""
+standings.py
+------------
+Pflege der denormalisierten Tabelle `current_standings`.
+
+Jeder Schreibpfad, der Status-Einträge oder Mitglieder ändert (members.edit,
+members.create/delete, Kicktipp-Sync), ruft `refresh_standings` vor seinem
+Commit auf. Die Werte der betroffenen Mitglieder werden dabei aus den
+Historien neu ermittelt (letzter Eintrag nach Datum) – rückdatierte Einträge
+ändern den aktuellen Stand also nur, wenn sie tatsächlich die neuesten sind.
+Anschließend werden die Plätze des Spiels neu vergeben; geschrieben werden
+nur Zeilen, die sich tatsächlich geändert haben (Bulk-Statements).
+
+Lesende Seiten holen den Stand mit `load_standings` in O(Mitglieder).
+Fehlende Stände werden dabei nachgezogen – in lesenden Requests in einer
+eigenen Session (`db.new_session`, BEGIN IMMEDIATE), danach wird vom Primary
+weitergelesen.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from db import in_read_request, new_session, primary_for
+from models import CurrentStanding, Member, TippingGame
+from queries import latest_statuses_for_game
+
+
+def ranking_key(points: int, victories: float, last_name: str, first_name: str) -> tuple:
+    """
+    Sortierschlüssel der Auswertung (absteigend sortieren):
+    primär Punkte, dann Siege, dann Nachname/Vorname.
+    """
+    return (points, victories, (last_name or "").lower(), (first_name or "").lower())
+
+
+_FIELDS = ("points", "points_date", "victories", "victories_date", "as_of", "rank")
+
+
+def _load_rows(db: Session, game_id: int) -> Dict[int, dict]:
+    return {
+        row.member_id: dict(row._mapping)
+        for row in db.execute(
+            select(CurrentStanding.member_id, *(getattr(CurrentStanding, f) for f in _FIELDS))
+            .where(CurrentStanding.game_id == game_id)
+        )
+    }
+
+
+def refresh_standings(db: Session, game_id: int, member_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Aktualisiert den Stand der angegebenen Mitglieder (None = alle des Spiels)
+    und vergibt die Plätze des Spiels neu. Ohne Commit.
+    """
+    if member_ids is not None:
+        member_ids = set(member_ids)
+        if not member_ids:
+            return
+    db.flush()
+
+    latest = latest_statuses_for_game(db, game_id, member_ids=member_ids)
+    current = _load_rows(db, game_id)
+    rows = {member_id: dict(row) for member_id, row in current.items()}
+
+    for member_id, status in latest.items():
+        row = rows.setdefault(member_id, {"member_id": member_id, "rank": 0})
+        dates = [d for d in (status.points_date, status.victories_date) if d is not None]
+        row.update(
+            points=status.points,
+            points_date=status.points_date,
+            victories=status.victories,
+            victories_date=status.victories_date,
+            as_of=max(dates) if dates else None,
+        )
+
+    _rerank(db, game_id, rows)
+    _write(db, game_id, current, rows)
+
+
+def _rerank(db: Session, game_id: int, rows: Dict[int, dict]) -> None:
+    names = {
+        member_id: (last_name, first_name)
+        for member_id, last_name, first_name in db.execute(
+            select(Member.id, Member.last_name, Member.first_name).where(Member.game_id == game_id)
+        )
+    }
+    for member_id in list(rows):
+        if member_id not in names:
+            # Mitglied gelöscht (bzw. Spiel gewechselt)
+            del rows[member_id]
+
+    ordered = sorted(
+        rows.values(),
+        key=lambda r: ranking_key(r["points"], r["victories"], *names[r["member_id"]]),
+        reverse=True,
+    )
+    for rank, row in enumerate(ordered, start=1):
+        row["rank"] = rank
+
+
+def _write(db: Session, game_id: int, current: Dict[int, dict], rows: Dict[int, dict]) -> None:
+    """Nur Abweichungen schreiben: je ein Bulk-INSERT/-UPDATE/-DELETE."""
+    inserts = [dict(row, game_id=game_id) for member_id, row in rows.items() if member_id not in current]
+    updates = [row for member_id, row in rows.items() if member_id in current and row != current[member_id]]
+    deleted = [member_id for member_id in current if member_id not in rows]
+
+    if inserts:
+        db.execute(insert(CurrentStanding), inserts)
+    if updates:
+        db.execute(update(CurrentStanding), updates)
+    if deleted:
+        db.execute(delete(CurrentStanding).where(CurrentStanding.member_id.in_(deleted)))
+
+
+def rerank_game(db: Session, game_id: int) -> None:
+    """Nur die Plätze neu vergeben (z. B. nach Namensänderung oder Löschen)."""
+    db.flush()
+    current = _load_rows(db, game_id)
+    rows = {member_id: dict(row) for member_id, row in current.items()}
+    _rerank(db, game_id, rows)
+    _write(db, game_id, current, rows)
+
+
+def _heal_standings(db: Session, game_id: int) -> Session:
+    """
+    Baut die Stände des Spiels neu auf und committet. Returns: Session, aus
+    der weitergelesen wird. In lesenden Requests wird nicht in der (verzögert
+    begonnenen) Request-Session geschrieben – deren Lesetransaktion ließe sich
+    unter WAL nicht zur Schreibtransaktion ausbauen, sobald ein anderer
+    Prozess dazwischen committet hat.
+    """
+    reader = primary_for(db)
+    if not in_read_request():
+        refresh_standings(reader, game_id)
+        reader.commit()
+        return reader
+    with new_session() as writer:
+        refresh_standings(writer, game_id)
+        writer.commit()
+    # alten Lese-Snapshot beenden, damit die neuen Stände sichtbar sind
+    reader.rollback()
+    return reader
+
+
+def ensure_standings(db: Session, game_id: int) -> bool:
+    """
+    Legt fehlende Stände des Spiels an (z. B. Datenbank von vor dieser
+    Tabelle) – eine Anti-Join-Query, im Normalfall ohne Schreibzugriff.
+    Returns: True, wenn nachgezogen wurde (dann ggf. vom Primary weiterlesen).
+    """
+    missing = db.scalar(
+        select(Member.id)
+        .outerjoin(CurrentStanding, CurrentStanding.member_id == Member.id)
+        .where(Member.game_id == game_id, CurrentStanding.member_id.is_(None))
+        .limit(1)
+    )
+    if missing is None:
+        return False
+    _heal_standings(db, game_id)
+    return True
+
+
+def load_standings(db: Session, game_id: int) -> List[Tuple[Member, CurrentStanding]]:
+    """
+    (Mitglied, Stand) aller Mitglieder des Spiels, nach Platz sortiert.
+    Fehlen Stände (z. B. Datenbank von vor dieser Tabelle), wird das Spiel
+    einmalig neu aufgebaut.
+    """
+    stmt = (
+        select(Member, CurrentStanding)
+        .outerjoin(CurrentStanding, CurrentStanding.member_id == Member.id)
+        .where(Member.game_id == game_id)
+        .order_by(CurrentStanding.rank, Member.id)
+    )
+    rows = db.execute(stmt).all()
+    if any(standing is None for _, standing in rows):
+        db = _heal_standings(db, game_id)
+        rows = db.execute(stmt).all()
+    return [(member, standing) for member, standing in rows]
+
+
+def rebuild_all_standings(db: Session) -> List[int]:
+    """Baut `current_standings` für alle Spiele neu auf. Returns: Spiel-IDs."""
+    game_ids = list(db.scalars(select(TippingGame.id)))
+    for game_id in game_ids:
+        refresh_standings(db, game_id)
+    return game_ids